@@ -0,0 +1,148 @@
+"""
+Created on Sat Oct 17 2026
+@author: sid
+
+Backtest : Score the registered model on every race of the combined dataset (or a subset)
+in one batched predict call. Missing driver form is filled with a vectorized join on historical
+averages, and per-race plus aggregate MAE, RMSE, R², Spearman rank correlation and top-N hit
+rates are computed with grouped array operations.
+
+Usage:
+    python backtest.py
+    python backtest.py --years 2024 2025 --top-n 1 3 10 --model-version v002
+    python backtest.py --races "2025:Miami Grand Prix" "2024:Monaco Grand Prix"
+"""
+
+import os
+import argparse
+import numpy as np
+import pandas as pd
+import warnings as w
+
+from session_store import BASE_PATH
+from model_registry import load_model
+from batch_predict import FORM_COLUMNS, HISTORICAL_FEATURES, load_historical_form, parse_event
+
+w.filterwarnings('ignore')
+
+REPORT_FILE = os.path.join(BASE_PATH, "backtest_report.csv")
+TOP_N = (1, 3, 10)
+
+
+def load_backtest_frame(races=None, years=None, features_file=HISTORICAL_FEATURES):
+    df = pd.read_csv(features_file)
+    if years:
+        df = df[df['Year'].isin(years)]
+    if races:
+        wanted = pd.MultiIndex.from_tuples(races)
+        df = df[pd.MultiIndex.from_arrays([df['Year'], df['GP']]).isin(wanted)]
+    return df.reset_index(drop=True)
+
+
+# Fill missing AvgQuali/Finish from historical averages with one join (replaces the iterrows loop)
+def fill_form(df, form=None):
+    form = load_historical_form() if form is None else form
+    df = df.copy()
+    for col in FORM_COLUMNS:
+        if col not in df.columns:
+            df[col] = np.nan
+    if form is not None:
+        filled = df[['Driver']].join(form, on='Driver')
+        df[FORM_COLUMNS] = df[FORM_COLUMNS].fillna(filled[FORM_COLUMNS])
+    return df
+
+
+# Per-race metrics from grouped sums; rows need Year, GP, the actual and the predicted column
+def race_metrics(df, actual='FinalPosition', predicted='Predicted', top_n=TOP_N):
+    keys = ['Year', 'GP']
+    d = df[keys + [actual, predicted]].copy()
+    d['err'] = d[predicted] - d[actual]
+    d['abs_err'] = d['err'].abs()
+    d['sq_err'] = d['err'] ** 2
+    d['actual_sq'] = d[actual] ** 2
+
+    # Spearman = Pearson correlation of within-race ranks
+    grouped = d.groupby(keys, sort=False)
+    d['r_act'] = grouped[actual].rank(method='average')
+    d['r_pred'] = grouped[predicted].rank(method='average')
+    d['pred_place'] = grouped[predicted].rank(method='first')
+    d['r_act_sq'] = d['r_act'] ** 2
+    d['r_pred_sq'] = d['r_pred'] ** 2
+    d['r_cross'] = d['r_act'] * d['r_pred']
+    for n in top_n:
+        d[f'hit{n}'] = ((d['pred_place'] <= n) & (d[actual] <= n)).astype(float)
+        d[f'in{n}'] = (d[actual] <= n).astype(float)
+
+    sums = d.groupby(keys, sort=False).agg(
+        Drivers=(actual, 'size'), mae_sum=('abs_err', 'sum'), sse=('sq_err', 'sum'),
+        y_sum=(actual, 'sum'), y_sq=('actual_sq', 'sum'),
+        ra=('r_act', 'sum'), rp=('r_pred', 'sum'), ra2=('r_act_sq', 'sum'),
+        rp2=('r_pred_sq', 'sum'), rx=('r_cross', 'sum'),
+        **{f'hit{n}': (f'hit{n}', 'sum') for n in top_n},
+        **{f'in{n}': (f'in{n}', 'sum') for n in top_n})
+
+    n = sums['Drivers']
+    sst = sums['y_sq'] - sums['y_sum'] ** 2 / n
+    cov = sums['rx'] - sums['ra'] * sums['rp'] / n
+    var_a = sums['ra2'] - sums['ra'] ** 2 / n
+    var_p = sums['rp2'] - sums['rp'] ** 2 / n
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out = pd.DataFrame({
+            'Drivers': n,
+            'MAE': sums['mae_sum'] / n,
+            'RMSE': np.sqrt(sums['sse'] / n),
+            'R2': 1 - sums['sse'] / sst,
+            'Spearman': cov / np.sqrt(var_a * var_p),
+            **{f'Top{k}': sums[f'hit{k}'] / sums[f'in{k}'] for k in top_n}
+        })
+    return out.reset_index()
+
+
+def aggregate_metrics(df, per_race, actual='FinalPosition', predicted='Predicted', top_n=TOP_N):
+    err = df[predicted] - df[actual]
+    sst = ((df[actual] - df[actual].mean()) ** 2).sum()
+    return pd.DataFrame([{
+        'Year': 'ALL', 'GP': f"{len(per_race)} races",
+        'Drivers': len(df),
+        'MAE': err.abs().mean(),
+        'RMSE': np.sqrt((err ** 2).mean()),
+        'R2': 1 - (err ** 2).sum() / sst if sst else np.nan,
+        'Spearman': per_race['Spearman'].mean(),
+        **{f'Top{k}': per_race[f'Top{k}'].mean() for k in top_n}
+    }])
+
+
+def run_backtest(races=None, years=None, model=None, version=None, top_n=TOP_N, write=True):
+    model = model or load_model(version)
+    df = fill_form(load_backtest_frame(races, years))
+    df = df.dropna(subset=model.features + ['FinalPosition'])
+    if df.empty:
+        print("⚠️ No valid rows to evaluate.")
+        return None
+
+    print(f"🔍 Backtesting model {model.version} on {df.groupby(['Year', 'GP']).ngroups} races ({len(df)} rows)")
+    df['Predicted'] = model.predict(df)
+    per_race = race_metrics(df, top_n=top_n)
+    report = pd.concat([per_race, aggregate_metrics(df, per_race, top_n=top_n)], ignore_index=True)
+    if write:
+        report.to_csv(REPORT_FILE, index=False)
+        print(f"✅ Backtest report saved: {REPORT_FILE}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the model on every race of the combined dataset")
+    parser.add_argument("--races", nargs="*", type=parse_event, default=None, help='races as "YEAR:Grand Prix name"')
+    parser.add_argument("--years", type=int, nargs="*", default=None)
+    parser.add_argument("--top-n", type=int, nargs="+", default=list(TOP_N))
+    parser.add_argument("--model-version", default=None)
+    args = parser.parse_args()
+
+    report = run_backtest(args.races, args.years, version=args.model_version, top_n=tuple(args.top_n))
+    if report is not None:
+        print("\n📊 Backtest:")
+        print(report.round(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
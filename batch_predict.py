@@ -0,0 +1,200 @@
+"""
+Created on Sat Oct 17 2026
+@author: sid
+
+Batch Prediction : Predict finishing positions for any list of (year, Grand Prix) pairs.
+Loads the fused model artifact once, builds the feature matrix for every event, scores them all
+in a single predict call and writes a ranked predicted_positions.csv per race.
+
+Usage:
+    python batch_predict.py --events "2025:Miami Grand Prix" "2025:Emilia Romagna Grand Prix"
+    python batch_predict.py --season 2025 --model-version v002
+"""
+
+import os
+import argparse
+import pandas as pd
+import warnings as w
+
+from session_store import BASE_PATH, list_sessions, load_session
+from model_registry import load_model
+from driver_form_index import get_form_index
+from season_features import WEATHER_COLUMNS, build_season_features
+
+w.filterwarnings('ignore')
+
+# === Paths ===
+HISTORICAL_FEATURES = os.path.join(BASE_PATH, "combined_engineered_features.csv")
+
+IMPORTANT_FEATURES = [
+    'QualiPosition',
+    'PitStopCount',
+    'AvgRaceLapTime',
+    'AirTemp',
+    'TrackTemp',
+    'Humidity',
+    'AvgFinishingPosition',
+    'AvgQualifyingPosition'
+]
+
+FORM_COLUMNS = ['AvgQualifyingPosition', 'AvgFinishingPosition']
+RACE_MEAN_COLUMNS = ['AvgRaceLapTime', 'AirTemp', 'TrackTemp', 'Humidity']
+OUTPUT_COLUMNS = ['Driver', 'QualiPosition', 'AvgFinishingPosition', 'AvgQualifyingPosition',
+                  'PredictedScore', 'PredictedPosition']
+
+
+def race_folder(year, gp_name):
+    return os.path.join(BASE_PATH, f"{year}_{gp_name}_R")
+
+
+# Stack the features of every event into one frame; events without a features.csv are built from the session store
+def load_event_features(events):
+    frames, missing = [], {}
+    for year, gp_name in events:
+        path = os.path.join(race_folder(year, gp_name), "features.csv")
+        if os.path.exists(path):
+            frames.append(pd.read_csv(path).assign(Year=year, GP=gp_name))
+        else:
+            missing.setdefault(year, []).append(gp_name)
+
+    for year, gps in missing.items():
+        built = build_season_features(year, gps, write=False)
+        if built is not None:
+            frames.append(built)
+        absent = set(gps) - set(built["GP"]) if built is not None else set(gps)
+        for gp_name in [gp for gp in gps if gp in absent]:
+            upcoming = qualifying_features(year, gp_name)
+            if upcoming is None:
+                print(f"⚠️ No features or sessions for {year} {gp_name}, skipping")
+            else:
+                print(f"🔮 {year} {gp_name}: no race session yet, using qualifying and driver form")
+                frames.append(upcoming)
+
+    if not frames:
+        return pd.DataFrame(columns=['Year', 'GP', 'Driver'] + IMPORTANT_FEATURES)
+    return pd.concat(frames, ignore_index=True)
+
+
+# Upcoming race (qualifying stored, race not run): grid from qualifying, qualifying-session weather
+# and form over every earlier race in the form index; race-only features are left to fill_missing_features
+def qualifying_features(year, gp_name):
+    try:
+        _, results, weather = load_session(year, gp_name, "Q", columns={
+            "laps": ["Driver"], "results": ["Abbreviation", "Position"], "weather": WEATHER_COLUMNS})
+    except FileNotFoundError:
+        return None
+    if results.empty:
+        return None
+    df = results.rename(columns={"Abbreviation": "Driver", "Position": "QualiPosition"})[["Driver", "QualiPosition"]]
+    for col in WEATHER_COLUMNS:
+        df[col] = round(weather[col].mean(), 2) if col in weather.columns else float("nan")
+
+    index = get_form_index()
+    form = index.form_as_of(year, index.round_of(year, gp_name), drivers=df["Driver"].astype(str))
+    df = df.merge(form, on="Driver", how="left")
+    return df.assign(Year=year, GP=gp_name)
+
+
+# Average historical form per driver from the combined training dataset
+def load_historical_form(historical_file=HISTORICAL_FEATURES):
+    if not os.path.exists(historical_file):
+        return None
+    history = pd.read_csv(historical_file, usecols=['Driver'] + FORM_COLUMNS)
+    return history.groupby("Driver")[FORM_COLUMNS].mean()
+
+
+# Model features beyond IMPORTANT_FEATURES (stint / lap delta features): added when absent and
+# filled with their race mean
+def fill_extra_features(df, features):
+    df = df.copy()
+    extra = [c for c in features if c not in IMPORTANT_FEATURES]
+    for col in extra:
+        if col not in df.columns:
+            df[col] = pd.NA
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    if extra:
+        df[extra] = df[extra].fillna(df.groupby(['Year', 'GP'])[extra].transform('mean'))
+    return df
+
+
+# Vectorized imputation: historical driver form join, then race means / mid-grid defaults.
+# Extra model features are filled by fill_extra_features.
+def fill_missing_features(df, form=None, features=IMPORTANT_FEATURES):
+    df = fill_extra_features(df, features)
+    for col in IMPORTANT_FEATURES:
+        if col not in df.columns:
+            df[col] = pd.NA
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    form = load_historical_form() if form is None else form
+    if form is not None:
+        filled = df[['Driver']].join(form, on='Driver')
+        for col in FORM_COLUMNS:
+            df[col] = df[col].fillna(filled[col])
+
+    race_means = df.groupby(['Year', 'GP'])[RACE_MEAN_COLUMNS].transform('mean')
+    df[RACE_MEAN_COLUMNS] = df[RACE_MEAN_COLUMNS].fillna(race_means)
+    df['PitStopCount'] = df['PitStopCount'].fillna(2)
+
+    # Fallback to mid-grid if still missing
+    df[['QualiPosition'] + FORM_COLUMNS] = df[['QualiPosition'] + FORM_COLUMNS].fillna(10)
+    return df
+
+
+# Score every event in one batched call and rank within each race
+def predict_events(events, model=None, version=None, write=True):
+    model = model or load_model(version)
+
+    df = load_event_features(events)
+    df = fill_missing_features(df, features=model.features)
+    df = df.dropna(subset=model.features)
+    if df.empty:
+        print("❌ No valid rows to predict.")
+        return df
+
+    df['PredictedScore'] = model.predict(df)
+    df['PredictedPosition'] = df.groupby(['Year', 'GP'])['PredictedScore'].rank(method='min').astype(int)
+    df = df.sort_values(['Year', 'GP', 'PredictedPosition']).reset_index(drop=True)
+
+    if write:
+        write_predictions(df)
+    return df
+
+
+def write_predictions(df):
+    for (year, gp_name), race in df.groupby(['Year', 'GP'], sort=False):
+        folder = race_folder(year, gp_name)
+        os.makedirs(folder, exist_ok=True)
+        race[OUTPUT_COLUMNS].to_csv(os.path.join(folder, "predicted_positions.csv"), index=False)
+        print(f"✅ {year} {gp_name}: predictions saved to {folder}")
+
+
+def parse_event(value):
+    year, gp_name = value.split(":", 1)
+    return int(year), gp_name
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Predict finishing positions for a list of events")
+    parser.add_argument("--events", nargs="*", type=parse_event, default=[],
+                        help='events as "YEAR:Grand Prix name"')
+    parser.add_argument("--season", type=int, nargs="*", default=[],
+                        help="predict every event of these seasons found in the session store")
+    parser.add_argument("--model-version", default=None,
+                        help='registry version, "latest", or omit for the pinned/latest model')
+    args = parser.parse_args()
+
+    events = list(args.events)
+    for year in args.season:
+        events.extend((y, gp) for y, gp, st in list_sessions(year) if st == "Q")
+    if not events:
+        parser.error("no events given")
+
+    df = predict_events(events, version=args.model_version)
+    for (year, gp_name), race in df.groupby(['Year', 'GP'], sort=False):
+        print(f"\n🏁 Predicted Race Order - {gp_name} {year}:")
+        print(race[OUTPUT_COLUMNS].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
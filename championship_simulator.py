@@ -0,0 +1,188 @@
+"""
+Created on Sat Oct 17 2026
+@author: sid
+
+Championship Simulator : Title odds and top-3 probabilities for drivers and teams.
+Starts from the points already scored in completed races (results Points / TeamName in the
+session store), scores every remaining round with the model, and simulates the rest of the season
+as a (sims x races x drivers) tensor: residual noise, optional DNF hazards, one argsort per race
+and a vectorized points-table lookup. Simulations run in chunks so 50k seasons stay within a
+few hundred MB.
+
+Usage:
+    python championship_simulator.py --year 2025 --sims 50000
+    python championship_simulator.py --year 2025 --as-of-round 3 --dnf
+"""
+
+import os
+import argparse
+import numpy as np
+import pandas as pd
+
+from session_store import BASE_PATH, load_season, list_sessions
+from results_index import completed_races, load_schedule
+from model_registry import load_model
+from batch_predict import predict_events
+from race_simulator import POINTS_TABLE, estimate_dnf_hazard, model_residuals
+
+RESULT_COLUMNS = ["Abbreviation", "TeamName", "Points", "Position"]
+
+
+# Season calendar in round order and the races already run, from the cached schedule
+def season_calendar(year):
+    calendar = load_schedule(year)['EventName'].tolist()
+    return calendar, completed_races(year)
+
+
+# Completed rounds = in the calendar, already run and with race results in the store
+def split_season(year, as_of_round=None):
+    calendar, run = season_calendar(year)
+    stored = {gp for y, gp, st in list_sessions(year, "R")}
+    completed = [gp for gp in calendar if gp in run and gp in stored]
+    if as_of_round is not None:
+        completed = completed[:as_of_round]
+    remaining = [gp for gp in calendar if gp not in completed]
+    return completed, remaining
+
+
+def completed_standings(year, completed):
+    """(drivers, teams): driver points with each driver's current team, and constructor points
+    summed from the per-race (TeamName, Points) rows, so points stay with the team that scored them."""
+    results = load_season("results", year, "R", RESULT_COLUMNS, events=completed)
+    if results.empty:
+        return pd.DataFrame(columns=["Driver", "TeamName", "Points"]), pd.DataFrame(columns=["TeamName", "Points"])
+    results["Points"] = pd.to_numeric(results["Points"], errors="coerce").fillna(0)
+    # Current team per driver, taken from the most recent completed round
+    results["RoundIdx"] = results["GP"].map({gp: i for i, gp in enumerate(completed)})
+    team = results.sort_values("RoundIdx").groupby("Abbreviation")["TeamName"].last()
+    points = results.groupby("Abbreviation")["Points"].sum()
+    drivers = pd.DataFrame({"Driver": points.index, "TeamName": team.reindex(points.index).values,
+                            "Points": points.values})
+    teams = results.dropna(subset=["TeamName"]).groupby("TeamName")["Points"].sum()
+    return drivers, pd.DataFrame({"TeamName": teams.index, "Points": teams.values})
+
+
+# (remaining races x drivers) model scores; rounds without features use each driver's mean score
+def remaining_scores(year, remaining, drivers, model):
+    scores = np.full((len(remaining), len(drivers)), np.nan, dtype=np.float32)
+    driver_pos = {d: i for i, d in enumerate(drivers)}
+    predicted = predict_events([(year, gp) for gp in remaining], model=model, write=False) if remaining else None
+    if predicted is not None and not predicted.empty:
+        race_pos = {gp: i for i, gp in enumerate(remaining)}
+        rows = predicted[predicted['Driver'].isin(driver_pos)]
+        scores[rows['GP'].map(race_pos).to_numpy(), rows['Driver'].map(driver_pos).to_numpy()] = rows['PredictedScore']
+
+    missing = np.isnan(scores)
+    if missing.any():
+        season = predict_events([(year, gp) for y, gp, st in list_sessions(year, "R")], model=model, write=False)
+        form = season.groupby('Driver')['PredictedScore'].mean() if not season.empty else pd.Series(dtype=float)
+        fallback = form.reindex(drivers).fillna(form.mean() if len(form) else 10.5).to_numpy(dtype=np.float32)
+        scores = np.where(missing, fallback[None, :], scores)
+        print(f"ℹ️ {int(missing.all(axis=1).sum())} remaining rounds have no features; using season-average scores")
+    return scores
+
+
+def simulate_points(scores, residuals, n_sims, dnf_hazard=None, chunk_size=5_000, seed=None):
+    """Generator of (chunk x drivers) points totals over the remaining races."""
+    rng = np.random.default_rng(seed)
+    n_races, n_drivers = scores.shape
+    table = np.zeros(n_drivers, dtype=np.float32)
+    table[:min(n_drivers, len(POINTS_TABLE))] = POINTS_TABLE[:n_drivers]
+    for start in range(0, n_sims, chunk_size):
+        n = min(chunk_size, n_sims - start)
+        sims = scores[None] + rng.choice(residuals, size=(n, n_races, n_drivers))
+        if dnf_hazard is not None:
+            dnf = rng.random(sims.shape, dtype=np.float32) < dnf_hazard
+            sims[dnf] = 1e6 + rng.random(int(dnf.sum()), dtype=np.float32)
+        order = np.argsort(sims, axis=2)
+        points = np.empty(sims.shape, dtype=np.float32)
+        np.put_along_axis(points, order, np.broadcast_to(table, sims.shape), axis=2)
+        yield points.sum(axis=1)
+
+
+def standings_probabilities(totals, rng):
+    """Title and top-3 indicators from (sims x competitors) totals; ties broken at random."""
+    jitter = rng.random(totals.shape, dtype=np.float32) * 1e-3
+    rank = np.argsort(np.argsort(-(totals + jitter), axis=1), axis=1)
+    return (rank == 0).sum(axis=0), (rank < 3).sum(axis=0)
+
+
+def simulate_championship(year, n_sims=50_000, as_of_round=None, use_dnf=False, model=None,
+                          chunk_size=5_000, seed=None, write=True):
+    model = model or load_model()
+    completed, remaining = split_season(year, as_of_round)
+    standings, team_standings = completed_standings(year, completed)
+    if standings.empty:
+        print(f"❌ No completed {year} races with results in the session store")
+        return None, None
+    print(f"🏆 {year}: {len(completed)} rounds completed, {len(remaining)} remaining, {n_sims} simulations")
+
+    drivers = standings["Driver"].tolist()
+    teams = sorted(set(team_standings["TeamName"]) | set(standings["TeamName"].dropna()))
+    # Maps only the remaining races' simulated points through each driver's current team
+    team_matrix = np.zeros((len(drivers), len(teams)), dtype=np.float32)
+    team_idx = standings["TeamName"].map({t: i for i, t in enumerate(teams)})
+    known = team_idx.notna().to_numpy()
+    team_matrix[np.flatnonzero(known), team_idx[known].astype(int)] = 1
+
+    scores = remaining_scores(year, remaining, drivers, model) if remaining else np.zeros((0, len(drivers)), np.float32)
+    dnf_hazard = estimate_dnf_hazard(drivers, range(year - 2, year + 1)) if use_dnf else None
+    current = standings["Points"].to_numpy(dtype=np.float32)
+    team_current = team_standings.set_index("TeamName")["Points"].reindex(teams).fillna(0).to_numpy(dtype=np.float32)
+
+    rng = np.random.default_rng(seed)
+    driver_title, driver_top3 = np.zeros(len(drivers)), np.zeros(len(drivers))
+    team_title, team_top3 = np.zeros(len(teams)), np.zeros(len(teams))
+    driver_points, team_points = np.zeros(len(drivers)), np.zeros(len(teams))
+    chunks = simulate_points(scores, model_residuals(model), n_sims, dnf_hazard, chunk_size, seed) if remaining else \
+        (np.zeros((min(chunk_size, n_sims - s), len(drivers)), np.float32) for s in range(0, n_sims, chunk_size))
+    for gained in chunks:
+        totals = current + gained
+        team_totals = team_current + gained @ team_matrix
+        title, top3 = standings_probabilities(totals, rng)
+        driver_title += title
+        driver_top3 += top3
+        driver_points += totals.sum(axis=0)
+        title, top3 = standings_probabilities(team_totals, rng)
+        team_title += title
+        team_top3 += top3
+        team_points += team_totals.sum(axis=0)
+
+    driver_table = pd.DataFrame({
+        "Driver": drivers, "TeamName": standings["TeamName"], "CurrentPoints": current,
+        "ExpectedPoints": driver_points / n_sims, "TitleProb": driver_title / n_sims, "Top3Prob": driver_top3 / n_sims
+    }).sort_values("ExpectedPoints", ascending=False).reset_index(drop=True)
+    team_table = pd.DataFrame({
+        "TeamName": teams, "CurrentPoints": team_current,
+        "ExpectedPoints": team_points / n_sims, "TitleProb": team_title / n_sims, "Top3Prob": team_top3 / n_sims
+    }).sort_values("ExpectedPoints", ascending=False).reset_index(drop=True)
+
+    if write:
+        driver_table.to_csv(os.path.join(BASE_PATH, f"championship_{year}_drivers.csv"), index=False)
+        team_table.to_csv(os.path.join(BASE_PATH, f"championship_{year}_teams.csv"), index=False)
+        print(f"✅ Championship probabilities saved to {BASE_PATH}")
+    return driver_table, team_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate the rest of a season's championship")
+    parser.add_argument("--year", type=int, default=2025)
+    parser.add_argument("--sims", type=int, default=50_000)
+    parser.add_argument("--as-of-round", type=int, default=None,
+                        help="treat only the first N completed rounds as run (hindcasting)")
+    parser.add_argument("--dnf", action="store_true", help="apply per-driver DNF hazards")
+    parser.add_argument("--chunk-size", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    drivers, teams = simulate_championship(args.year, args.sims, args.as_of_round, args.dnf,
+                                           chunk_size=args.chunk_size, seed=args.seed)
+    if drivers is not None:
+        print("\n🏁 Drivers' championship:")
+        print(drivers.round(3).to_string(index=False))
+        print("\n🏭 Constructors' championship:")
+        print(teams.round(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
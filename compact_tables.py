@@ -0,0 +1,161 @@
+"""
+Created on Sat Oct 17 2026
+@author: sid
+
+Compact Tables : Memory-lean loader for the session store's laps / results / weather tables.
+Only the requested columns are read. Drivers, teams, compounds and other labels become
+categoricals whose codes come from a stable cross-season dictionary (category_codes.json), counters
+become int16, measurements float32 and durations int32 milliseconds (renamed with an "Ms"
+suffix). Seasons are converted one at a time, so the wide default-dtype frame of only one season is
+ever in memory.
+
+Usage:
+    python compact_tables.py --table laps --years 2021 2022 2023 2024 2025
+    python compact_tables.py --table results --years 2025 --columns Abbreviation TeamName Position
+"""
+
+import os
+import json
+import argparse
+import numpy as np
+import pandas as pd
+
+from session_store import BASE_PATH, DATE_COLUMNS, TIME_COLUMNS, load_season
+from timedelta_parser import to_milliseconds
+
+CATEGORY_FILE = os.path.join(BASE_PATH, "category_codes.json")
+
+# Columns sharing one code dictionary (a driver's code is the same in laps and results)
+DICTIONARIES = {
+    "Driver": "driver", "Abbreviation": "driver",
+    "Team": "team", "TeamName": "team",
+    "Compound": "compound", "GP": "event",
+    "Status": "status", "TrackStatus": "track_status",
+    "DriverNumber": "driver_number",
+}
+
+COUNTER_COLUMNS = ["LapNumber", "Stint", "TyreLife", "Position", "GridPosition", "Year"]
+
+# Wide identity / presentation columns that analysis never needs
+SKIPPED_COLUMNS = ["BroadcastName", "DriverId", "TeamColor", "TeamId", "FirstName", "LastName",
+                   "FullName", "HeadshotUrl", "CountryCode"]
+
+_dictionaries = None
+
+
+def load_dictionaries(path=CATEGORY_FILE):
+    global _dictionaries
+    if _dictionaries is None:
+        _dictionaries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                _dictionaries = json.load(f)
+    return _dictionaries
+
+
+def save_dictionaries(path=CATEGORY_FILE):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(load_dictionaries(path), f, indent=2)
+    os.replace(tmp_path, path)
+
+
+# Categorical with codes from the shared dictionary; unseen values are appended, never reordered
+def encode(values, name):
+    dictionaries = load_dictionaries()
+    known = dictionaries.setdefault(name, [])
+    seen = set(known)
+    new = [v for v in pd.unique(values.dropna().astype(str)) if v not in seen]
+    if new:
+        known.extend(sorted(new))
+        save_dictionaries()
+    return pd.Categorical(values.astype("string"), categories=known)
+
+
+def compact_frame(df, table):
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if col in TIME_COLUMNS[table]:
+            out[f"{col}Ms"] = pd.Series(to_milliseconds(s), index=df.index).astype("Int32")
+        elif col in DATE_COLUMNS[table]:
+            out[col] = pd.to_datetime(s, errors="coerce")
+        elif col in DICTIONARIES:
+            out[col] = encode(s, DICTIONARIES[col])
+        elif col in COUNTER_COLUMNS:
+            out[col] = pd.to_numeric(s, errors="coerce").round().astype("Int16")
+        elif pd.api.types.is_bool_dtype(s):
+            out[col] = s.astype("boolean")
+        elif pd.api.types.is_numeric_dtype(s):
+            out[col] = s.astype(np.float32)
+        else:
+            out[col] = s.astype("category")
+    return pd.DataFrame(out, index=df.index)
+
+
+def default_columns(table, years, session_type):
+    for year in years:
+        frame = load_season(table, year, session_type)
+        if not frame.empty:
+            return [c for c in frame.columns if c not in SKIPPED_COLUMNS and c not in ("Year", "GP")]
+    return []
+
+
+def load_compact(table, years, session_type="R", columns=None, events=None):
+    """One compact frame (Year, GP + requested columns) for several seasons of a store table."""
+    years = [years] if isinstance(years, int) else list(years)
+    columns = columns or default_columns(table, years, session_type)
+    frames = []
+    for year in years:
+        season = load_season(table, year, session_type, columns, events=events)
+        if not season.empty:
+            frames.append(compact_frame(season, table))
+    if not frames:
+        return pd.DataFrame()
+    # The dictionaries only grow, so widening earlier seasons to the final categories keeps their codes
+    dictionaries = load_dictionaries()
+    for frame in frames:
+        for col in frame.columns.intersection(list(DICTIONARIES)):
+            frame[col] = frame[col].cat.set_categories(dictionaries[DICTIONARIES[col]])
+    df = pd.concat(frames, ignore_index=True)
+    # Per-season categoricals of non-dictionary columns may differ; re-unify them after concat
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def memory_report(df):
+    """Bytes per column (deep) as a frame sorted largest first, plus a TOTAL row."""
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({"Column": usage.index, "Dtype": df.dtypes.astype(str).values,
+                           "MB": usage.values / 1e6})
+    report = report.sort_values("MB", ascending=False).reset_index(drop=True)
+    total = pd.DataFrame([{"Column": "TOTAL", "Dtype": "", "MB": report["MB"].sum()}])
+    return pd.concat([report, total], ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load store tables compactly and report memory use")
+    parser.add_argument("--table", choices=["laps", "results", "weather"], default="laps")
+    parser.add_argument("--years", type=int, nargs="+", default=[2021, 2022, 2023, 2024, 2025])
+    parser.add_argument("--session", default="R")
+    parser.add_argument("--columns", nargs="*", default=None)
+    args = parser.parse_args()
+
+    compact = load_compact(args.table, args.years, args.session, args.columns)
+    if compact.empty:
+        print(f"❌ No {args.table} in the session store for {args.years}")
+        return
+    columns = args.columns or default_columns(args.table, args.years, args.session)
+    baseline = sum(load_season(args.table, y, args.session, columns).memory_usage(deep=True).sum()
+                   for y in args.years) / 1e6
+    report = memory_report(compact)
+    print(report.round(3).to_string(index=False))
+    total = report["MB"].iloc[-1]
+    print(f"\n🗜️ {len(compact)} {args.table} rows: {total:.1f} MB compact vs {baseline:.1f} MB "
+          f"with default dtypes ({total / baseline:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Created on Sat Oct 17 2026
+@author: sid
+
+Driver Form Index : Running sums and counts of qualifying/finishing positions per driver,
+keyed by (year, round). Adding a race is O(drivers) and the "as-of" form for any race is a
+single row lookup, so season builds no longer rescan every driver_form.csv per Grand Prix.
+"""
+
+import os
+import copy
+import bisect
+import numpy as np
+import pandas as pd
+
+BASE_PATH = r'/Users/sid/Downloads/F1_RacePredictions'
+FORM_INDEX_FILE = os.path.join(BASE_PATH, "driver_form_index.csv")
+
+FORM_COLUMNS = ['AvgQualifyingPosition', 'AvgFinishingPosition']
+
+_loaded_indexes = {}
+
+
+class DriverFormIndex:
+    """Prefix sums over races: cum[i] holds (sum, count) per driver and form column for all races before keys[i]."""
+
+    def __init__(self, path=FORM_INDEX_FILE):
+        self.path = path
+        self.keys = []          # sorted (year, round)
+        self.gp_names = []      # GP name per key
+        self.drivers = []
+        self.driver_pos = {}
+        self.key_pos = {}
+        self.gp_round = {}      # (year, GP name) -> round
+        # deltas[i, d] = (quali_sum, quali_count, finish_sum, finish_count) for race i
+        self.deltas = np.zeros((0, 0, 4))
+        self.cum = np.zeros((1, 0, 4))
+
+    # === Building ===
+    def _ensure_drivers(self, drivers):
+        new = [d for d in drivers if d not in self.driver_pos]
+        if not new:
+            return
+        for d in new:
+            self.driver_pos[d] = len(self.drivers)
+            self.drivers.append(d)
+        pad = ((0, 0), (0, len(new)), (0, 0))
+        self.deltas = np.pad(self.deltas, pad)
+        self.cum = np.pad(self.cum, pad)
+
+    def _race_delta(self, form_df):
+        delta = np.zeros((len(self.drivers), 4))
+        idx = form_df['Driver'].map(self.driver_pos).to_numpy()
+        for j, col in enumerate(FORM_COLUMNS):
+            values = pd.to_numeric(form_df[col], errors='coerce').to_numpy(dtype=float)
+            valid = ~np.isnan(values)
+            np.add.at(delta[:, 2 * j], idx[valid], values[valid])
+            np.add.at(delta[:, 2 * j + 1], idx[valid], 1)
+        return delta
+
+    def round_of(self, year, gp_name):
+        """Round already assigned to this GP, or the next free round of the season."""
+        if (year, gp_name) in self.gp_round:
+            return self.gp_round[(year, gp_name)]
+        rounds = [r for y, r in self.keys if y == year]
+        return max(rounds, default=0) + 1
+
+    def assign_rounds(self, year, gp_names):
+        """Rounds for a season's races in calendar order, keeping rounds already assigned."""
+        next_round = max([r for y, r in self.keys if y == year], default=0) + 1
+        rounds = {}
+        for gp in gp_names:
+            if (year, gp) in self.gp_round:
+                rounds[gp] = self.gp_round[(year, gp)]
+            else:
+                rounds[gp] = next_round
+                next_round += 1
+        return rounds
+
+    def add_race(self, year, round_number, gp_name, form_df):
+        """Add or replace one race's driver form (Driver, AvgQualifyingPosition, AvgFinishingPosition)."""
+        key = (year, round_number)
+        self._ensure_drivers(form_df['Driver'].astype(str).tolist())
+        form_df = form_df.assign(Driver=form_df['Driver'].astype(str))
+        delta = self._race_delta(form_df)
+        self.gp_round[(year, gp_name)] = round_number
+
+        if key in self.key_pos:
+            i = self.key_pos[key]
+            if self.gp_names[i] != gp_name:
+                self.gp_round.pop((year, self.gp_names[i]), None)
+            self.deltas[i] = delta
+            self.gp_names[i] = gp_name
+            self._rebuild_from(i)
+        elif not self.keys or key > self.keys[-1]:
+            # Common case: appending the next race is O(drivers)
+            self.keys.append(key)
+            self.gp_names.append(gp_name)
+            self.key_pos[key] = len(self.keys) - 1
+            self.deltas = np.concatenate([self.deltas, delta[None]])
+            self.cum = np.concatenate([self.cum, (self.cum[-1] + delta)[None]])
+        else:
+            i = bisect.bisect_left(self.keys, key)
+            self.keys.insert(i, key)
+            self.gp_names.insert(i, gp_name)
+            self.key_pos = {k: n for n, k in enumerate(self.keys)}
+            self.deltas = np.insert(self.deltas, i, delta, axis=0)
+            self.cum = np.insert(self.cum, i + 1, 0, axis=0)
+            self._rebuild_from(i)
+
+    def _rebuild_from(self, i):
+        self.cum[i + 1:] = self.cum[i] + np.cumsum(self.deltas[i:], axis=0)
+
+    def copy(self):
+        return copy.deepcopy(self)
+
+    # === Queries ===
+    def _form_frame(self, state, drivers=None):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            quali = state[:, 0] / state[:, 1]
+            finish = state[:, 2] / state[:, 3]
+        form = pd.DataFrame({
+            'Driver': self.drivers,
+            'AvgQualifyingPosition': quali,
+            'AvgFinishingPosition': finish
+        })
+        if drivers is not None:
+            return pd.DataFrame({'Driver': list(drivers)}).merge(form, on='Driver', how='left')
+        return form[(state[:, 1] > 0) | (state[:, 3] > 0)].reset_index(drop=True)
+
+    def form_as_of(self, year, round_number, drivers=None):
+        """Average form over every race strictly before (year, round_number)."""
+        key = (year, round_number)
+        row = self.key_pos[key] if key in self.key_pos else bisect.bisect_left(self.keys, key)
+        return self._form_frame(self.cum[row], drivers)
+
+    def form_before_season(self, year, drivers=None):
+        """Average form over all races of seasons before `year`."""
+        return self.form_as_of(year, 0, drivers)
+
+    # === Persistence ===
+    def to_frame(self):
+        rows = []
+        for i, ((year, rnd), gp) in enumerate(zip(self.keys, self.gp_names)):
+            d = self.deltas[i]
+            present = (d[:, 1] > 0) | (d[:, 3] > 0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                rows.append(pd.DataFrame({
+                    'Year': year,
+                    'Round': rnd,
+                    'GP': gp,
+                    'Driver': np.array(self.drivers, dtype=object)[present],
+                    'AvgQualifyingPosition': (d[:, 0] / d[:, 1])[present],
+                    'AvgFinishingPosition': (d[:, 2] / d[:, 3])[present]
+                }))
+        if not rows:
+            return pd.DataFrame(columns=['Year', 'Round', 'GP', 'Driver'] + FORM_COLUMNS)
+        return pd.concat(rows, ignore_index=True)
+
+    def save(self, path=None):
+        path = path or self.path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.to_frame().to_csv(path, index=False)
+
+    @classmethod
+    def load(cls, path=FORM_INDEX_FILE):
+        index = cls(path)
+        if not os.path.exists(path):
+            return index
+        df = pd.read_csv(path)
+        if df.empty:
+            return index
+
+        # Rebuild the prefix sums in one vectorized pass
+        index.keys = [tuple(k) for k in df[['Year', 'Round']].drop_duplicates().sort_values(['Year', 'Round']).to_numpy().tolist()]
+        index.key_pos = {k: i for i, k in enumerate(index.keys)}
+        gp_by_key = df.groupby(['Year', 'Round'])['GP'].first()
+        index.gp_names = [gp_by_key.loc[k] for k in index.keys]
+        index.gp_round = {(y, gp): r for (y, r), gp in zip(index.keys, index.gp_names)}
+        index.drivers = df['Driver'].astype(str).unique().tolist()
+        index.driver_pos = {d: i for i, d in enumerate(index.drivers)}
+
+        race_idx = np.array([index.key_pos[k] for k in zip(df['Year'], df['Round'])])
+        driver_idx = df['Driver'].astype(str).map(index.driver_pos).to_numpy()
+        index.deltas = np.zeros((len(index.keys), len(index.drivers), 4))
+        for j, col in enumerate(FORM_COLUMNS):
+            values = df[col].to_numpy(dtype=float)
+            valid = ~np.isnan(values)
+            np.add.at(index.deltas[:, :, 2 * j], (race_idx[valid], driver_idx[valid]), values[valid])
+            np.add.at(index.deltas[:, :, 2 * j + 1], (race_idx[valid], driver_idx[valid]), 1)
+        index.cum = np.concatenate([np.zeros((1, len(index.drivers), 4)), np.cumsum(index.deltas, axis=0)])
+        return index
+
+
+# Shared, lazily-loaded index per file path
+def get_form_index(path=FORM_INDEX_FILE):
+    if path not in _loaded_indexes:
+        _loaded_indexes[path] = DriverFormIndex.load(path)
+    return _loaded_indexes[path]
+
+
+# Seed the index from existing {year}_{gp}_R/driver_form.csv files (one-off).
+# Rounds are the season schedule's round numbers; races missing from it follow in name order.
+def build_from_driver_form_files(years, path=FORM_INDEX_FILE):
+    # Imported here: the schedule (and its session store fallback) is only needed to seed the index
+    from results_index import load_schedule
+
+    index = DriverFormIndex(path)
+    for year in years:
+        form_files = {}
+        for folder in os.listdir(BASE_PATH):
+            form_path = os.path.join(BASE_PATH, folder, "driver_form.csv")
+            if folder.startswith(f"{year}_") and folder.endswith("_R") and os.path.exists(form_path):
+                form_files[folder[len(f"{year}_"):-len("_R")]] = form_path
+        if not form_files:
+            continue
+
+        schedule = load_schedule(year)
+        rounds = dict(zip(schedule["EventName"], schedule["RoundNumber"].astype(int)))
+        scheduled = sorted((gp for gp in form_files if gp in rounds), key=rounds.get)
+        unscheduled = sorted(gp for gp in form_files if gp not in rounds)
+        next_round = max(rounds.values(), default=0) + 1
+        if unscheduled:
+            print(f"⚠️ {year}: not on the schedule, added from round {next_round}: {unscheduled}")
+        for gp_name in scheduled:
+            index.add_race(year, rounds[gp_name], gp_name, pd.read_csv(form_files[gp_name]))
+        for next_round, gp_name in enumerate(unscheduled, start=next_round):
+            index.add_race(year, next_round, gp_name, pd.read_csv(form_files[gp_name]))
+    index.save()
+    _loaded_indexes[path] = index
+    print(f"✅ Driver form index built with {len(index.keys)} races: {path}")
+    return index
+
+
+if __name__ == "__main__":
+    build_from_driver_form_files(range(2021, 2026))
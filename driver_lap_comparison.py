@@ -4,45 +4,39 @@ Lap Time and Sector Comparison between Top Drivers
 FastF1 styled plots with professional visualization
 """
 
-import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 import os
-import fastf1
-import fastf1.plotting
-
-# Setup FastF1 plotting style
-fastf1.plotting.setup_mpl(mpl_timedelta_support=True, misc_mpl_mods=True, color_scheme='fastf1')
+from session_store import read_table
+from lap_deltas import DELTA_COLUMNS, LapIndex
+from session_catalog import session_info, setup_plot_style
 
 BASE_PATH = r"/Users/sid/Downloads/F1_RacePredictions"
+IMAGE_FOLDER = os.path.join(BASE_PATH, "images")
 
 # Top drivers we want to compare
 Top_Drivers = ["VER", "PIA", "NOR", "RUS", "LEC"]
 
+# Saved chart path, e.g. images/2025_Jeddah_lap_time_comparison.png
+def chart_file(year, gp_name, chart):
+    return os.path.join(IMAGE_FOLDER, f"{year}_{gp_name}_{chart}.png")
+
+# Laps indexed once by (driver, lap); every driver / sector is an array slice (see lap_deltas.py)
 def load_laps(year, gp_name, session_type='R'):
-    folder = os.path.join(BASE_PATH, f"{year}_{gp_name}_{session_type}")
-    laps_path = os.path.join(folder, "laps.csv")
-    laps_df = pd.read_csv(laps_path)
-    return laps_df
-
-def preprocess_laps(laps_df):
-    # Convert lap and sector times to seconds
-    laps_df["LapTime"] = pd.to_timedelta(laps_df["LapTime"], errors='coerce')
-    laps_df["LapTimeSec"] = laps_df["LapTime"].dt.total_seconds()
-    for sector in ["Sector1Time", "Sector2Time", "Sector3Time"]:
-        laps_df[sector] = pd.to_timedelta(laps_df[sector], errors='coerce')
-        laps_df[sector + "Sec"] = laps_df[sector].dt.total_seconds()
-    return laps_df
-
-def plot_lap_time_comparison(laps_df, session, year, gp_name):
-    fig, ax = plt.subplots(figsize=(14, 7))
+    return LapIndex(read_table("laps", year, gp_name, session_type, DELTA_COLUMNS))
+
+def plot_driver_traces(ax, laps, session, drivers, metric):
+    lap_numbers = np.arange(1, laps.n_laps + 1)
+    times = laps.series(drivers, metric)
+    for driver, driver_times in zip([laps.drivers[i] for i in laps.driver_index(drivers)], times):
+        team_color = session.team_color(laps.teams.get(driver, "Unknown"))
+        ax.plot(lap_numbers, driver_times, label=driver, color=team_color)
 
-    for driver in Top_Drivers:
-        driver_laps = laps_df[laps_df["Driver"] == driver]
-        if not driver_laps.empty:
-            team = driver_laps['Team'].iloc[0] if 'Team' in driver_laps.columns else "Unknown"
-            team_color = fastf1.plotting.get_team_color(team, session=session)
+def plot_lap_time_comparison(laps, session, year, gp_name, drivers=Top_Drivers):
+    setup_plot_style()
+    fig, ax = plt.subplots(figsize=(14, 7))
 
-            ax.plot(driver_laps["LapNumber"], driver_laps["LapTimeSec"], label=driver, color=team_color)
+    plot_driver_traces(ax, laps, session, drivers, "LapTime")
 
     ax.set_xlabel("Lap Number")
     ax.set_ylabel("Lap Time (seconds)")
@@ -50,26 +44,19 @@ def plot_lap_time_comparison(laps_df, session, year, gp_name):
     ax.legend()
     ax.grid(True)
 
-    output_folder = os.path.join(BASE_PATH, "images")
-    os.makedirs(output_folder, exist_ok=True)
-    plt.savefig(os.path.join(output_folder, f"{year}_{gp_name}_lap_time_comparison.png"))
+    os.makedirs(IMAGE_FOLDER, exist_ok=True)
+    plt.savefig(chart_file(year, gp_name, "lap_time_comparison"))
     plt.show()
 
-def plot_sector_time_comparison(laps_df, session, year, gp_name):
+def plot_sector_time_comparison(laps, session, year, gp_name, drivers=Top_Drivers):
+    setup_plot_style()
     fig, axes = plt.subplots(3, 1, figsize=(14, 12), sharex=True)
 
-    sectors = ["Sector1TimeSec", "Sector2TimeSec", "Sector3TimeSec"]
+    sectors = ["Sector1Time", "Sector2Time", "Sector3Time"]
     titles = ["Sector 1 Time", "Sector 2 Time", "Sector 3 Time"]
 
     for idx, sector in enumerate(sectors):
-        for driver in Top_Drivers:
-            driver_laps = laps_df[laps_df["Driver"] == driver]
-            if not driver_laps.empty:
-                team = driver_laps['Team'].iloc[0] if 'Team' in driver_laps.columns else "Unknown"
-                team_color = fastf1.plotting.get_team_color(team, session=session)
-
-                axes[idx].plot(driver_laps["LapNumber"], driver_laps[sector], label=driver, color=team_color)
-
+        plot_driver_traces(axes[idx], laps, session, drivers, sector)
         axes[idx].set_ylabel("Sector Time (seconds)")
         axes[idx].set_title(f"{titles[idx]} Comparison")
         axes[idx].grid(True)
@@ -78,23 +65,24 @@ def plot_sector_time_comparison(laps_df, session, year, gp_name):
     plt.suptitle(f"Sector Time Comparison\n{session.event['EventName']} {year} {session.name}", fontsize=16)
     axes[0].legend()
 
-    output_folder = os.path.join(BASE_PATH, "images")
-    os.makedirs(output_folder, exist_ok=True)
-    plt.savefig(os.path.join(output_folder, f"{year}_{gp_name}_sector_time_comparison.png"))
+    os.makedirs(IMAGE_FOLDER, exist_ok=True)
+    plt.savefig(chart_file(year, gp_name, "sector_time_comparison"))
     plt.show()
 
-def analyze_driver_comparison(year, gp_name):
-    # Load FastF1 session for metadata (event name, year, etc.)
-    session = fastf1.get_session(year, gp_name, 'R')
-    session.load()
+def analyze_driver_comparison(year, gp_name, drivers=Top_Drivers):
+    # Event name, session name and team colours from the local catalog (no FastF1 load)
+    session = session_info(year, gp_name, 'R')
 
-    # Load locally saved laps data
-    laps = load_laps(year, gp_name)
-    laps = preprocess_laps(laps)
+    # Load locally saved laps data, indexed by (driver, lap)
+    laps = load_laps(year, session.event_name)
 
     # Create plots
-    plot_lap_time_comparison(laps, session, year, gp_name)
-    plot_sector_time_comparison(laps, session, year, gp_name)
+    plot_lap_time_comparison(laps, session, year, gp_name, drivers)
+    plot_sector_time_comparison(laps, session, year, gp_name, drivers)
+
+    # Mean lap time delta between every pair of the compared drivers
+    print(f"\n⏱️ Mean lap time delta (row - column, s), {session.event_name} {year}:")
+    print(laps.delta_frame(drivers).round(3).to_string())
 
 if __name__ == "__main__":
     analyze_driver_comparison(2025, "Jeddah")
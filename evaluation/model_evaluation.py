@@ -3,100 +3,89 @@ Evaluate the trained race prediction model on specific Grand Prix feature files.
 """
 
 import os
-import joblib
+import sys
 import pandas as pd
-import numpy as np
 import warnings
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from model_registry import load_model
+from backtest import aggregate_metrics, fill_form, race_metrics
+from batch_predict import fill_extra_features
+from grid_transitions import benchmark as grid_baseline_benchmark
 
 warnings.filterwarnings('ignore')
 
 # === Paths ===
 BASE_PATH = '/Users/sid/Downloads/F1_RacePredictions'
-MODEL_FILE = os.path.join(BASE_PATH, "race_result_regressor_v2.pkl")
-SCALER_FILE = os.path.join(BASE_PATH, "scaler_v2.pkl")
 HISTORICAL_FEATURES = os.path.join(BASE_PATH, "combined_engineered_features.csv")
 
-important_features = [
-    'QualiPosition',
-    'PitStopCount',
-    'AvgRaceLapTime',
-    'AirTemp',
-    'TrackTemp',
-    'Humidity',
-    'AvgFinishingPosition',
-    'AvgQualifyingPosition'
-]
-
-def load_model_and_scaler():
-    model = joblib.load(MODEL_FILE)
-    scaler = joblib.load(SCALER_FILE)
-    print(f"✅ Using model: {os.path.basename(MODEL_FILE)}")
-    print(f"✅ Using scaler: {os.path.basename(SCALER_FILE)}")
-    return model, scaler
-
 def load_driver_form():
     df = pd.read_csv(HISTORICAL_FEATURES)
     return df.groupby("Driver")[['AvgQualifyingPosition', 'AvgFinishingPosition']].mean()
 
-def evaluate_model_on_race(year, gp_name, driver_form):
-    print(f"\n🔍 Evaluating model for {year} {gp_name}...")
-
-    race_file = os.path.join(BASE_PATH, f"{year}_{gp_name}_R", "features.csv")
-    if not os.path.exists(race_file):
-        print(f" Feature file missing: {race_file}")
-        return
-
-    df = pd.read_csv(race_file)
-    if 'Driver' not in df.columns:
-        print(f" No Driver column in {race_file}")
-        return
-
-    # Fill missing AvgQuali/Finish using historical averages
-    for col in ['AvgQualifyingPosition', 'AvgFinishingPosition']:
-        if col not in df.columns:
-            df[col] = np.nan
-
-    for i, row in df.iterrows():
-        if pd.isna(row['AvgQualifyingPosition']) and row['Driver'] in driver_form.index:
-            df.at[i, 'AvgQualifyingPosition'] = driver_form.loc[row['Driver'], 'AvgQualifyingPosition']
-        if pd.isna(row['AvgFinishingPosition']) and row['Driver'] in driver_form.index:
-            df.at[i, 'AvgFinishingPosition'] = driver_form.loc[row['Driver'], 'AvgFinishingPosition']
+# Every selected race's features.csv in one frame (Year/GP from the race), with form and extra model features filled
+def load_race_features(races, driver_form, model):
+    frames = []
+    for year, gp_name in races:
+        race_file = os.path.join(BASE_PATH, f"{year}_{gp_name}_R", "features.csv")
+        if not os.path.exists(race_file):
+            print(f" Feature file missing: {race_file}")
+            continue
+        df = pd.read_csv(race_file)
+        if 'Driver' not in df.columns:
+            print(f" No Driver column in {race_file}")
+            continue
+        frames.append(df.assign(Year=year, GP=gp_name))
+    if not frames:
+        return None
+
+    # Fill missing AvgQuali/Finish using historical averages; extra model features
+    # (--stint-features / --delta-features) missing from older files get their race mean
+    df = fill_form(pd.concat(frames, ignore_index=True), driver_form)
+    df = fill_extra_features(df, model.features)
 
     # Drop rows with missing input or target features
-    df = df.dropna(subset=important_features + ['FinalPosition'])
-    if df.empty:
-        print("⚠️ No valid rows to evaluate.")
-        return
-
-    X = df[important_features]
-    y_true = df['FinalPosition']
+    return df.dropna(subset=model.features + ['FinalPosition']).reset_index(drop=True)
 
-    model, scaler = load_model_and_scaler()
-    X_scaled = scaler.transform(X)
-    y_pred = model.predict(X_scaled)
-
-    mae = mean_absolute_error(y_true, y_pred)
-    rmse = mean_squared_error(y_true, y_pred, squared=False)
-    r2 = r2_score(y_true, y_pred)
-
-    print(f"📊 MAE: {mae:.2f}, RMSE: {rmse:.2f}, R²: {r2:.2f}")
-
-    results_df = df[['Driver']].copy()
-    results_df['Actual'] = y_true
-    results_df['Predicted'] = np.round(y_pred, 1)
-    results_df['AbsError'] = np.abs(y_true - y_pred)
-
-    print(results_df.sort_values(by='Actual').head(10))
-
-if __name__ == "__main__":
+# Score the races in one predict call; metrics come from backtest.race_metrics / aggregate_metrics
+def evaluate_races(races, driver_form=None, model=None):
+    model = model or load_model()
+    df = load_race_features(races, driver_form, model)
+    if df is None or df.empty:
+        print("⚠️ No valid rows to evaluate.")
+        return None
+
+    df['Predicted'] = model.predict(df[model.features])
+    per_race = race_metrics(df)
+    for (year, gp_name), race in df.groupby(['Year', 'GP'], sort=False):
+        metrics = per_race[(per_race['Year'] == year) & (per_race['GP'] == gp_name)].iloc[0]
+        print(f"\n🔍 {year} {gp_name}")
+        print(f"📊 MAE: {metrics['MAE']:.2f}, RMSE: {metrics['RMSE']:.2f}, R²: {metrics['R2']:.2f}, "
+              f"Spearman: {metrics['Spearman']:.2f}")
+        results_df = race[['Driver']].assign(
+            Actual=race['FinalPosition'], Predicted=race['Predicted'].round(1),
+            AbsError=(race['FinalPosition'] - race['Predicted']).abs())
+        print(results_df.sort_values(by='Actual').head(10))
+    return pd.concat([per_race, aggregate_metrics(df, per_race)], ignore_index=True)
+
+def evaluate_test_races(version=None):
     driver_form = load_driver_form()
+    model = load_model(version)
+    print(f"✅ Using model: {model.version}")
 
     test_races = [
         (2024, "Miami"),
         (2025, "Jeddah"),
         (2025, "Miami")
     ]
+    report = evaluate_races(test_races, driver_form, model)
+    if report is not None:
+        print("\n📊 Test races:")
+        print(report.round(3).to_string(index=False))
 
-    for year, gp in test_races:
-        evaluate_model_on_race(year, gp, driver_form)
\ No newline at end of file
+    # Same held-out races scored by the grid -> finish transition baseline
+    print("\n⚖️ Model vs grid baseline (latest races held out):")
+    print(grid_baseline_benchmark(model).round(3).to_string(index=False))
+
+if __name__ == "__main__":
+    evaluate_test_races()
\ No newline at end of file
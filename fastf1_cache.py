@@ -0,0 +1,289 @@
+"""
+Created on Sat Oct 17 2026
+@author: sid
+
+FastF1 Cache Manager : One shared FastF1 cache configuration for every script, with integrity checks,
+a size cap and hit/miss statistics. New or changed .ff1pkl entries are unpickled once and only the
+corrupt ones are evicted (instead of deleting the whole schedule cache on every run). When the cache
+grows past its cap, whole sessions are evicted least recently used first. Verification results,
+access times and cumulative statistics live in cache_index.json next to the cache.
+
+Usage:
+    python fastf1_cache.py --stats
+    python fastf1_cache.py --limit-mb 4096 --verify-all
+"""
+
+import os
+import json
+import time
+import pickle
+import shutil
+import sqlite3
+import logging
+import argparse
+import threading
+
+from session_store import BASE_PATH
+
+CACHE_PATH = os.path.join(BASE_PATH, 'cache')
+INDEX_FILENAME = "cache_index.json"
+HTTP_CACHE = "fastf1_http_cache.sqlite"
+CACHE_LIMIT_MB = 4096
+# The raw HTTP cache may use at most this share of the cap; it is rebuilt from scratch when over
+HTTP_CACHE_SHARE = 0.5
+
+# FastF1 logs one of these per parsed API request (fastf1.req.Cache.api_request_wrapper)
+HIT_MESSAGES = ("Using cached data",)
+MISS_MESSAGES = ("No cached data found", "Updating cache")
+
+
+class CacheStats(logging.Handler):
+    """Counts FastF1 cache hits and misses from its log records."""
+
+    def __init__(self):
+        super().__init__(level=logging.INFO)
+        self.hits = 0
+        self.misses = 0
+
+    # Handler.handle already holds the handler's lock around emit
+    def emit(self, record):
+        message = record.getMessage()
+        if message.startswith(HIT_MESSAGES):
+            self.hits += 1
+        elif message.startswith(MISS_MESSAGES):
+            self.misses += 1
+
+
+class CacheManager:
+    def __init__(self, path=CACHE_PATH, limit_mb=CACHE_LIMIT_MB):
+        self.path = path
+        self.limit_bytes = int(limit_mb * 1024 ** 2)
+        self.index_path = os.path.join(path, INDEX_FILENAME)
+        self.lock = threading.Lock()
+        self.stats = CacheStats()
+        self.index = {"entries": {}, "units": {}, "totals": {}}
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path) as f:
+                    self.index = json.load(f)
+            except (OSError, ValueError):
+                print("⚠️ Cache index unreadable; re-verifying every entry")
+
+    # Eviction unit of a cache file: its session folder (year/event/session), else the file itself
+    def unit_of(self, relpath):
+        parts = relpath.split(os.sep)
+        return os.sep.join(parts[:3]) if len(parts) > 3 else relpath
+
+    def scan(self):
+        files = {}
+        for root, _, names in os.walk(self.path):
+            for name in names:
+                if name.endswith(".ff1pkl"):
+                    full = os.path.join(root, name)
+                    st = os.stat(full)
+                    files[os.path.relpath(full, self.path)] = (st.st_size, st.st_mtime)
+        return files
+
+    @staticmethod
+    def is_valid(full_path):
+        try:
+            with open(full_path, "rb") as f:
+                cached = pickle.load(f)
+            return isinstance(cached, dict) and "version" in cached and "data" in cached
+        except Exception:
+            return False
+
+    def verify(self, verify_all=False):
+        """Unpickle new/changed entries; delete only the ones that fail. Returns removed paths."""
+        entries = self.index["entries"]
+        files = self.scan()
+        removed = []
+        for relpath, (size, mtime) in files.items():
+            known = entries.get(relpath)
+            if not verify_all and known and known["size"] == size and known["mtime"] == mtime:
+                continue
+            full = os.path.join(self.path, relpath)
+            if size > 0 and self.is_valid(full):
+                entries[relpath] = {"size": size, "mtime": mtime}
+            else:
+                os.remove(full)
+                entries.pop(relpath, None)
+                removed.append(relpath)
+        for relpath in set(entries) - set(files):
+            del entries[relpath]
+
+        http_cache = os.path.join(self.path, HTTP_CACHE)
+        if os.path.exists(http_cache) and not self.http_cache_ok(http_cache):
+            os.remove(http_cache)
+            removed.append(HTTP_CACHE)
+        if removed:
+            print(f"🩹 Evicted {len(removed)} corrupt cache entries: {', '.join(removed[:5])}"
+                  f"{' ...' if len(removed) > 5 else ''}")
+        self.bump("corrupt_evicted", len(removed))
+        return removed
+
+    @staticmethod
+    def http_cache_ok(path):
+        try:
+            with sqlite3.connect(path) as conn:
+                return conn.execute("PRAGMA quick_check").fetchone()[0] == "ok"
+        except sqlite3.Error:
+            return False
+
+    def touch(self, relpath_or_unit):
+        with self.lock:
+            self.index["units"][self.unit_of(relpath_or_unit)] = time.time()
+
+    # Mark a loaded FastF1 session as used (session.api_path = "/static/{year}/{event}/{session}/")
+    def record_access(self, api_path):
+        self.touch(api_path.strip("/")[len("static/"):].replace("/", os.sep))
+
+    # Move another cache's session files into this one (entries already here win), add its hit/miss
+    # totals and delete it; used for the per-worker caches of ingest_sessions.py. Returns files moved.
+    def merge(self, other_path):
+        moved = 0
+        for root, _, names in os.walk(other_path):
+            for name in names:
+                if not name.endswith(".ff1pkl"):
+                    continue
+                relpath = os.path.relpath(os.path.join(root, name), other_path)
+                target = os.path.join(self.path, relpath)
+                if not os.path.exists(target):
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    os.replace(os.path.join(root, name), target)
+                    self.touch(relpath)
+                    moved += 1
+        other_index = os.path.join(other_path, INDEX_FILENAME)
+        if os.path.exists(other_index):
+            try:
+                with open(other_index) as f:
+                    totals = json.load(f).get("totals", {})
+                self.bump("hits", totals.get("hits", 0))
+                self.bump("misses", totals.get("misses", 0))
+            except (OSError, ValueError):
+                pass
+        shutil.rmtree(other_path, ignore_errors=True)
+        return moved
+
+    def unit_sizes(self):
+        sizes, last_used = {}, {}
+        for relpath, entry in self.index["entries"].items():
+            unit = self.unit_of(relpath)
+            sizes[unit] = sizes.get(unit, 0) + entry["size"]
+            last_used[unit] = max(last_used.get(unit, 0), entry["mtime"], self.index["units"].get(unit, 0))
+        return sizes, last_used
+
+    def enforce_limit(self):
+        """Evict least recently used sessions until the cache fits its cap. Returns evicted units."""
+        sizes, last_used = self.unit_sizes()
+        http_cache = os.path.join(self.path, HTTP_CACHE)
+        http_size = os.path.getsize(http_cache) if os.path.exists(http_cache) else 0
+        if http_size > self.limit_bytes * HTTP_CACHE_SHARE:
+            os.remove(http_cache)
+            print(f"🧹 HTTP cache was {http_size / 1024 ** 2:.0f} MB; cleared")
+            http_size = 0
+
+        total = sum(sizes.values()) + http_size
+        evicted = []
+        for unit in sorted(sizes, key=last_used.get):
+            if total <= self.limit_bytes:
+                break
+            full = os.path.join(self.path, unit)
+            if os.path.isdir(full):
+                shutil.rmtree(full, ignore_errors=True)
+            elif os.path.exists(full):
+                os.remove(full)
+            parent = os.path.dirname(full)
+            while parent != self.path and os.path.isdir(parent) and not os.listdir(parent):
+                os.rmdir(parent)
+                parent = os.path.dirname(parent)
+            total -= sizes[unit]
+            evicted.append(unit)
+            self.index["units"].pop(unit, None)
+            for relpath in [r for r in self.index["entries"] if self.unit_of(r) == unit]:
+                del self.index["entries"][relpath]
+        if evicted:
+            print(f"🧹 Evicted {len(evicted)} least recently used sessions; cache now {total / 1024 ** 2:.0f} MB")
+        self.bump("lru_evicted", len(evicted))
+        return evicted
+
+    def bump(self, key, amount):
+        totals = self.index.setdefault("totals", {})
+        totals[key] = totals.get(key, 0) + amount
+
+    def save(self):
+        with self.lock:
+            self.bump("hits", self.stats.hits)
+            self.bump("misses", self.stats.misses)
+            self.stats.hits = self.stats.misses = 0
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.index, f, indent=2)
+            os.replace(tmp_path, self.index_path)
+
+    # Verify new entries, cap the size and persist the index (run at the end of ingestion)
+    def maintain(self, verify_all=False):
+        self.verify(verify_all)
+        self.enforce_limit()
+        self.save()
+
+    def report(self):
+        sizes, _ = self.unit_sizes()
+        http_cache = os.path.join(self.path, HTTP_CACHE)
+        http_size = os.path.getsize(http_cache) if os.path.exists(http_cache) else 0
+        totals = self.index.get("totals", {})
+        hits = totals.get("hits", 0) + self.stats.hits
+        misses = totals.get("misses", 0) + self.stats.misses
+        return {
+            "path": self.path,
+            "entries": len(self.index["entries"]),
+            "sessions": len(sizes),
+            "size_mb": round((sum(sizes.values()) + http_size) / 1024 ** 2, 1),
+            "limit_mb": round(self.limit_bytes / 1024 ** 2, 1),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+            "corrupt_evicted": totals.get("corrupt_evicted", 0),
+            "lru_evicted": totals.get("lru_evicted", 0),
+        }
+
+
+_manager = None
+
+
+def enable_cache(path=CACHE_PATH, limit_mb=CACHE_LIMIT_MB):
+    """Enable the shared FastF1 cache once per process (verified and size-capped) and return its manager."""
+    global _manager
+    if _manager is None or _manager.path != path:
+        import fastf1
+        os.makedirs(path, exist_ok=True)
+        _manager = CacheManager(path, limit_mb)
+        _manager.maintain()
+        fastf1.Cache.enable_cache(path)
+        logging.getLogger("fastf1").addHandler(_manager.stats)
+    return _manager
+
+
+def get_cache():
+    return _manager or enable_cache()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify, cap and report the shared FastF1 cache")
+    parser.add_argument("--path", default=CACHE_PATH)
+    parser.add_argument("--limit-mb", type=float, default=CACHE_LIMIT_MB)
+    parser.add_argument("--verify-all", action="store_true", help="re-check every entry, not only new ones")
+    parser.add_argument("--stats", action="store_true", help="only print statistics")
+    args = parser.parse_args()
+
+    os.makedirs(args.path, exist_ok=True)
+    manager = CacheManager(args.path, args.limit_mb)
+    if not args.stats:
+        manager.maintain(args.verify_all)
+    print("\n🗄️ FastF1 cache:")
+    for key, value in manager.report().items():
+        print(f"   {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
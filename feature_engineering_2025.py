@@ -8,6 +8,7 @@ import pandas as pd
 import numpy as np
 import fastf1
 from fastf1 import plotting
+from session_store import load_session
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -15,10 +16,8 @@ plotting.setup_mpl()
 
 BASE_PATH = '/Users/sid/Downloads/F1_RacePredictions'
 
-# ✅ Local full paths for Miami 2025
-MIAMI_LAPS_PATH = '/Users/sid/Downloads/F1_RacePredictions/2025_Miami Grand Prix_Q/laps.csv'
-MIAMI_WEATHER_PATH = '/Users/sid/Downloads/F1_RacePredictions/2025_Miami Grand Prix_Q/weather.csv'
-MIAMI_RESULTS_PATH = '/Users/sid/Downloads/F1_RacePredictions/2025_Miami Grand Prix_Q/results.csv'
+# ✅ Miami 2025 qualifying session in the session store
+MIAMI_SESSION = (2025, 'Miami Grand Prix', 'Q')
 
 def get_historical_form():
     history = []
@@ -43,15 +42,16 @@ def engineer_miami_2025():
     session.load()
     quali_results = session.results
 
-    laps = pd.read_csv(MIAMI_LAPS_PATH)
-    weather = pd.read_csv(MIAMI_WEATHER_PATH)
-    results = pd.read_csv(MIAMI_RESULTS_PATH)
+    laps, results, weather = load_session(*MIAMI_SESSION, columns={
+        "laps": ["Driver", "LapTime", "PitOutTime"],
+        "results": ["Abbreviation", "Position"],
+        "weather": ["AirTemp", "TrackTemp", "Humidity"]
+    })
 
     drivers = quali_results['Abbreviation'].values
     df = pd.DataFrame({'Driver': drivers})
 
     # Add average lap time
-    laps['LapTime'] = pd.to_timedelta(laps['LapTime'], errors='coerce')
     laps['LapTimeSec'] = laps['LapTime'].dt.total_seconds()
     avg_lap = laps.groupby("Driver")["LapTimeSec"].mean().reset_index(name="AvgRaceLapTime")
     pit_count = laps[laps['PitOutTime'].notna()].groupby("Driver").size().reset_index(name='PitStopCount')
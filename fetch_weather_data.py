@@ -4,17 +4,15 @@ Created on Fri Apr 25 11:21:55 2025
 @author: sid
 """
 import pandas as pd
-import fastf1
 from fastf1 import get_session
 import os
+from fastf1_cache import enable_cache
 
 BASE_SAVE_PATH = r'/Users/sid/Downloads/F1_RacePredictions'
 
 def fetch_weather_summary(year, gp_name, session_type='R'):
-    cache_path = os.path.join(BASE_SAVE_PATH, "cache")
-    os.makedirs(cache_path, exist_ok=True)
-    fastf1.Cache.enable_cache(cache_path)
-    
+    enable_cache()
+
     print(f"Fetching weather data: {year} {gp_name} {session_type}")
     session = get_session(year, gp_name, session_type)
     session.load()
@@ -0,0 +1,174 @@
+"""
+Created on Sat Oct 17 2026
+@author: sid
+
+Grid Transitions : Grid-position -> finishing-position transition matrices overall, per season and per
+circuit, counted for every race at once with np.bincount over the results index. The matrices double
+as a baseline predictor: expected finish and finish distribution are a table lookup by grid slot
+(per-circuit rows are shrunk towards the overall matrix), which makes a microsecond-latency fallback
+when the model or its features are unavailable. benchmark() scores it against the registered
+XGBoost model on the same held-out races.
+
+Usage:
+    python grid_transitions.py --years 2021 2022 2023 2024 2025
+    python grid_transitions.py --benchmark
+"""
+
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+from results_index import load_results_index
+
+N_POSITIONS = 20
+# Pseudo-count of overall-matrix races blended into each per-circuit / per-season row
+SHRINKAGE = 5.0
+
+
+# 0-based slot; a pit-lane start (grid 0) or missing grid counts as the back of the grid
+def grid_slot(grid, n=N_POSITIONS):
+    if isinstance(grid, pd.Series):
+        grid = pd.to_numeric(grid, errors="coerce").to_numpy(dtype=float)
+    grid = np.atleast_1d(np.asarray(grid, dtype=float))
+    grid = np.where(np.isnan(grid) | (grid <= 0), n, grid)
+    return np.clip(grid, 1, n).astype(np.int64) - 1
+
+
+def transition_counts(grid, finish, groups=None, n_groups=1, n=N_POSITIONS):
+    """(n_groups x n x n) counts of grid slot (rows) -> finishing position (columns)."""
+    finish = pd.to_numeric(pd.Series(finish), errors="coerce").to_numpy(dtype=float)
+    valid = ~np.isnan(finish)
+    g = np.zeros(len(finish), dtype=np.int64) if groups is None else np.asarray(groups, dtype=np.int64)
+    rows = grid_slot(grid, n)[valid]
+    cols = np.clip(finish[valid], 1, n).astype(np.int64) - 1
+    flat = (g[valid] * n + rows) * n + cols
+    return np.bincount(flat, minlength=n_groups * n * n).reshape(n_groups, n, n)
+
+
+def to_probabilities(counts, prior=None, strength=SHRINKAGE):
+    """Row-normalised transition probabilities; rows are blended with `prior` (uniform if None)."""
+    n = counts.shape[-1]
+    prior = np.full((n, n), 1.0 / n) if prior is None else prior
+    return (counts + strength * prior) / (counts.sum(axis=-1, keepdims=True) + strength)
+
+
+def transition_tables(index, n=N_POSITIONS):
+    """Count matrices {"overall": (n x n), "season": {year: ...}, "circuit": {gp: ...}} in three bincounts."""
+    grid, finish = index["GridPosition"], index["Position"]
+    tables = {"overall": transition_counts(grid, finish, n=n)[0]}
+    for name, col in (("season", "Year"), ("circuit", "GP")):
+        codes, labels = pd.factorize(index[col].astype(str) if col == "GP" else index[col].astype(int))
+        counts = transition_counts(grid, finish, codes, len(labels), n)
+        tables[name] = dict(zip(labels.tolist(), counts))
+    return tables
+
+
+class GridBaseline:
+    """Expected finish / finish distribution by grid slot, per circuit when seen before, else overall."""
+
+    def __init__(self, n=N_POSITIONS, strength=SHRINKAGE):
+        self.n = n
+        self.strength = strength
+
+    def fit(self, index):
+        tables = transition_tables(index, self.n)
+        overall = to_probabilities(tables["overall"][None], strength=1.0)[0]
+        self.circuits = list(tables["circuit"])
+        circuit_counts = np.stack([tables["circuit"][c] for c in self.circuits]) if self.circuits \
+            else np.zeros((0, self.n, self.n))
+        # Row 0 of the stacked tables is the overall matrix; circuit c lives at row c + 1
+        self.distributions = np.concatenate(
+            [overall[None], to_probabilities(circuit_counts, overall, self.strength)])
+        self.expected = self.distributions @ np.arange(1, self.n + 1)
+        self.circuit_row = {c: i + 1 for i, c in enumerate(self.circuits)}
+        self.counts = tables
+        return self
+
+    def rows(self, circuits, size):
+        if circuits is None or isinstance(circuits, str):
+            return np.full(size, self.circuit_row.get(circuits, 0), dtype=np.int64)
+        return pd.Series(circuits).astype(str).map(self.circuit_row).fillna(0).to_numpy(dtype=np.int64)
+
+    def expected_finish(self, grid, circuits=None):
+        slots = grid_slot(grid, self.n)
+        return self.expected[self.rows(circuits, len(slots)), slots]
+
+    def distribution(self, grid, circuits=None):
+        slots = grid_slot(grid, self.n)
+        return self.distributions[self.rows(circuits, len(slots)), slots]
+
+    # Same call shape as FusedModel.predict for feature frames (grid from GridPosition, else QualiPosition)
+    def predict(self, df):
+        grid = df["GridPosition"] if "GridPosition" in df.columns else df["QualiPosition"]
+        return self.expected_finish(grid, df["GP"] if "GP" in df.columns else None)
+
+
+def matrix_frame(counts):
+    n = counts.shape[-1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        probs = counts / counts.sum(axis=1, keepdims=True)
+    return pd.DataFrame(np.nan_to_num(probs), index=[f"Grid{g}" for g in range(1, n + 1)],
+                        columns=[f"P{p}" for p in range(1, n + 1)])
+
+
+# Held-out comparison against the registered model: both see only the earlier races
+def benchmark(model=None, test_fraction=0.2):
+    # Imported here: the model stack is only needed for the comparison
+    from model_registry import load_model
+    from race_cv import holdout_split, race_positions
+    from backtest import aggregate_metrics, fill_form, load_backtest_frame, race_metrics
+
+    model = model or load_model()
+    df = fill_form(load_backtest_frame()).dropna(subset=model.features + ['FinalPosition'])
+    df = df[df['FinalPosition'] <= N_POSITIONS].reset_index(drop=True)
+    race_pos, _ = race_positions(df)
+    train_idx, test_idx = holdout_split(race_pos, test_fraction)
+    train_races = set(zip(df['Year'].iloc[train_idx], df['GP'].iloc[train_idx]))
+
+    index = load_results_index(sorted(df['Year'].unique()))
+    seen = [(y, gp) in train_races for y, gp in zip(index['Year'].astype(int), index['GP'].astype(str))]
+    baseline = GridBaseline().fit(index[seen])
+
+    test = df.iloc[test_idx].merge(
+        index[['Year', 'GP', 'Driver', 'GridPosition']].astype({'Year': int, 'GP': str, 'Driver': str}),
+        on=['Year', 'GP', 'Driver'], how='left')
+    test['GridPosition'] = test['GridPosition'].astype(float).fillna(test['QualiPosition'])
+
+    rows = []
+    for name, predictor in (("xgboost", model), ("grid_baseline", baseline)):
+        start = time.perf_counter()
+        predicted = predictor.predict(test)
+        latency = (time.perf_counter() - start) / len(test) * 1e6
+        scored = test.assign(Predicted=predicted)
+        metrics = aggregate_metrics(scored, race_metrics(scored)).iloc[0]
+        rows.append({"Predictor": name, "Races": test.groupby(['Year', 'GP']).ngroups, "Rows": len(test),
+                     **{k: metrics[k] for k in ("MAE", "RMSE", "R2", "Spearman", "Top1", "Top3", "Top10")},
+                     "MicrosPerRow": latency})
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grid -> finish transition matrices and baseline predictor")
+    parser.add_argument("--years", type=int, nargs="+", default=[2021, 2022, 2023, 2024, 2025])
+    parser.add_argument("--circuit", default=None, help="print this circuit's matrix instead of the overall one")
+    parser.add_argument("--benchmark", action="store_true", help="compare with the registered model on held-out races")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        print("\n⚖️ Grid baseline vs model (held-out latest races):")
+        print(benchmark().round(3).to_string(index=False))
+        return
+
+    index = load_results_index(args.years)
+    tables = transition_tables(index)
+    counts = tables["circuit"][args.circuit] if args.circuit else tables["overall"]
+    print(f"\n🔀 Grid -> finish probabilities ({args.circuit or 'all circuits'}, {int(counts.sum())} starts):")
+    print(matrix_frame(counts).round(2).to_string())
+    baseline = GridBaseline().fit(index)
+    print("\n📍 Expected finish by grid slot:")
+    print(pd.Series(baseline.expected[0], index=range(1, N_POSITIONS + 1)).round(2).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Created on Sat Oct 17 2026
+@author: sid
+
+Hyperparameter Search : Budgeted successive halving for the XGBoost race regressor.
+Samples candidates from a wider space than the old 27-point grid, trains every candidate for a
+small number of boosting rounds, keeps the best 1/eta and continues only those (from their
+existing boosters) with more rounds. Candidates are scored on race_cv's forward-chaining folds
+and early-stop on the fold-averaged validation MAE; the search stops when the wall-clock budget
+runs out. Results are cached per dataset hash in tuning_trials.json, so re-tuning on unchanged
+data returns immediately.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+import xgboost as xgb
+from concurrent.futures import ThreadPoolExecutor
+
+from session_store import BASE_PATH
+from race_cv import DEFAULT_THREADS, map_folds, thread_plan
+
+TRIALS_FILE = os.path.join(BASE_PATH, "tuning_trials.json")
+
+# Sampling space: name -> (kind, low, high)
+SEARCH_SPACE = {
+    "max_depth": ("int", 2, 10),
+    "learning_rate": ("log", 0.01, 0.3),
+    "subsample": ("float", 0.5, 1.0),
+    "colsample_bytree": ("float", 0.5, 1.0),
+    "min_child_weight": ("log", 0.5, 20.0),
+    "reg_lambda": ("log", 0.1, 10.0),
+    "gamma": ("float", 0.0, 2.0),
+}
+
+_trials_lock = threading.Lock()
+
+
+def sample_params(rng, space=SEARCH_SPACE):
+    params = {}
+    for name, (kind, low, high) in space.items():
+        if kind == "int":
+            params[name] = int(rng.integers(low, high + 1))
+        elif kind == "log":
+            params[name] = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+        else:
+            params[name] = float(rng.uniform(low, high))
+    return params
+
+
+def booster_params(params, seed=42, nthread=None):
+    out = dict(params, objective="reg:squarederror", eval_metric="mae", seed=seed, tree_method="hist")
+    if nthread:
+        out["nthread"] = nthread
+    return out
+
+
+# === Trial cache ===
+def load_trials(path=TRIALS_FILE):
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+def save_trial(key, result, path=TRIALS_FILE):
+    with _trials_lock:
+        trials = load_trials(path)
+        trials[key] = result
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(trials, f, indent=2)
+        os.replace(tmp_path, path)
+
+
+# Cache key: dataset fingerprint + search space + search settings
+def search_key(data_hash, **settings):
+    payload = json.dumps([data_hash, SEARCH_SPACE, settings], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class Candidate:
+    """One sampled configuration; keeps a booster per CV fold and the fold-averaged validation curve."""
+
+    def __init__(self, cid, params, n_folds):
+        self.cid = cid
+        self.params = params
+        self.boosters = [None] * n_folds
+        self.rounds = 0
+        self.best_score = np.inf
+        self.best_iteration = 0
+        self.stopped = False    # early stopping fired: more rounds would not help
+
+    def _train_fold(self, i, fold, nthread, step, seed):
+        history = {}
+        self.boosters[i] = xgb.train(
+            booster_params(self.params, seed, nthread), fold.dtrain, num_boost_round=step,
+            evals=[(fold.dvalid, "valid")], evals_result=history,
+            xgb_model=self.boosters[i], verbose_eval=False)
+        return history["valid"]["mae"]
+
+    def advance(self, folds, target_rounds, early_stopping_rounds, seed, thread_budget, pool):
+        # Train in chunks of early_stopping_rounds and stop once the mean curve stops improving;
+        # continued training resumes each fold's booster, so later rungs never start over
+        while self.rounds < target_rounds and not self.stopped:
+            step = min(early_stopping_rounds, target_rounds - self.rounds)
+            curves = map_folds(lambda i, fold, nthread: self._train_fold(i, fold, nthread, step, seed),
+                               folds, thread_budget, pool)
+            mean_curve = np.mean(curves, axis=0)
+            best = int(np.argmin(mean_curve))
+            if mean_curve[best] < self.best_score:
+                self.best_score = float(mean_curve[best])
+                self.best_iteration = self.rounds + best
+            self.rounds += step
+            self.stopped = self.rounds - 1 - self.best_iteration >= early_stopping_rounds
+
+    def record(self):
+        return {"id": self.cid, "params": self.params, "rounds": self.rounds,
+                "best_iteration": self.best_iteration, "valid_mae": self.best_score}
+
+
+def successive_halving(folds, data_hash=None, n_candidates=81, eta=3, min_rounds=25, max_rounds=1000,
+                       early_stopping_rounds=30, budget_seconds=60.0, seed=42, thread_budget=DEFAULT_THREADS,
+                       trials_path=TRIALS_FILE, force=False):
+    """Search over race_cv folds; returns {"params", "n_estimators", "valid_mae", "trials", "elapsed", "cached"}.
+    Rung k trains the surviving candidates to min_rounds * eta**k boosting rounds and scores them by
+    the fold-averaged validation MAE."""
+    key = None
+    if data_hash is not None:
+        key = search_key(data_hash, n_candidates=n_candidates, eta=eta, min_rounds=min_rounds,
+                         max_rounds=max_rounds, early_stopping_rounds=early_stopping_rounds, seed=seed,
+                         folds=[fold.describe() for fold in folds])
+        cached = load_trials(trials_path).get(key)
+        # A search cut short by its budget is only reused when the new budget is no larger
+        if cached and not force and (not cached["budget_exhausted"] or cached["budget_seconds"] >= budget_seconds):
+            print(f"♻️ Tuning cache hit ({cached['n_trials']} trials, valid MAE {cached['valid_mae']:.3f})")
+            return dict(cached, cached=True)
+
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    workers, _ = thread_plan(len(folds), thread_budget)
+
+    survivors = [Candidate(i, sample_params(rng), len(folds)) for i in range(n_candidates)]
+    everyone = list(survivors)
+    rounds = min_rounds
+    rung = 0
+    out_of_budget = False
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while survivors:
+            for cand in survivors:
+                # The budget never cuts the first candidate, so there is always a result
+                if everyone[0].rounds > 0 and time.perf_counter() - started > budget_seconds:
+                    out_of_budget = True
+                    break
+                cand.advance(folds, rounds, early_stopping_rounds, seed, thread_budget, pool)
+            evaluated = [c for c in survivors if c.rounds > 0]
+            print(f"🪜 Rung {rung}: {len(evaluated)} candidates @ {rounds} rounds, "
+                  f"best valid MAE {min(c.best_score for c in evaluated):.3f}")
+            if out_of_budget or len(survivors) == 1 or rounds >= max_rounds:
+                break
+            keep = max(1, len(evaluated) // eta)
+            survivors = sorted(evaluated, key=lambda c: c.best_score)[:keep]
+            rounds = min(rounds * eta, max_rounds)
+            rung += 1
+
+    best = min((c for c in everyone if c.rounds > 0), key=lambda c: c.best_score)
+    elapsed = time.perf_counter() - started
+    result = {
+        "params": best.params,
+        "n_estimators": best.best_iteration + 1,
+        "valid_mae": best.best_score,
+        "n_folds": len(folds),
+        "n_trials": sum(c.rounds > 0 for c in everyone),
+        "boosting_rounds": int(sum(c.rounds for c in everyone)),
+        "elapsed": round(elapsed, 2),
+        "budget_seconds": budget_seconds,
+        "budget_exhausted": out_of_budget,
+        "trials": [c.record() for c in everyone if c.rounds > 0]
+    }
+    print(f"✅ Successive halving: {result['n_trials']} candidates, {result['boosting_rounds']} rounds "
+          f"x {len(folds)} folds in {elapsed:.1f}s, best valid MAE {best.best_score:.3f}")
+    if key is not None:
+        save_trial(key, result, trials_path)
+    return dict(result, cached=False)
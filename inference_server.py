@@ -0,0 +1,273 @@
+"""
+Created on Sat Oct 17 2026
+@author: sid
+
+Inference Server : Long-running local HTTP server for finishing-position predictions.
+Loads the fused model artifact once and coalesces concurrent requests into batched XGBoost predictions
+within a small latency window. Each request is ranked with the same rank(method='min')
+logic as make_predictions. Runs entirely on asyncio + the standard library.
+
+Endpoints:
+    POST /predict   {"rows": [{"Driver": "VER", "QualiPosition": 1, ...}, ...]}
+    GET  /metrics   p50/p99 latency, throughput and batch sizes
+    GET  /health
+
+Usage:
+    python inference_server.py --port 8765 --max-wait-ms 5 --model-version latest
+"""
+
+import json
+import time
+import asyncio
+import argparse
+import collections
+import numpy as np
+import pandas as pd
+
+from batch_predict import fill_missing_features, load_historical_form
+from model_registry import load_model
+
+HTTP_STATUS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               500: "Internal Server Error"}
+
+
+# Rolling latency / throughput metrics
+class ServerMetrics:
+    def __init__(self, window=10000):
+        self.latencies_ms = collections.deque(maxlen=window)
+        self.batch_sizes = collections.deque(maxlen=window)
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.rows = 0
+        self.errors = 0
+
+    def observe(self, latency_ms, rows):
+        self.latencies_ms.append(latency_ms)
+        self.requests += 1
+        self.rows += rows
+
+    def snapshot(self):
+        uptime = time.perf_counter() - self.started
+        latencies = np.array(self.latencies_ms) if self.latencies_ms else np.zeros(1)
+        batches = np.array(self.batch_sizes) if self.batch_sizes else np.zeros(1)
+        return {
+            "requests": self.requests,
+            "rows": self.rows,
+            "errors": self.errors,
+            "uptime_s": round(uptime, 3),
+            "throughput_rps": round(self.requests / uptime, 2) if uptime else 0.0,
+            "latency_ms": {
+                "p50": round(float(np.percentile(latencies, 50)), 3),
+                "p99": round(float(np.percentile(latencies, 99)), 3),
+                "max": round(float(latencies.max()), 3)
+            },
+            "batch_requests": {
+                "mean": round(float(batches.mean()), 2),
+                "max": int(batches.max())
+            }
+        }
+
+
+class MicroBatcher:
+    """Queues request frames and scores them together once max_wait_ms elapses or max_rows is reached."""
+
+    def __init__(self, model, form=None, max_wait_ms=5.0, max_rows=2048, metrics=None):
+        self.model = model
+        self.form = form
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_rows = max_rows
+        self.metrics = metrics or ServerMetrics()
+        self.queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, rows_df):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((rows_df, future))
+        return await future
+
+    async def _collect(self):
+        items = [await self.queue.get()]
+        n_rows = len(items[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while n_rows < self.max_rows:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            items.append(item)
+            n_rows += len(item[0])
+        return items
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = await self._collect()
+            self.metrics.batch_sizes.append(len(items))
+            frames = [df for df, _ in items]
+            try:
+                results = await loop.run_in_executor(None, self._predict, frames)
+            except Exception:
+                # Retry one request at a time so a bad request only fails itself
+                results = await loop.run_in_executor(None, self._predict_each, frames)
+            for (_, future), result in zip(items, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    # Reject a request frame the batched predict cannot score (ValueError -> 400), before it joins a batch
+    def validate(self, df):
+        if 'Driver' not in df.columns:
+            raise ValueError("every row needs a 'Driver'")
+        if not df['Driver'].map(lambda v: isinstance(v, str)).all():
+            raise ValueError("'Driver' must be a string in every row")
+        for col in [c for c in self.model.features if c in df.columns]:
+            try:
+                values = pd.to_numeric(df[col], errors='coerce')
+            except TypeError:
+                values = pd.Series(np.nan, index=df.index)
+            bad = values.isna() & df[col].notna()
+            if bad.any():
+                raise ValueError(f"'{col}' must be numeric (row {int(np.flatnonzero(bad)[0])})")
+
+    # One fill + predict for every queued request, ranked per request
+    def _predict(self, frames):
+        batch = pd.concat(
+            [df.assign(Year=0, GP=i) for i, df in enumerate(frames)], ignore_index=True)
+        batch = fill_missing_features(batch, form=self.form, features=self.model.features)
+        batch['PredictedScore'] = self.model.predict(batch).astype(float)
+        batch['PredictedPosition'] = batch.groupby('GP')['PredictedScore'].rank(method='min').astype(int)
+        out = batch[['GP', 'Driver', 'PredictedScore', 'PredictedPosition']]
+        return [
+            race.drop(columns='GP').sort_values('PredictedPosition').to_dict(orient='records')
+            for _, race in out.groupby('GP', sort=True)
+        ]
+
+    def _predict_each(self, frames):
+        results = []
+        for df in frames:
+            try:
+                results.append(self._predict([df])[0])
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+class InferenceServer:
+    def __init__(self, batcher):
+        self.batcher = batcher
+        self.metrics = batcher.metrics
+
+    @staticmethod
+    async def respond(writer, status, payload, keep_alive=True):
+        data = json.dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {HTTP_STATUS.get(status, 'OK')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data)
+        await writer.drain()
+
+    async def handle_predict(self, body):
+        payload = json.loads(body or b"{}")
+        rows = payload.get("rows") if isinstance(payload, dict) else payload
+        if not rows or not isinstance(rows, list):
+            return 400, {"error": "expected a non-empty 'rows' list"}
+        if not all(isinstance(row, dict) for row in rows):
+            return 400, {"error": "every row must be an object"}
+        df = pd.DataFrame(rows)
+        self.batcher.validate(df)
+        predictions = await self.batcher.submit(df)
+        return 200, {"predictions": predictions}
+
+    async def dispatch(self, method, path, body):
+        if path == "/predict":
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            return await self.handle_predict(body)
+        if path == "/metrics":
+            return 200, self.metrics.snapshot()
+        if path == "/health":
+            return 200, {"status": "ok", "model_version": self.batcher.model.version}
+        return 404, {"error": f"unknown path {path}"}
+
+    # Minimal HTTP/1.1 handling with keep-alive
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                parts = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                length = headers.get("content-length", "0")
+                # A malformed request line or length leaves the stream unreadable: answer 400 and close
+                if len(parts) != 3 or not length.isdigit():
+                    self.metrics.errors += 1
+                    await self.respond(writer, 400, {"error": "malformed request"}, keep_alive=False)
+                    break
+                method, path, _ = parts
+                body = await reader.readexactly(int(length))
+
+                started = time.perf_counter()
+                try:
+                    status, payload = await self.dispatch(method, path.split("?", 1)[0], body)
+                except (ValueError, KeyError, TypeError) as e:
+                    status, payload = 400, {"error": str(e)}
+                except Exception as e:
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+                if path.startswith("/predict"):
+                    if status == 200:
+                        self.metrics.observe((time.perf_counter() - started) * 1000, len(payload["predictions"]))
+                    else:
+                        self.metrics.errors += 1
+
+                keep_alive = headers.get("connection", "keep-alive").lower() != "close"
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host="127.0.0.1", port=8765, max_wait_ms=5.0, max_rows=2048, model_version=None):
+    model = load_model(model_version)
+    batcher = MicroBatcher(model, form=load_historical_form(),
+                           max_wait_ms=max_wait_ms, max_rows=max_rows)
+    batcher.start()
+    server = InferenceServer(batcher)
+    tcp_server = await asyncio.start_server(server.handle_connection, host, port)
+    print(f"🚀 Serving model {model.version} on http://{host}:{port} (batch window {max_wait_ms} ms)")
+    async with tcp_server:
+        await tcp_server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local micro-batching inference server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--max-rows", type=int, default=2048)
+    parser.add_argument("--model-version", default=None)
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.max_wait_ms, args.max_rows, args.model_version))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Created on Sat Oct 17 2026
+@author: sid
+
+Season Ingestion : Download Race/Qualifying sessions for any list of years into the session store
+on a bounded pool of worker processes, with a manifest of complete and failed sessions so reruns
+resume cleanly. FastF1's cache is process-global and not safe for concurrent writers, so every
+worker loads into its own cache directory; those are merged into the shared cache afterwards.
+
+Usage:
+    python ingest_sessions.py --years 2021 2022 2023 2024 2025 --sessions R Q --workers 8
+"""
+
+import os
+import json
+import time
+import argparse
+import threading
+import multiprocessing
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from session_store import STORE_PATH, TABLES, has_session, legacy_folder, save_session
+from fastf1_cache import CACHE_PATH, enable_cache
+
+MANIFEST_FILE = os.path.join(STORE_PATH, "manifest.json")
+# Per-worker FastF1 caches live here (cache/workers/{pid}) until they are merged
+WORKER_CACHES = "workers"
+
+
+# Live FastF1 backend (network + the shared, size-capped FastF1 cache)
+class FastF1Backend:
+    def __init__(self, cache_path=CACHE_PATH):
+        self.cache_path = cache_path
+        self.cache = enable_cache(cache_path) if cache_path else None
+
+    # Sent to worker processes by path only; each worker enables its own cache in for_worker()
+    def __getstate__(self):
+        return {"cache_path": self.cache_path, "cache": None}
+
+    def for_worker(self):
+        if not self.cache_path:
+            return self
+        return FastF1Backend(os.path.join(self.cache_path, WORKER_CACHES, str(os.getpid())))
+
+    # Move the sessions every worker cached into the shared cache
+    def finish(self):
+        root = os.path.join(self.cache_path, WORKER_CACHES) if self.cache else None
+        if not root or not os.path.isdir(root):
+            return
+        moved = sum(self.cache.merge(os.path.join(root, name)) for name in sorted(os.listdir(root)))
+        os.rmdir(root)
+        print(f"🗄️ Merged {moved} cached files from the worker caches")
+
+    def event_names(self, year):
+        import fastf1
+        schedule = fastf1.get_event_schedule(year, include_testing=False)
+        return schedule['EventName'].tolist()
+
+    def load(self, year, gp_name, session_type):
+        import fastf1
+        session = fastf1.get_session(year, gp_name, session_type)
+        session.load()
+        if self.cache:
+            self.cache.record_access(session.api_path)
+        # Plain frames: FastF1's Laps/SessionResults would pickle the whole session back to the parent
+        return pd.DataFrame(session.laps), pd.DataFrame(session.results), pd.DataFrame(session.weather_data)
+
+
+# Local stand-in for FastF1 that serves sessions from a legacy {year}_{gp}_{session}/*.csv tree
+class LocalCSVBackend:
+    def __init__(self, root):
+        self.root = root
+
+    def event_names(self, year):
+        events = set()
+        for folder in os.listdir(self.root):
+            parts = folder.split("_")
+            if len(parts) >= 3 and parts[0] == str(year):
+                events.add("_".join(parts[1:-1]))
+        return sorted(events)
+
+    def for_worker(self):
+        return self
+
+    def load(self, year, gp_name, session_type):
+        folder = os.path.join(self.root, os.path.basename(legacy_folder(year, gp_name, session_type)))
+        return tuple(pd.read_csv(os.path.join(folder, f"{table}.csv")) for table in TABLES)
+
+
+# JSON manifest keyed by "year|event|session", safe to update from worker threads
+class IngestManifest:
+    def __init__(self, path=MANIFEST_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    @staticmethod
+    def key(year, gp_name, session_type):
+        return f"{year}|{gp_name}|{session_type}"
+
+    def status(self, year, gp_name, session_type):
+        return self.entries.get(self.key(year, gp_name, session_type), {}).get("status")
+
+    def record(self, year, gp_name, session_type, status, attempts, error=None):
+        with self.lock:
+            self.entries[self.key(year, gp_name, session_type)] = {
+                "status": status,
+                "attempts": attempts,
+                "error": error,
+                "updated": datetime.utcnow().isoformat(timespec="seconds")
+            }
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.entries, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+
+# Load one session with retries and exponential backoff: (frames or None, attempts, error)
+def load_with_retries(backend, year, gp_name, session_type, retries=3, backoff=2.0):
+    error = None
+    for attempt in range(1, retries + 1):
+        try:
+            return backend.load(year, gp_name, session_type), attempt, None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if attempt < retries:
+                time.sleep(backoff * 2 ** (attempt - 1))
+    return None, retries, error
+
+
+# === Worker processes ===
+_worker_backend = None
+
+
+def _init_worker(backend):
+    global _worker_backend
+    _worker_backend = backend.for_worker()
+
+
+def _load_in_worker(year, gp_name, session_type, retries, backoff):
+    loaded = load_with_retries(_worker_backend, year, gp_name, session_type, retries, backoff)
+    cache = getattr(_worker_backend, "cache", None)
+    if cache:
+        # Persist the worker's hit/miss counts for the merge
+        cache.save()
+    return loaded
+
+
+# Load (year, event, session) jobs on spawned worker processes, in parallel; each session is written
+# to the store and the manifest by this process as it arrives. Returns (completed, failed).
+def ingest_jobs(backend, manifest, jobs, workers=4, retries=3, backoff=2.0):
+    completed, failed = [], []
+    if not jobs:
+        return completed, failed
+    context = multiprocessing.get_context("spawn")
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(backend,)) as pool:
+            futures = {pool.submit(_load_in_worker, *job, retries, backoff): job for job in jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    frames, attempts, error = future.result()
+                    if frames is not None:
+                        save_session(*job, *frames)
+                except Exception as e:
+                    frames, attempts, error = None, retries, f"{type(e).__name__}: {e}"
+                if frames is not None:
+                    manifest.record(*job, "complete", attempts)
+                    completed.append(job)
+                    print(f"✅ Saved {job[0]} {job[1]} {job[2]}")
+                else:
+                    manifest.record(*job, "failed", attempts, error)
+                    failed.append(job)
+                    print(f"❌ Failed for {job[0]} {job[1]} {job[2]}")
+    finally:
+        finish = getattr(backend, "finish", None)
+        if finish:
+            finish()
+    return completed, failed
+
+
+def plan_sessions(backend, years, session_types):
+    jobs = []
+    for year in years:
+        try:
+            events = backend.event_names(year)
+        except Exception as e:
+            print(f"❌ Failed to load schedule for {year}: {e}")
+            continue
+        jobs.extend((year, gp, st) for gp in events for st in session_types)
+    return jobs
+
+
+# Ingest every (year, event, session) on a bounded pool of worker processes.
+# Sessions already complete in the manifest and present in the store are skipped.
+def ingest(years, session_types=("R", "Q"), backend=None, workers=4, retries=3, backoff=2.0,
+           force=False, manifest=None):
+    backend = backend or FastF1Backend()
+    manifest = manifest or IngestManifest()
+
+    jobs = plan_sessions(backend, years, session_types)
+    pending = [
+        job for job in jobs
+        if force or not (manifest.status(*job) == "complete" and has_session(*job))
+    ]
+    print(f"⏳ {len(pending)} sessions to ingest ({len(jobs) - len(pending)} already complete)")
+
+    completed, failed = ingest_jobs(backend, manifest, pending, workers, retries, backoff)
+
+    print(f"\n📦 Ingestion done: {len(completed)} saved, {len(failed)} failed, "
+          f"{len(jobs) - len(pending)} skipped")
+    cache = getattr(backend, "cache", None)
+    if cache:
+        cache.maintain()
+        stats = cache.report()
+        print(f"🗄️ FastF1 cache: {stats['size_mb']}/{stats['limit_mb']} MB, "
+              f"{stats['hits']} hits / {stats['misses']} misses")
+    return completed, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest FastF1 sessions into the session store")
+    parser.add_argument("--years", type=int, nargs="+", required=True)
+    parser.add_argument("--sessions", nargs="+", default=["R", "Q"])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--backoff", type=float, default=2.0)
+    parser.add_argument("--force", action="store_true", help="re-download sessions already complete")
+    parser.add_argument("--local-root", help="serve sessions from a legacy CSV tree instead of FastF1")
+    args = parser.parse_args()
+
+    backend = LocalCSVBackend(args.local_root) if args.local_root else FastF1Backend()
+    ingest(args.years, args.sessions, backend=backend, workers=args.workers,
+           retries=args.retries, backoff=args.backoff, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Created on Sat Oct 17 2026
+@author: sid
+
+Lap Analytics : True stint segmentation and tyre degradation / fuel-corrected pace per stint.
+Stints are split on Stint changes, pit-in laps and pit-out laps (not on Compound, which merges
+two stints on the same tyre). Clean green-flag laps are fuel-corrected and every stint of a
+whole season is fitted at once with closed-form least squares from grouped sums, so there is
+no Python loop per driver or stint. strategy_stints() gives the tyre-strategy view (FastF1 stint
+numbers with start/end lap, compound and tyre life) for the strategy charts.
+
+Usage:
+    python lap_analytics.py --year 2025 --gp "Miami Grand Prix"
+"""
+
+import argparse
+import numpy as np
+import pandas as pd
+
+from session_store import load_season
+
+LAP_COLUMNS = ["Driver", "LapNumber", "Stint", "LapTime", "PitInTime", "PitOutTime",
+               "Compound", "TyreLife", "TrackStatus"]
+STRATEGY_COLUMNS = ["Driver", "LapNumber", "Stint", "Compound", "TyreLife", "FreshTyre"]
+
+# Lap time gained per lap of fuel burned (~1.7 kg/lap at ~0.035 s/kg)
+FUEL_SEC_PER_LAP = 0.06
+# Laps slower than this multiple of the race's median clean lap are traffic/incident laps
+SLOW_LAP_FACTOR = 1.07
+MIN_STINT_LAPS = 5
+
+STINT_FEATURES = ["DegradationSlope", "FuelCorrectedPace", "FuelCorrectedPaceGap", "StintCount"]
+
+
+def segment_stints(laps):
+    """Laps sorted by race/driver/lap with StintId (global), LapInStint, and IsClean flags."""
+    keys = [k for k in ("Year", "GP") if k in laps.columns] + ["Driver"]
+    laps = laps.sort_values(keys + ["LapNumber"]).reset_index(drop=True)
+
+    same_driver = np.ones(len(laps), dtype=bool)
+    for k in keys:
+        col = laps[k].to_numpy()
+        same_driver[1:] &= col[1:] == col[:-1]
+    same_driver[0] = False
+
+    stint = laps["Stint"].to_numpy(dtype=float)
+    pit_in = laps["PitInTime"].notna().to_numpy()
+    pit_out = laps["PitOutTime"].notna().to_numpy()
+    # A new stint starts on a new driver, a Stint number change, a pit-out lap,
+    # or the lap after a pit-in lap
+    new_stint = ~same_driver
+    new_stint[1:] |= (stint[1:] != stint[:-1]) & ~(np.isnan(stint[1:]) & np.isnan(stint[:-1]))
+    new_stint[1:] |= pit_out[1:] & ~new_stint[1:]
+    new_stint[1:] |= pit_in[:-1]
+    laps["StintId"] = np.cumsum(new_stint) - 1
+
+    starts = np.flatnonzero(new_stint)
+    laps["LapInStint"] = np.arange(len(laps)) - np.repeat(starts, np.diff(np.append(starts, len(laps))))
+
+    lap_sec = laps["LapTime"].dt.total_seconds()
+    status = laps["TrackStatus"].astype("string").fillna("")
+    clean = lap_sec.notna() & ~pit_in & ~pit_out & (laps["LapNumber"] > 1) & status.str.fullmatch("1*").fillna(False)
+    race_keys = keys[:-1] or ["Driver"]
+    median = lap_sec.where(clean).groupby([laps[k] for k in race_keys]).transform("median")
+    laps["LapTimeSec"] = lap_sec
+    laps["IsClean"] = (clean & (lap_sec <= median * SLOW_LAP_FACTOR)).to_numpy()
+    return laps
+
+
+def strategy_stints(laps):
+    """One row per tyre stint as FastF1 numbers them (run-length encoding of Stint per race/driver;
+    missing Stint values continue the previous stint): StartLap, EndLap, Laps, Compound,
+    TyreLifeStart / TyreLifeEnd and FreshTyre. Works on one race or a whole season at once."""
+    keys = [k for k in ("Year", "GP") if k in laps.columns] + ["Driver"]
+    laps = laps.sort_values(keys + ["LapNumber"]).reset_index(drop=True)
+
+    new_stint = np.zeros(len(laps), dtype=bool)
+    new_stint[:1] = True
+    for k in keys:
+        col = laps[k].to_numpy()
+        new_stint[1:] |= col[1:] != col[:-1]
+    stint = laps["Stint"].to_numpy(dtype=float)
+    new_stint[1:] |= (stint[1:] != stint[:-1]) & ~np.isnan(stint[1:])
+    stint_id = np.cumsum(new_stint) - 1
+
+    starts = np.flatnonzero(new_stint)
+    ends = np.append(starts[1:], len(laps)) - 1
+    lap_number = laps["LapNumber"].to_numpy(dtype=float)
+    first = laps.iloc[starts]
+    stints = first[keys].reset_index(drop=True)
+    stints["Stint"] = first["Stint"].to_numpy()
+    stints["StartLap"] = lap_number[starts]
+    stints["EndLap"] = lap_number[ends]
+    stints["Laps"] = ends - starts + 1
+    # First non-missing value within each stint
+    grouped = laps.groupby(stint_id, sort=True)
+    stints["Compound"] = grouped["Compound"].first().fillna("UNKNOWN").to_numpy()
+    if "TyreLife" in laps.columns:
+        tyre_life = laps["TyreLife"].to_numpy(dtype=float)
+        stints["TyreLifeStart"] = tyre_life[starts]
+        stints["TyreLifeEnd"] = tyre_life[ends]
+    if "FreshTyre" in laps.columns:
+        stints["FreshTyre"] = grouped["FreshTyre"].first().to_numpy()
+    return stints
+
+
+def fuel_corrected(laps):
+    """Lap time minus the fuel-load penalty still on board (laps left in the driver's race)."""
+    keys = [k for k in ("Year", "GP") if k in laps.columns]
+    race_laps = laps.groupby(keys)["LapNumber"].transform("max") if keys else laps["LapNumber"].max()
+    return laps["LapTimeSec"] - FUEL_SEC_PER_LAP * (race_laps - laps["LapNumber"])
+
+
+def fit_stints(laps):
+    """One row per stint: degradation slope (s/lap of tyre age) and fuel-corrected pace,
+    from batched closed-form least squares over every clean lap of every stint."""
+    laps = segment_stints(laps) if "StintId" not in laps.columns else laps
+    n_stints = int(laps["StintId"].max()) + 1 if len(laps) else 0
+    clean = laps["IsClean"].to_numpy()
+    sid = laps["StintId"].to_numpy()[clean]
+    y = fuel_corrected(laps).to_numpy()[clean]
+    tyre_age = laps["TyreLife"].to_numpy(dtype=float)
+    x = np.where(np.isnan(tyre_age), laps["LapInStint"].to_numpy(dtype=float), tyre_age)[clean]
+
+    n = np.bincount(sid, minlength=n_stints).astype(float)
+    sx = np.bincount(sid, x, n_stints)
+    sy = np.bincount(sid, y, n_stints)
+    sxx = np.bincount(sid, x * x, n_stints)
+    sxy = np.bincount(sid, x * y, n_stints)
+    syy = np.bincount(sid, y * y, n_stints)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        denom = n * sxx - sx ** 2
+        slope = np.where((n >= MIN_STINT_LAPS) & (denom > 0), (n * sxy - sx * sy) / denom, np.nan)
+        intercept = (sy - slope * sx) / n
+        ss_tot = syy - sy ** 2 / n
+        ss_res = syy - intercept * sy - slope * sxy
+        r2 = 1 - ss_res / ss_tot
+
+    first = laps.groupby("StintId", sort=True).first()
+    keys = [k for k in ("Year", "GP") if k in laps.columns]
+    stints = first[keys + ["Driver", "Stint", "Compound"]].reset_index()
+    span = laps.groupby("StintId")["LapNumber"].agg(["min", "max", "size"])
+    stints["StartLap"] = span["min"].to_numpy()
+    stints["EndLap"] = span["max"].to_numpy()
+    stints["Laps"] = span["size"].to_numpy()
+    stints["CleanLaps"] = n.astype(int)
+    stints["DegradationSlope"] = slope
+    stints["FuelCorrectedPace"] = np.where(n > 0, sy / np.maximum(n, 1), np.nan)
+    stints["FitR2"] = r2
+    return stints
+
+
+def stint_features(laps):
+    """Per (race, driver): clean-lap-weighted degradation slope, fuel-corrected pace,
+    gap to the race's best fuel-corrected pace and number of stints."""
+    stints = fit_stints(laps)
+    keys = [k for k in ("Year", "GP") if k in stints.columns]
+    w = stints["CleanLaps"].where(stints["DegradationSlope"].notna(), 0)
+    stints = stints.assign(
+        w=w,
+        slope_w=stints["DegradationSlope"].fillna(0) * w,
+        pace_w=stints["FuelCorrectedPace"].fillna(0) * stints["CleanLaps"])
+    grouped = stints.groupby(keys + ["Driver"], observed=True)
+    sums = grouped[["w", "slope_w", "pace_w", "CleanLaps"]].sum()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        features = pd.DataFrame({
+            "DegradationSlope": (sums["slope_w"] / sums["w"]).where(sums["w"] > 0),
+            "FuelCorrectedPace": (sums["pace_w"] / sums["CleanLaps"]).where(sums["CleanLaps"] > 0),
+            "StintCount": grouped.size()
+        }).reset_index()
+    best = features.groupby(keys)["FuelCorrectedPace"].transform("min") if keys else features["FuelCorrectedPace"].min()
+    features["FuelCorrectedPaceGap"] = features["FuelCorrectedPace"] - best
+    return features[keys + ["Driver"] + STINT_FEATURES]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stint degradation and fuel-corrected pace")
+    parser.add_argument("--year", type=int, required=True)
+    parser.add_argument("--gp", nargs="*", default=None, help="Grand Prix names (default: whole season)")
+    args = parser.parse_args()
+
+    laps = load_season("laps", args.year, "R", LAP_COLUMNS, events=args.gp)
+    stints = fit_stints(laps)
+    print(f"\n🛞 {len(stints)} stints across {stints['GP'].nunique()} races:")
+    print(stints.round(3).to_string(index=False))
+    print("\n📈 Per-driver features:")
+    print(stint_features(laps).round(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Created on Sat Oct 17 2026
+@author: sid
+
+Lap Deltas : Lap and sector times of a race or a whole season indexed once by
+(race, driver, lap) into one dense NumPy array, so pairwise lap / sector delta matrices and
+cumulative gap traces for any set of drivers (up to the whole grid) are array slices and
+broadcasts instead of one boolean scan of the laps frame per driver and sector. Median deltas
+to the field per (race, driver) feed the season feature builder.
+
+Usage:
+    python lap_deltas.py --year 2025 --gp "Miami Grand Prix" --drivers VER NOR PIA
+    python lap_deltas.py --year 2025 --metric Sector2Time
+"""
+
+import argparse
+import warnings
+import numpy as np
+import pandas as pd
+
+from session_store import load_season
+
+DELTA_COLUMNS = ["Driver", "Team", "LapNumber", "Time", "LapTime", "Sector1Time", "Sector2Time", "Sector3Time"]
+METRICS = ["LapTime", "Sector1Time", "Sector2Time", "Sector3Time"]
+
+DELTA_FEATURES = ["LapDeltaToField", "Sector1DeltaToField", "Sector2DeltaToField", "Sector3DeltaToField"]
+
+
+def seconds(values):
+    return pd.to_timedelta(values).dt.total_seconds().to_numpy(dtype=float)
+
+
+class LapIndex:
+    """Dense (race, driver, lap, metric) lap/sector times in seconds (NaN where missing), plus the
+    session time at the end of every lap for gap traces. Races are (Year, GP) when present."""
+
+    def __init__(self, laps, metrics=METRICS):
+        self.race_keys = [k for k in ("Year", "GP") if k in laps.columns]
+        self.metrics = list(metrics)
+        if self.race_keys:
+            race_code, races = pd.factorize(pd.MultiIndex.from_frame(laps[self.race_keys].astype(object)))
+            self.races = list(races)
+        else:
+            race_code, self.races = np.zeros(len(laps), dtype=np.int64), [None]
+        driver_code, drivers = pd.factorize(laps["Driver"].astype(str), sort=True)
+        self.drivers = list(drivers)
+        self.driver_pos = {d: i for i, d in enumerate(self.drivers)}
+
+        lap = pd.to_numeric(laps["LapNumber"], errors="coerce").to_numpy()
+        valid = ~np.isnan(lap) & (lap >= 1)
+        lap_code = lap[valid].astype(np.int64) - 1
+        self.n_laps = int(lap_code.max()) + 1 if valid.any() else 0
+        r, d = race_code[valid], driver_code[valid]
+
+        shape = (len(self.races), len(self.drivers), self.n_laps)
+        self.times = np.full(shape + (len(self.metrics),), np.nan)
+        for m, metric in enumerate(self.metrics):
+            if metric in laps.columns:
+                self.times[r, d, lap_code, m] = seconds(laps[metric])[valid]
+        self.session_time = np.full(shape, np.nan)
+        if "Time" in laps.columns:
+            self.session_time[r, d, lap_code] = seconds(laps["Time"])[valid]
+
+        self.teams = {}
+        if "Team" in laps.columns:
+            teams = laps.dropna(subset=["Team"]).drop_duplicates("Driver", keep="last")
+            self.teams = dict(zip(teams["Driver"].astype(str), teams["Team"]))
+
+    @classmethod
+    def for_season(cls, year, events=None, session_type="R"):
+        return cls(load_season("laps", year, session_type, DELTA_COLUMNS, events=events))
+
+    # Positions of drivers on the driver axis (all drivers for None; unknown drivers are skipped)
+    def driver_index(self, drivers=None):
+        if drivers is None:
+            return np.arange(len(self.drivers))
+        return np.array([self.driver_pos[d] for d in drivers if d in self.driver_pos], dtype=np.int64)
+
+    # A single-race index drops its race axis; otherwise None keeps every race
+    def race_index(self, race):
+        if race is None:
+            return 0 if len(self.races) == 1 else slice(None)
+        if not isinstance(race, tuple):
+            matches = [i for i, r in enumerate(self.races) if r is not None and r[-1] == race]
+            if len(matches) != 1:
+                raise KeyError(f"Race {race!r} is {'ambiguous' if matches else 'not indexed'}")
+            return matches[0]
+        return self.races.index(race)
+
+    def metric_index(self, metric):
+        return self.metrics.index(metric)
+
+    def series(self, drivers=None, metric="LapTime", race=None):
+        """(races, drivers, laps) times for one metric; (drivers, laps) for a single race."""
+        times = self.times[self.race_index(race)][..., self.metric_index(metric)]
+        return times[..., self.driver_index(drivers), :]
+
+    def deltas(self, drivers=None, metric="LapTime", race=None):
+        """Per-lap pairwise deltas [..., i, j, lap] = time(i) - time(j); negative means i was faster."""
+        t = self.series(drivers, metric, race)
+        return t[..., :, None, :] - t[..., None, :, :]
+
+    def delta_matrix(self, drivers=None, metric="LapTime", race=None, agg="mean"):
+        """Pairwise delta [..., i, j] aggregated over the laps both drivers completed."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            reduce = np.nanmedian if agg == "median" else np.nanmean
+            return reduce(self.deltas(drivers, metric, race), axis=-1)
+
+    def gap_traces(self, drivers=None, race=None, reference=None):
+        """Cumulative gap (s) at the end of every lap to `reference` (default: the lap's leader)."""
+        race_idx = self.race_index(race)
+        session_time = self.session_time[race_idx]
+        if reference is None:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                ref = np.nanmin(session_time, axis=-2)
+        else:
+            ref = session_time[..., self.driver_pos[reference], :]
+        return session_time[..., self.driver_index(drivers), :] - ref[..., None, :]
+
+    def delta_frame(self, drivers=None, metric="LapTime", race=None):
+        names = [self.drivers[i] for i in self.driver_index(drivers)]
+        return pd.DataFrame(self.delta_matrix(drivers, metric, race), index=names, columns=names)
+
+
+def delta_features(index):
+    """Per (race, driver): median lap / sector time delta to the lap's field median, every race at once."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        field = np.nanmedian(index.times, axis=1, keepdims=True)
+        delta = np.nanmedian(index.times - field, axis=2)
+    n_races, n_drivers = delta.shape[:2]
+    # "LapTime" -> "LapDeltaToField", "Sector1Time" -> "Sector1DeltaToField", ...
+    names = [f"{m.replace('Time', '')}DeltaToField" for m in index.metrics]
+    features = pd.DataFrame(delta.reshape(n_races * n_drivers, -1), columns=names)
+    features.insert(0, "Driver", np.tile(index.drivers, n_races))
+    if index.race_keys:
+        race_rows = np.repeat(np.arange(n_races), n_drivers)
+        for k, key in enumerate(index.race_keys):
+            features.insert(k, key, [index.races[r][k] for r in race_rows])
+    # Drivers who did not start a race have no laps there
+    return features.dropna(subset=names, how="all").reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pairwise lap / sector delta matrices and gap traces")
+    parser.add_argument("--year", type=int, required=True)
+    parser.add_argument("--gp", default=None, help="one Grand Prix (default: the whole season)")
+    parser.add_argument("--drivers", nargs="*", default=None, help="driver codes (default: whole grid)")
+    parser.add_argument("--metric", choices=METRICS, default="LapTime")
+    args = parser.parse_args()
+
+    index = LapIndex.for_season(args.year, [args.gp] if args.gp else None)
+    for race in index.races:
+        print(f"\n⏱️ {race[0]} {race[1]}: mean {args.metric} delta (row - column, s)")
+        print(index.delta_frame(args.drivers, args.metric, race).round(3).to_string())
+        if args.gp:
+            names = [index.drivers[i] for i in index.driver_index(args.drivers)]
+            gaps = pd.DataFrame(index.gap_traces(args.drivers, race), index=names)
+            print("\n📉 Gap to the leader on each driver's last lap (s):")
+            print(gaps.ffill(axis=1).iloc[:, -1].round(3).sort_values().to_string())
+    print("\n📊 Median delta to the field:")
+    print(delta_features(index).round(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Created on Sat Oct 17 2026
+@author: sid
+
+Model Registry : Versioned, fused model artifacts.
+Each version is one folder holding the booster in XGBoost's native UBJSON format (model.ubj)
+and a small meta.json with the scaler mean/scale, the feature list, the training-data
+fingerprint, params and metrics. Scaling is applied inside FusedModel.predict, so a model can
+never be paired with the wrong scaler. registry.json resolves "latest" or a pinned version.
+
+Usage:
+    python model_registry.py --list
+    python model_registry.py --convert-legacy
+    python model_registry.py --pin v002
+"""
+
+import os
+import json
+import time
+import hashlib
+import argparse
+import threading
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from session_store import BASE_PATH
+
+REGISTRY_PATH = os.path.join(BASE_PATH, "model_registry")
+REGISTRY_FILENAME = "registry.json"
+REGISTRY_FILE = os.path.join(REGISTRY_PATH, REGISTRY_FILENAME)
+MODEL_FILENAME = "model.ubj"
+META_FILENAME = "meta.json"
+
+# Pickles written by train_model.py before the registry existed
+LEGACY_MODEL_FILE = os.path.join(BASE_PATH, "race_result_regressor_v2.pkl")
+LEGACY_SCALER_FILE = os.path.join(BASE_PATH, "scaler_v2.pkl")
+LEGACY_FEATURES_FILE = os.path.join(BASE_PATH, "combined_engineered_features.csv")
+
+_loaded_models = {}
+_lock = threading.Lock()
+
+
+# Content fingerprint of a training frame (values, column names and order)
+def data_fingerprint(df):
+    h = hashlib.sha256()
+    h.update(json.dumps([str(c) for c in df.columns]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+class FusedModel:
+    """XGBoost booster + standard-scaler parameters + feature order, scored as one unit."""
+
+    def __init__(self, booster, features, mean, scale, meta=None):
+        self.booster = booster
+        self.features = list(features)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.meta = meta or {}
+        self.version = self.meta.get("version")
+        if not (len(self.features) == len(self.mean) == len(self.scale)):
+            raise ValueError("feature list and scaler parameters have different lengths")
+        if booster.num_features() != len(self.features):
+            raise ValueError(f"booster expects {booster.num_features()} features, artifact lists {len(self.features)}")
+
+    def transform(self, X):
+        if isinstance(X, pd.DataFrame):
+            missing = [c for c in self.features if c not in X.columns]
+            if missing:
+                raise KeyError(f"missing model features: {missing}")
+            X = X[self.features]
+        X = np.asarray(X, dtype=np.float64)
+        return (X - self.mean) / self.scale
+
+    def predict(self, X):
+        iteration_range = (0, self.meta["best_iteration"] + 1) if self.meta.get("best_iteration") is not None else (0, 0)
+        return self.booster.inplace_predict(self.transform(X), iteration_range=iteration_range)
+
+
+def _scaler_params(scaler, n_features):
+    # Scalers fitted with with_mean/with_std=False have mean_/scale_ set to None
+    mean = scaler.mean_ if getattr(scaler, "mean_", None) is not None else np.zeros(n_features)
+    scale = scaler.scale_ if getattr(scaler, "scale_", None) is not None else np.ones(n_features)
+    return [float(v) for v in mean], [float(v) for v in scale]
+
+
+# === Registry file ===
+def load_registry(path=REGISTRY_PATH):
+    registry_file = os.path.join(path, REGISTRY_FILENAME)
+    if os.path.exists(registry_file):
+        with open(registry_file) as f:
+            return json.load(f)
+    return {"versions": [], "latest": None, "pinned": None}
+
+
+def save_registry(registry, path=REGISTRY_PATH):
+    os.makedirs(path, exist_ok=True)
+    registry_file = os.path.join(path, REGISTRY_FILENAME)
+    tmp_path = registry_file + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(registry, f, indent=2)
+    os.replace(tmp_path, registry_file)
+
+
+def version_path(version, path=REGISTRY_PATH):
+    return os.path.join(path, version)
+
+
+def resolve_version(version=None, path=REGISTRY_PATH):
+    """None -> pinned version (or latest if nothing is pinned); "latest" -> newest; else the given version."""
+    registry = load_registry(path)
+    if version is None:
+        version = registry.get("pinned") or registry.get("latest")
+    elif version == "latest":
+        version = registry.get("latest")
+    elif isinstance(version, int) or str(version).isdigit():
+        version = f"v{int(version):03d}"
+    if not version or version not in registry["versions"]:
+        raise FileNotFoundError(f"No model version {version!r} in {path} (run model_registry.py --convert-legacy or train_model.py)")
+    return version
+
+
+# === Writing ===
+def _content_hash(raw, features, mean, scale, data_hash):
+    h = hashlib.sha256(bytes(raw))
+    h.update(json.dumps([list(features), mean, scale, data_hash]).encode())
+    return h.hexdigest()
+
+
+def register_model(model, scaler, features, data_hash, params=None, metrics=None, source=None, path=REGISTRY_PATH):
+    """Store an XGBRegressor/Booster with its fitted scaler as a new version; returns the version name.
+    Re-registering an identical model + scaler + data fingerprint makes the existing version latest again."""
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    raw = booster.save_raw(raw_format="ubj")
+    mean, scale = _scaler_params(scaler, len(features))
+    best_iteration = getattr(model, "best_iteration", None) if hasattr(model, "get_booster") else None
+    content_hash = _content_hash(raw, features, mean, scale, data_hash)
+
+    with _lock:
+        registry = load_registry(path)
+        for version in registry["versions"]:
+            meta_file = os.path.join(version_path(version, path), META_FILENAME)
+            if os.path.exists(meta_file):
+                with open(meta_file) as f:
+                    if json.load(f).get("content_hash") == content_hash:
+                        print(f"♻️ Identical model already registered as {version}")
+                        registry["latest"] = version
+                        save_registry(registry, path)
+                        return version
+
+        version = f"v{len(registry['versions']) + 1:03d}"
+        folder = version_path(version, path)
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, MODEL_FILENAME), "wb") as f:
+            f.write(raw)
+        meta = {
+            "version": version,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "features": list(features),
+            "scaler": {"mean": mean, "scale": scale},
+            "data_fingerprint": data_hash,
+            "content_hash": content_hash,
+            "best_iteration": best_iteration,
+            "params": params or {},
+            "metrics": metrics or {},
+            "source": source or "train_model.py"
+        }
+        with open(os.path.join(folder, META_FILENAME), "w") as f:
+            json.dump(meta, f, indent=2)
+
+        registry["versions"].append(version)
+        registry["latest"] = version
+        save_registry(registry, path)
+    print(f"💾 Registered model {version}: {folder}")
+    return version
+
+
+def pin_version(version, path=REGISTRY_PATH):
+    """Pin the version that load_model() resolves by default; pass None to follow latest again."""
+    with _lock:
+        registry = load_registry(path)
+        registry["pinned"] = resolve_version(version, path) if version else None
+        save_registry(registry, path)
+    return registry["pinned"]
+
+
+# === Loading ===
+def load_model(version=None, path=REGISTRY_PATH):
+    """Fused model for a version (default: pinned, else latest); cached per process."""
+    version = resolve_version(version, path)
+    key = (path, version)
+    if key not in _loaded_models:
+        folder = version_path(version, path)
+        with open(os.path.join(folder, META_FILENAME)) as f:
+            meta = json.load(f)
+        booster = xgb.Booster()
+        booster.load_model(os.path.join(folder, MODEL_FILENAME))
+        _loaded_models[key] = FusedModel(booster, meta["features"], meta["scaler"]["mean"], meta["scaler"]["scale"], meta)
+        print(f"✅ Loaded model {version} ({len(meta['features'])} features)")
+    return _loaded_models[key]
+
+
+def list_versions(path=REGISTRY_PATH):
+    registry = load_registry(path)
+    rows = []
+    for version in registry["versions"]:
+        with open(os.path.join(version_path(version, path), META_FILENAME)) as f:
+            meta = json.load(f)
+        rows.append({
+            "version": version,
+            "created": meta["created"],
+            "source": meta.get("source"),
+            "data": meta["data_fingerprint"][:12] if meta.get("data_fingerprint") else None,
+            **{k: round(v, 3) for k, v in meta.get("metrics", {}).items()},
+            "tag": "pinned" if version == registry.get("pinned") else ("latest" if version == registry.get("latest") else "")
+        })
+    return pd.DataFrame(rows)
+
+
+# One-off conversion of the joblib model/scaler pickles into a registry version
+def convert_legacy(model_file=LEGACY_MODEL_FILE, scaler_file=LEGACY_SCALER_FILE,
+                   features_file=LEGACY_FEATURES_FILE, features=None, path=REGISTRY_PATH):
+    import joblib
+
+    model = joblib.load(model_file)
+    scaler = joblib.load(scaler_file)
+    features = features or list(getattr(scaler, "feature_names_in_", [])) or [
+        'QualiPosition', 'PitStopCount', 'AvgRaceLapTime', 'AirTemp',
+        'TrackTemp', 'Humidity', 'AvgFinishingPosition', 'AvgQualifyingPosition'
+    ]
+    data_hash = data_fingerprint(pd.read_csv(features_file)) if os.path.exists(features_file) else None
+    params = {k: v for k, v in model.get_params().items() if isinstance(v, (int, float, str, bool))}
+    return register_model(model, scaler, features, data_hash, params=params,
+                          source=f"legacy:{os.path.basename(model_file)}+{os.path.basename(scaler_file)}", path=path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage versioned race prediction models")
+    parser.add_argument("--list", action="store_true", help="list registered versions")
+    parser.add_argument("--convert-legacy", action="store_true", help="register the joblib model/scaler pickles")
+    parser.add_argument("--model-file", default=LEGACY_MODEL_FILE)
+    parser.add_argument("--scaler-file", default=LEGACY_SCALER_FILE)
+    parser.add_argument("--pin", help='version to pin, or "none" to follow latest')
+    args = parser.parse_args()
+
+    if args.convert_legacy:
+        convert_legacy(args.model_file, args.scaler_file)
+    if args.pin:
+        pinned = pin_version(None if args.pin.lower() == "none" else args.pin)
+        print(f"📌 Pinned: {pinned or 'none (following latest)'}")
+    if args.list or not (args.convert_legacy or args.pin):
+        print(list_versions().to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
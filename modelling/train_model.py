@@ -3,24 +3,30 @@ Train model to predict Finishing Position with the Current Driver Performance
 """
 
 import os
-import joblib
+import sys
+import argparse
 import pandas as pd
 import numpy as np
 import warnings as w
 import matplotlib.pyplot as plt
 from xgboost import XGBRegressor
-from sklearn.model_selection import train_test_split, GridSearchCV
+from sklearn.model_selection import GridSearchCV
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from model_registry import REGISTRY_FILE, data_fingerprint, register_model
+from hyperparameter_search import successive_halving
+from race_cv import (DEFAULT_THREADS, build_folds, cross_validate, forward_chaining_splits,
+                     holdout_split, race_positions)
+
 w.filterwarnings('ignore')
 
 # === Paths ===
 BASE_PATH = r"/Users/sid/Downloads/F1_RacePredictions"
 FEATURES_FILE = os.path.join(BASE_PATH, "combined_engineered_features.csv")
-MODEL_FILE = os.path.join(BASE_PATH, "race_result_regressor_v2.pkl")
-SCALER_FILE = os.path.join(BASE_PATH, "scaler_v2.pkl")
 IMAGE_FOLDER = os.path.join(BASE_PATH, "images")
+IMPORTANCE_FILE = os.path.join(IMAGE_FOLDER, "feature_importance_v2.png")
 
 # === Feature columns for training ===
 important_features = [
@@ -34,40 +40,99 @@ important_features = [
     'AvgQualifyingPosition'
 ]
 
-# === Data Preprocessing ===
-def preprocess_data(df, features):
-    df = df.dropna(subset=features + ['FinalPosition'])
-    df = df[df['FinalPosition'] <= 20]  # drop DNS/DNF etc.
-    X = df[features]
-    y = df['FinalPosition']
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    return X_scaled, y, scaler
-
-# === Model Training ===
-def train_model(df):
-    print("🧹 Preprocessing features...")
-    X, y, scaler = preprocess_data(df, important_features)
+# Optional stint features from lap_analytics.py (--stint-features)
+stint_features = [
+    'DegradationSlope',
+    'FuelCorrectedPace',
+    'FuelCorrectedPaceGap',
+    'StintCount'
+]
 
-    print("\n📊 FinalPosition target variable summary:")
-    print(y.describe())
+# Optional lap / sector pace deltas to the field from lap_deltas.py (--delta-features)
+delta_features = [
+    'LapDeltaToField',
+    'Sector1DeltaToField',
+    'Sector2DeltaToField',
+    'Sector3DeltaToField'
+]
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42)
+# === Data Preprocessing ===
+# Races are split chronologically: the latest races are held out for testing and the
+# scaler is fitted on the training races only
+def preprocess_data(df, features, test_fraction=0.2):
+    df = df.dropna(subset=features + ['FinalPosition'])
+    df = df[df['FinalPosition'] <= 20].reset_index(drop=True)  # drop DNS/DNF etc.
+    race_pos, keys = race_positions(df)
+    train_idx, test_idx = holdout_split(race_pos, test_fraction)
 
-    print("🔍 Performing hyperparameter tuning...")
+    X = df[features].to_numpy(dtype=float)
+    y = df['FinalPosition'].to_numpy(dtype=float)
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X[train_idx])
+    X_test = scaler.transform(X[test_idx])
+    return X_train, X_test, y[train_idx], y[test_idx], race_pos[train_idx], scaler
+
+# === Hyperparameter tuning ===
+# "halving": budgeted successive halving with early stopping, cached per dataset hash
+# "grid": the original 27-combination grid, now scored on the same race folds
+def tune_halving(X_train, y_train, folds, data_hash, budget_seconds=60.0, thread_budget=DEFAULT_THREADS):
+    result = successive_halving(folds, data_hash=data_hash, budget_seconds=budget_seconds,
+                                thread_budget=thread_budget)
+    best_params = dict(result["params"], n_estimators=result["n_estimators"])
+    model = XGBRegressor(random_state=42, n_jobs=thread_budget, **best_params)
+    model.fit(X_train, y_train)
+    return model, best_params
+
+
+def tune_grid(X_train, y_train, folds, thread_budget=DEFAULT_THREADS):
     param_grid = {
         'n_estimators': [100, 200, 300],
         'max_depth': [4, 6, 8],
         'learning_rate': [0.05, 0.1, 0.2]
     }
 
-    grid = GridSearchCV(XGBRegressor(random_state=42), param_grid, cv=3,
-                        scoring='neg_mean_absolute_error', n_jobs=-1)
+    cv = [(fold.train_idx, fold.valid_idx) for fold in folds]
+    grid = GridSearchCV(XGBRegressor(random_state=42, n_jobs=1), param_grid, cv=cv,
+                        scoring='neg_mean_absolute_error', n_jobs=thread_budget)
     grid.fit(X_train, y_train)
+    return grid.best_estimator_, grid.best_params_
 
-    best_model = grid.best_estimator_
-    print(f"✅ Best parameters: {grid.best_params_}")
+# === Feature Importance Plot ===
+def plot_feature_importance(feat_importance):
+    plt.figure(figsize=(8, 4))
+    feat_importance.sort_values().plot(kind='barh', title='Feature Importance (XGBoost)')
+    plt.xlabel('Importance')
+    plt.tight_layout()
+    os.makedirs(IMAGE_FOLDER, exist_ok=True)
+    plt.savefig(IMPORTANCE_FILE)
+    plt.close()
+
+# === Model Training ===
+def train_model(df, tuning="halving", budget_seconds=60.0, n_splits=5, thread_budget=DEFAULT_THREADS,
+                features=important_features):
+    print("🧹 Preprocessing features...")
+    X_train, X_test, y_train, y_test, race_pos, scaler = preprocess_data(df, features)
+
+    print("\n📊 FinalPosition target variable summary:")
+    print(pd.Series(y_train).describe())
+
+    # Forward-chaining folds over the training races; matrices are built once per fold
+    folds = build_folds(X_train, y_train, forward_chaining_splits(race_pos, n_splits))
+    print(f"🧩 {race_pos.max() + 1} training races, {len(folds)} forward-chaining folds, "
+          f"{len(y_test)} held-out rows from the latest races")
+
+    print(f"🔍 Performing hyperparameter tuning ({tuning})...")
+    data_hash = data_fingerprint(df[['Year', 'GP', 'Driver'] + features + ['FinalPosition']])
+    if tuning == "grid":
+        best_model, best_params = tune_grid(X_train, y_train, folds, thread_budget)
+    else:
+        best_model, best_params = tune_halving(X_train, y_train, folds, data_hash, budget_seconds, thread_budget)
+    print(f"✅ Best parameters: {best_params}")
+
+    cv_params = {k: v for k, v in best_params.items() if k != 'n_estimators'}
+    cv_scores = cross_validate(cv_params, best_params['n_estimators'], folds, thread_budget=thread_budget)
+    print("\n🧪 Forward-chaining CV (best parameters):")
+    print(cv_scores.round(3).to_string(index=False))
 
     # Evaluate on test set
     y_pred = best_model.predict(X_test)
@@ -81,24 +146,33 @@ def train_model(df):
     print(f"R²:   {r2:.2f}")
 
     # Save feature importance plot
-    feat_importance = pd.Series(best_model.feature_importances_, index=important_features)
-    plt.figure(figsize=(8, 4))
-    feat_importance.sort_values().plot(kind='barh', title='Feature Importance (XGBoost)')
-    plt.xlabel('Importance')
-    plt.tight_layout()
-    os.makedirs(IMAGE_FOLDER, exist_ok=True)
-    plt.savefig(os.path.join(IMAGE_FOLDER, "feature_importance_v2.png"))
-    plt.close()
+    plot_feature_importance(pd.Series(best_model.feature_importances_, index=features))
 
-    # Save model and scaler
-    joblib.dump(best_model, MODEL_FILE)
-    joblib.dump(scaler, SCALER_FILE)
-    print(f"\n💾 New model saved to: {MODEL_FILE}")
-    print(f"💾 New scaler saved to: {SCALER_FILE}")
+    # Save model and scaler together as one versioned artifact
+    version = register_model(
+        best_model, scaler, features, data_hash,
+        params=best_params,
+        metrics={"mae": mae, "rmse": rmse, "r2": r2, "cv_mae": float(cv_scores['mae'].mean())})
+    print(f"\n💾 New model registered as: {version}")
+    return version
 
 # === Main Execution ===
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the race result regressor")
+    parser.add_argument("--tuning", choices=["halving", "grid"], default="halving")
+    parser.add_argument("--budget-seconds", type=float, default=60.0)
+    parser.add_argument("--folds", type=int, default=5, help="forward-chaining CV folds (one race each)")
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS, help="total thread budget")
+    parser.add_argument("--stint-features", action="store_true",
+                        help="also train on tyre degradation / fuel-corrected pace features")
+    parser.add_argument("--delta-features", action="store_true",
+                        help="also train on median lap / sector time deltas to the field")
+    args = parser.parse_args()
+
     print("📥 Loading dataset...")
     df = pd.read_csv(FEATURES_FILE)
     print(f"✅ Loaded {df.shape[0]} samples with {df.shape[1]} features.")
-    train_model(df)
\ No newline at end of file
+    train_model(df, tuning=args.tuning, budget_seconds=args.budget_seconds,
+                n_splits=args.folds, thread_budget=args.threads,
+                features=important_features + (stint_features if args.stint_features else [])
+                + (delta_features if args.delta_features else []))
\ No newline at end of file
@@ -0,0 +1,292 @@
+"""
+Created on Sat Oct 17 2026
+@author: sid
+
+Pipeline Runner : Models the prediction pipeline as a dependency graph
+(base season features -> driver form -> combined dataset -> model -> evaluation) and fingerprints
+every stage's inputs by content hash. Only stages whose inputs changed are re-executed; within a
+season only the races whose session files changed are rebuilt. Independent stages run in parallel:
+every season's base features at once, then each season's form step once the seasons before it
+are built.
+
+Usage:
+    python pipeline.py --years 2021 2022 2023 2024 2025 --workers 4
+"""
+
+import os
+import json
+import hashlib
+import argparse
+import importlib.util
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import session_store
+from driver_form_index import FORM_INDEX_FILE, DriverFormIndex, get_form_index
+from session_store import BASE_PATH, TABLES, list_sessions
+from season_features import (FEATURE_VERSION, attach_form, build_season_features, order_features, race_order,
+                             register_season_form, season_file, write_race_outputs, write_season_file)
+
+STATE_FILE = os.path.join(BASE_PATH, "pipeline_state.json")
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_FEATURES_DIR = os.path.join(BASE_PATH, "pipeline_cache")
+
+# Seasons whose driver form is rolling within the season (see feature_engineering_2021.py)
+FORM_MODES = {2021: "rolling"}
+
+
+def base_file(year):
+    return os.path.join(BASE_FEATURES_DIR, f"base_features_{year}.parquet")
+
+
+def file_hash(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def combine_hashes(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def outputs_hash(paths):
+    return combine_hashes(*[file_hash(p) if os.path.exists(p) else "missing" for p in paths])
+
+
+# Import a script from a sub-folder (modelling/, evaluation/) that is not a package
+def load_script(relative_path):
+    path = os.path.join(PROJECT_DIR, relative_path)
+    name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Node:
+    """One pipeline stage: re-runs when the hash of its input files, params or upstream outputs changes."""
+
+    def __init__(self, name, run, inputs=(), outputs=(), deps=(), params=None):
+        self.name = name
+        self.run_fn = run
+        self.inputs = inputs
+        self.outputs = list(outputs)
+        self.deps = list(deps)
+        self.params = params or {}
+
+    def input_files(self):
+        return self.inputs() if callable(self.inputs) else list(self.inputs)
+
+    def fingerprint(self, dep_hashes):
+        files = sorted(self.input_files())
+        return combine_hashes(
+            self.name, json.dumps(self.params, sort_keys=True),
+            *[f"{p}:{file_hash(p)}" for p in files if os.path.exists(p)],
+            *[f"{d}:{dep_hashes[d]}" for d in self.deps]
+        )
+
+    def is_fresh(self, fingerprint, state):
+        entry = state.get(self.name, {})
+        return entry.get("fingerprint") == fingerprint and all(os.path.exists(p) for p in self.outputs)
+
+    def run(self, fingerprint, state, dep_hashes):
+        self.run_fn()
+        return {}
+
+
+class BaseFeaturesNode(Node):
+    """A season's features without driver form (base_features_{year}.parquet); keeps one fingerprint
+    per race and only rebuilds races whose sessions changed. Independent of every other season."""
+
+    def __init__(self, year):
+        self.year = year
+        super().__init__(f"base:{year}", run=None, inputs=self.session_files,
+                         outputs=[base_file(year)], params={"feature_version": FEATURE_VERSION})
+
+    def races(self):
+        return sorted({gp for _, gp, st in list_sessions(self.year) if st == "R"})
+
+    def race_files(self, gp):
+        return [
+            os.path.join(session_store.session_path(table, self.year, gp, st), "part-0.parquet")
+            for st in ("R", "Q") for table in TABLES
+        ]
+
+    def session_files(self):
+        return [p for gp in self.races() for p in self.race_files(gp)]
+
+    def race_fingerprints(self):
+        return {
+            gp: combine_hashes(FEATURE_VERSION, *[file_hash(p) for p in self.race_files(gp) if os.path.exists(p)])
+            for gp in self.races()
+        }
+
+    def fingerprint(self, dep_hashes):
+        self._race_fps = self.race_fingerprints()
+        return combine_hashes(self.name, *sorted(self._race_fps.items()))
+
+    def run(self, fingerprint, state, dep_hashes):
+        race_fps = self._race_fps
+        laps = session_store.load_season("laps", self.year, "R", ["LapStartDate"])
+        if laps.empty:
+            print(f"⚠️ {self.name}: no race sessions in the store")
+            return {"races": race_fps}
+        order = race_order(laps)
+
+        previous = state.get(self.name, {}).get("races", {})
+        cached = pd.read_parquet(base_file(self.year)) if os.path.exists(base_file(self.year)) else None
+        built = set(cached["GP"]) if cached is not None else set()
+        changed = [gp for gp in order if previous.get(gp) != race_fps.get(gp) or gp not in built]
+
+        frames = [cached[cached["GP"].isin(set(order) - set(changed))]] if cached is not None else []
+        if changed:
+            print(f"🔧 {self.name}: rebuilding {len(changed)}/{len(order)} races")
+            frames.append(build_season_features(self.year, changed, form_mode=None, write=False))
+        base = order_features(pd.concat(frames, ignore_index=True), order)
+        os.makedirs(os.path.dirname(base_file(self.year)), exist_ok=True)
+        base.to_parquet(base_file(self.year), index=False)
+        return {"races": race_fps}
+
+
+# Form index of the given seasons' races, built from their base features (rows in calendar order)
+def form_index_from(years, index=None):
+    index = index if index is not None else DriverFormIndex()
+    for year in sorted(years):
+        if os.path.exists(base_file(year)):
+            register_season_form(index, pd.read_parquet(base_file(year)), year)
+    return index
+
+
+class SeasonFeaturesNode(Node):
+    """Attaches driver form to a season's base features and writes features.csv / driver_form.csv per
+    race and the season file. Form comes from a local index built from this and the earlier seasons'
+    base features, so only this step depends on earlier seasons and the shared index is untouched."""
+
+    def __init__(self, year, years):
+        self.year = year
+        self.form_mode = FORM_MODES.get(year, "prior_seasons")
+        self.form_years = [y for y in years if y < year]
+        super().__init__(f"features:{year}", run=None, outputs=[season_file(year)],
+                         deps=[f"base:{y}" for y in self.form_years + [year]],
+                         params={"form_mode": self.form_mode, "feature_version": FEATURE_VERSION})
+
+    def run(self, fingerprint, state, dep_hashes):
+        if not os.path.exists(base_file(self.year)):
+            print(f"⚠️ {self.name}: no base features")
+            return {}
+        base = pd.read_parquet(base_file(self.year))
+        races = list(dict.fromkeys(base["GP"]))
+        index = form_index_from(self.form_years)
+        features = order_features(attach_form(base, self.year, races, self.form_mode, index), races)
+        write_race_outputs(features, self.year)
+        write_season_file(features, self.year)
+        return {}
+
+
+# The shared driver_form_index.csv, updated with every pipeline season once (not by the season nodes)
+def save_form_index(years):
+    form_index_from(years, get_form_index()).save()
+
+
+def build_graph(years):
+    combiner = load_script("feature_combiner.py")
+    years = sorted(years)
+    # Base features have no cross-season inputs and build in parallel; each season's form
+    # step waits on the base features of the seasons before it
+    nodes = [BaseFeaturesNode(year) for year in years]
+    feature_nodes = [SeasonFeaturesNode(year, years) for year in years]
+    nodes += feature_nodes
+    nodes.append(Node(
+        "form_index", run=lambda: save_form_index(years),
+        outputs=[FORM_INDEX_FILE], deps=[f"base:{y}" for y in years]))
+
+    nodes.append(Node(
+        "combine", run=combiner.combine_features,
+        outputs=[combiner.OUTPUT_FILE], deps=[n.name for n in feature_nodes]))
+
+    train_module = load_script(os.path.join("modelling", "train_model.py"))
+    nodes.append(Node(
+        "train", run=lambda: train_module.train_model(pd.read_csv(train_module.FEATURES_FILE)),
+        outputs=[train_module.REGISTRY_FILE], deps=["combine"],
+        params={"features": train_module.important_features}))
+
+    evaluation = load_script(os.path.join("evaluation", "model_evaluation.py"))
+    nodes.append(Node(
+        "evaluate", run=evaluation.evaluate_test_races,
+        inputs=[evaluation.HISTORICAL_FEATURES], deps=["train"]))
+    return nodes
+
+
+def load_state(path=STATE_FILE):
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+def save_state(state, path=STATE_FILE):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+# Execute the graph: ready nodes run in parallel, fresh nodes are skipped.
+# A node's downstream fingerprint uses the hash of its outputs, so a rebuild that
+# produces identical files does not invalidate the stages after it.
+def run_pipeline(nodes, workers=4, force=False, state_path=STATE_FILE):
+    state = load_state(state_path)
+    by_name = {n.name: n for n in nodes}
+    output_hashes = {}
+    executed, skipped = [], []
+
+    def execute(node):
+        dep_hashes = {d: output_hashes[d] for d in node.deps}
+        fingerprint = node.fingerprint(dep_hashes)
+        if not force and node.is_fresh(fingerprint, state):
+            return node.name, False, fingerprint, state[node.name]
+        extra = node.run(fingerprint, state, dep_hashes)
+        return node.name, True, fingerprint, dict(extra, fingerprint=fingerprint, outputs=outputs_hash(node.outputs))
+
+    pending = dict(by_name)
+    running = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            for name, node in list(pending.items()):
+                if all(d in output_hashes for d in node.deps):
+                    running[pool.submit(execute, node)] = name
+                    del pending[name]
+            if not running:
+                raise RuntimeError(f"Unresolvable dependencies: {sorted(pending)}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                name, ran, fingerprint, entry = future.result()
+                state[name] = entry
+                output_hashes[name] = entry.get("outputs") or fingerprint
+                (executed if ran else skipped).append(name)
+                print(f"{'✅ Ran' if ran else '⏭️  Up to date'}: {name}")
+                save_state(state, state_path)
+
+    print(f"\n📦 Pipeline done: {len(executed)} stages ran, {len(skipped)} up to date")
+    return executed, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the F1 prediction pipeline incrementally")
+    parser.add_argument("--years", type=int, nargs="+", default=[2021, 2022, 2023, 2024, 2025])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--force", action="store_true", help="re-run every stage")
+    args = parser.parse_args()
+    run_pipeline(build_graph(args.years), workers=args.workers, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,39 +7,44 @@ Pit Stop Strategy : Engineering, how pit stop can play role in driver position
 import os
 import pandas as pd
 import matplotlib.pyplot as plt
-import fastf1
-import fastf1.plotting
-from driver_lap_comparison import BASE_PATH
-fastf1.plotting.setup_mpl(mpl_timedelta_support=True, misc_mpl_mods=True, color_scheme='fastf1')
+from driver_lap_comparison import BASE_PATH, IMAGE_FOLDER, chart_file
+from session_store import load_season, read_table
+from lap_analytics import STRATEGY_COLUMNS, strategy_stints
+from session_catalog import session_info, setup_plot_style
 
-def load_stints(session):
-    stints = session.laps.pick_quicklaps().copy()
-    stints["Compound"] = stints["Compound"].fillna(method="ffill")
-    stints = stints.groupby(["Driver", "Compound"]).agg(StintLength=("LapNumber", "count"))
-    stints = stints.reset_index()
-    return stints
+# Stints come from FastF1's Stint column (lap_analytics.strategy_stints), so two stints on the
+# same compound stay separate bars
+def load_laps(session):
+    return read_table("laps", session.year, session.event_name, "R", STRATEGY_COLUMNS)
 
-def plot_stint_strategy(session, year, gp_name):
-    stints = load_stints(session)
+def load_stints(laps):
+    return strategy_stints(laps)
+
+# One Stint row per (race, driver, stint) for every race of a season at once
+def load_season_stints(year, events=None):
+    return strategy_stints(load_season("laps", year, "R", STRATEGY_COLUMNS, events=events))
+
+def plot_stint_strategy(session, year, gp_name, stints=None, show=True):
+    setup_plot_style()
+    stints = load_stints(load_laps(session)) if stints is None else stints
     drivers = sorted(stints["Driver"].unique(), reverse=True)
     fig, ax = plt.subplots(figsize=(7,12))
-    
-    for driver in drivers:
-        driver_stints = stints.loc[stints["Driver"] == driver]
-        previous_stint_end = 0
-        for idx, row in driver_stints.iterrows():
-            compound_colour = fastf1.plotting.get_compound_color(row["Compound"], session=session)
 
-            ax.barh(
-                y=driver,
-                width=row["StintLength"],
-                left=previous_stint_end,
-                color=compound_colour,
-                edgecolor="black",
-                fill=True
-            )
-            previous_stint_end += row["StintLength"]
-            
+    # One barh call per compound; each bar spans the stint's laps
+    row = stints["Driver"].map({driver: i for i, driver in enumerate(drivers)}).to_numpy()
+    for compound, idx in stints.groupby("Compound", sort=False).indices.items():
+        ax.barh(
+            y=row[idx],
+            width=stints["EndLap"].to_numpy()[idx] - stints["StartLap"].to_numpy()[idx] + 1,
+            left=stints["StartLap"].to_numpy()[idx] - 1,
+            color=session.compound_color(compound),
+            edgecolor="black",
+            fill=True,
+            label=compound
+        )
+    ax.set_yticks(range(len(drivers)), drivers)
+    ax.legend(loc="lower right", fontsize="small")
+
     plt.title(f"{gp_name} {year} Grand Prix - Tire Strategies")
     plt.xlabel("Lap Number")
     plt.grid(False)
@@ -50,17 +55,25 @@ def plot_stint_strategy(session, year, gp_name):
     ax.spines['left'].set_visible(False)
     plt.tight_layout()
     
-    output_folder = os.path.join(BASE_PATH, "images")
-    os.makedirs(output_folder, exist_ok=True)
-    plt.savefig(os.path.join(output_folder, f"{year}_{gp_name}_tire_strategy_plot.png"))
-    plt.show()
+    os.makedirs(IMAGE_FOLDER, exist_ok=True)
+    plt.savefig(chart_file(year, gp_name, "tire_strategy_plot"))
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
 
 def stint_strategy_analysis(year, gp_name):
-    session = fastf1.get_session(year, gp_name, 'R')
-    session.load()
+    # Only metadata is needed up front; laps come from the session store
+    session = session_info(year, gp_name, 'R')
 
     plot_stint_strategy(session, year, gp_name)
 
+# Tyre strategy charts for every race of a season from one stint computation
+def season_strategy_analysis(year, events=None):
+    stints = load_season_stints(year, events)
+    for gp_name, race_stints in stints.groupby("GP", observed=True, sort=False):
+        plot_stint_strategy(session_info(year, gp_name, 'R'), year, gp_name, race_stints, show=False)
+
 if __name__ == "__main__":
     stint_strategy_analysis(2025, "Jeddah")
     stint_strategy_analysis(2024, "Miami")
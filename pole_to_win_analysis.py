@@ -7,119 +7,64 @@ With Heatmap Visualization
 """
 
 import os
-import fastf1
+import time
+import argparse
 import pandas as pd
 import warnings as w
 import matplotlib.pyplot as plt
 import seaborn as sns
-from datetime import datetime
 
 from pit_strategy_analysis import BASE_PATH
+from results_index import completed_races, load_results_index, load_schedule
 
 w.filterwarnings('ignore')
 
-def load_or_fetch_results(year, gp_name, session_type='R'):
-    folder = os.path.join(BASE_PATH, f"{year}_{gp_name}_{session_type}")
-    results_path = os.path.join(folder, "results.csv")
-
-    if os.path.exists(results_path):
-        results_df = pd.read_csv(results_path)
-        return results_df
-    else:
-        print(f"📥 Fetching {year} {gp_name} results from FastF1...")
-        try:
-            session = fastf1.get_session(year, gp_name, session_type)
-            session.load()
-
-            os.makedirs(folder, exist_ok=True)
-            results_df = session.results.reset_index(drop=True)
-            results_df.to_csv(results_path, index=False)
-            print(f"✅ Saved fetched results at {results_path}")
-            return results_df
-        except Exception as e:
-            print(f"❌ Failed to fetch {year} {gp_name}: {e}")
-            return None
-
-def analyze_pole_to_win(year, gp_name):
-    results = load_or_fetch_results(year, gp_name)
-    if results is None:
-        return None
-
-    results = results[["Abbreviation", "GridPosition", "Position"]]
-
-    if results.empty:
-        print(f"⚠️ Empty results for {year} {gp_name}. Skipping...")
-        return None
-
-    pole_data = results.loc[results["GridPosition"] == 1]
-    if pole_data.empty:
-        print(f"⚠️ No pole sitter found for {year} {gp_name}. Skipping...")
-        return None
-
-    pole_sitter = pole_data["Abbreviation"].values[0]
-    pole_finish = pole_data["Position"].values[0]
-
-    won = 1 if pole_finish == 1 else 0
-
-    return {
-        "Year": year,
-        "GrandPrix": gp_name,
-        "PoleSitter": pole_sitter,
-        "WonRace": bool(won)
-    }
+HEATMAP_FILE = os.path.join(BASE_PATH, "images", "pole_to_win_heatmap_2023_to_2025_auto.png")
+
+# One row per race with a pole sitter: did the car starting P1 win? (single filter over the results index)
+def pole_to_win_records(index):
+    poles = index[index["GridPosition"] == 1]
+    return pd.DataFrame({
+        "Year": poles["Year"].astype(int).values,
+        "GrandPrix": poles["GP"].astype(str).values,
+        "PoleSitter": poles["Driver"].astype(str).values,
+        "WonRace": (poles["Position"] == 1).fillna(False).astype(bool).values
+    })
 
 def get_all_grand_prix(year):
-    schedule = fastf1.get_event_schedule(year)
-    gps = schedule['EventName'].tolist()
-    return gps
+    return load_schedule(year)['EventName'].tolist()
 
 def get_completed_2025_races():
     """
-    Fetch 2025 Grand Prix races that have already happened (by today's date).
+    2025 Grand Prix races that have already happened (by today's date), from the cached schedule.
     """
-    schedule = fastf1.get_event_schedule(2025)
-    today = datetime.utcnow()
-
-    completed_races = []
-    for idx, row in schedule.iterrows():
-        if pd.isnull(row['Session5Date']):
-            continue  # Skip if no race date
-        if row['Session5Date'].to_pydatetime() < today:
-            completed_races.append((2025, row['EventName']))
-        else:
-            break  # Future races, stop
-
-    return completed_races
-
-def pole_to_win_mixed_analysis(years_full, races_2025):
-    full_records = []
-
-    # Full seasons
-    for year in years_full:
-        gps = get_all_grand_prix(year)
-
-        for gp in gps:
-            record = analyze_pole_to_win(year, gp)
-            if record:
-                full_records.append(record)
-
-    # Only completed races for 2025
-    for year, gp in races_2025:
-        record = analyze_pole_to_win(year, gp)
-        if record:
-            full_records.append(record)
-
-    df = pd.DataFrame(full_records)
+    return [(2025, gp) for gp in completed_races(2025)]
+
+def pole_to_win_mixed_analysis(years_full, races_2025, fetch=False):
+    start = time.perf_counter()
+    races = [(year, gp) for year in years_full for gp in get_all_grand_prix(year)] + list(races_2025)
+    years = sorted({year for year, _ in races})
+    index = load_results_index(years, races, fetch=fetch)
+    df = pole_to_win_records(index)
+
+    # Calendar races without a stored result (or without a pole sitter) are left out of the rates
+    found = set(zip(df["Year"], df["GrandPrix"]))
+    skipped = [race for race in races if race not in found]
+    if skipped:
+        print(f"\n⚠️ Skipped {len(skipped)}/{len(races)} races with no stored results"
+              f"{'' if fetch else ' (run with --fetch to ingest them)'}:")
+        for year, gp in skipped:
+            print(f"   - {year} {gp}")
 
     if df.empty:
-        print("\n❗ No race results found even after fetching. Please check FastF1 API or your race list.")
+        print("\n❗ No race results found. Run with --fetch or check the session store.")
         return df, None
 
     # Calculate win rates per year
     win_rates = df.groupby("Year")["WonRace"].mean().multiply(100).reset_index()
     win_rates.rename(columns={"WonRace": "PoleToWinRate"}, inplace=True)
 
-    print("\n🏆 Pole-to-Win Conversion Rates by Year:")
+    print(f"\n🏆 Pole-to-Win Conversion Rates by Year ({len(df)} races, {time.perf_counter() - start:.2f}s):")
     print(win_rates)
 
     return df, win_rates
@@ -139,12 +84,23 @@ def plot_pole_to_win_heatmap(win_rates_df):
     plt.title("Pole-to-Win Conversion Heatmap (2023–2025 till Latest Race)", fontsize=14)
     plt.tight_layout()
 
-    output_folder = os.path.join(BASE_PATH, "images")
-    os.makedirs(output_folder, exist_ok=True)
-    plt.savefig(os.path.join(output_folder, "pole_to_win_heatmap_2023_to_2025_auto.png"))
+    os.makedirs(os.path.dirname(HEATMAP_FILE), exist_ok=True)
+    plt.savefig(HEATMAP_FILE)
     plt.show()
 
-if __name__ == "__main__":
+# Analysis + heatmap in one call (used by the batch renderer, render_charts.py)
+def pole_to_win_report(years_full, races_2025, fetch=False):
+    df, win_rates = pole_to_win_mixed_analysis(years_full, races_2025, fetch)
+    if win_rates is not None:
+        plot_pole_to_win_heatmap(win_rates)
+    return df, win_rates
+
+def main():
+    parser = argparse.ArgumentParser(description="Pole-to-win conversion for 2023, 2024 and the completed 2025 races")
+    parser.add_argument("--fetch", action="store_true",
+                        help="ingest calendar races missing from the session store first (needs network)")
+    args = parser.parse_args()
+
     # Full seasons
     full_years = [2023, 2024]
 
@@ -152,8 +108,8 @@ if __name__ == "__main__":
     races_2025 = get_completed_2025_races()
     print(f"\n📆 Completed 2025 races detected: {races_2025}\n")
 
-    df, win_rates = pole_to_win_mixed_analysis(full_years, races_2025)
+    df, win_rates = pole_to_win_report(full_years, races_2025, fetch=args.fetch)
     print(df)
 
-    if win_rates is not None:
-        plot_pole_to_win_heatmap(win_rates)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Created on Sat Oct 17 2026
+@author: sid
+
+Race CV : Race-grouped, forward-chaining cross-validation for the finishing-position model.
+Rows are grouped by race (Year, GP) and races are put in calendar order; each fold trains on
+every race before a block of races and validates on that block, so no race is ever split across
+train and validation and no fold sees the future. Each fold's XGBoost matrices are built once
+(QuantileDMatrix for training, DMatrix for validation) and shared by every candidate, and folds
+train in parallel under a thread budget.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from concurrent.futures import ThreadPoolExecutor
+
+from driver_form_index import get_form_index
+
+DEFAULT_THREADS = os.cpu_count() or 1
+
+
+# Races in calendar order: rounds from the driver form index, else order of first appearance
+def race_keys(df):
+    keys = list(dict.fromkeys(zip(df["Year"], df["GP"])))
+    rounds = get_form_index().gp_round
+    if all(k in rounds for k in keys):
+        return sorted(keys, key=lambda k: (k[0], rounds[k]))
+    first_seen = {k: i for i, k in enumerate(keys)}
+    return sorted(keys, key=lambda k: (k[0], first_seen[k]))
+
+
+# Position of each row's race in the calendar order
+def race_positions(df, keys=None):
+    keys = keys or race_keys(df)
+    pos = {k: i for i, k in enumerate(keys)}
+    return np.array([pos[k] for k in zip(df["Year"], df["GP"])]), keys
+
+
+def holdout_split(race_pos, test_fraction=0.2):
+    """Row indices of the earlier races (train) and the latest races (test)."""
+    n_races = race_pos.max() + 1
+    n_test = max(1, int(round(n_races * test_fraction)))
+    cutoff = n_races - n_test
+    return np.flatnonzero(race_pos < cutoff), np.flatnonzero(race_pos >= cutoff)
+
+
+def forward_chaining_splits(race_pos, n_splits=5, races_per_fold=1):
+    """(train_idx, valid_idx) pairs: fold k validates on the k-th of the last n_splits race blocks
+    and trains on every race before it."""
+    n_races = race_pos.max() + 1
+    n_splits = min(n_splits, (n_races - 1) // races_per_fold)
+    if n_splits < 1:
+        raise ValueError(f"need at least {races_per_fold + 1} races for forward-chaining CV, got {n_races}")
+    splits = []
+    for k in range(n_splits, 0, -1):
+        start = n_races - k * races_per_fold
+        train_idx = np.flatnonzero(race_pos < start)
+        valid_idx = np.flatnonzero((race_pos >= start) & (race_pos < start + races_per_fold))
+        splits.append((train_idx, valid_idx))
+    return splits
+
+
+class Fold:
+    """One CV fold's matrices, built once and reused by every candidate."""
+
+    def __init__(self, X, y, train_idx, valid_idx):
+        X = np.asarray(X, dtype=np.float32)
+        y = np.asarray(y, dtype=np.float32)
+        self.train_idx = train_idx
+        self.valid_idx = valid_idx
+        self.dtrain = xgb.QuantileDMatrix(X[train_idx], label=y[train_idx])
+        self.dvalid = xgb.DMatrix(X[valid_idx], label=y[valid_idx])
+        self.y_valid = y[valid_idx]
+
+    def describe(self):
+        return [len(self.train_idx), len(self.valid_idx)]
+
+
+def build_folds(X, y, splits):
+    return [Fold(X, y, train_idx, valid_idx) for train_idx, valid_idx in splits]
+
+
+def thread_plan(n_folds, thread_budget=DEFAULT_THREADS):
+    """(parallel folds, XGBoost threads per fold) that together stay within the budget."""
+    workers = max(1, min(n_folds, thread_budget))
+    return workers, max(1, thread_budget // workers)
+
+
+def map_folds(fn, folds, thread_budget=DEFAULT_THREADS, pool=None):
+    """fn(fold_number, fold, nthread) for every fold; folds run in parallel."""
+    workers, nthread = thread_plan(len(folds), thread_budget)
+    if pool is None and workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as own_pool:
+            return list(own_pool.map(lambda i: fn(i, folds[i], nthread), range(len(folds))))
+    if pool is None:
+        return [fn(i, fold, nthread) for i, fold in enumerate(folds)]
+    return list(pool.map(lambda i: fn(i, folds[i], nthread), range(len(folds))))
+
+
+# Per-fold validation metrics for fixed params and boosting rounds
+def cross_validate(params, n_estimators, folds, seed=42, thread_budget=DEFAULT_THREADS):
+    def run(i, fold, nthread):
+        booster = xgb.train(dict(params, objective="reg:squarederror", seed=seed, tree_method="hist",
+                                 nthread=nthread), fold.dtrain, num_boost_round=n_estimators)
+        pred = booster.predict(fold.dvalid)
+        err = pred - fold.y_valid
+        return {"fold": i, "train_rows": len(fold.train_idx), "valid_rows": len(fold.valid_idx),
+                "mae": float(np.abs(err).mean()), "rmse": float(np.sqrt((err ** 2).mean()))}
+    return pd.DataFrame(map_folds(run, folds, thread_budget))
@@ -0,0 +1,160 @@
+"""
+Created on Sat Oct 17 2026
+@author: sid
+
+Race Simulator : Monte Carlo race outcomes on top of the model's PredictedScore.
+Perturbs every driver's score at once as an (n_sims x n_drivers) array using the model's
+residuals on held-out races, ranks each simulated race with one argsort, optionally retires
+drivers with a per-driver DNF hazard, and reports finishing-position distributions plus win,
+podium and points probabilities next to predicted_positions.csv.
+
+Usage:
+    python race_simulator.py --events "2025:Miami Grand Prix" --sims 100000 --dnf
+"""
+
+import os
+import argparse
+import numpy as np
+import pandas as pd
+
+from session_store import load_season
+from model_registry import load_model, version_path
+from batch_predict import HISTORICAL_FEATURES, parse_event, predict_events, race_folder
+from backtest import fill_form
+from race_cv import holdout_split, race_positions
+
+POINTS_TABLE = np.array([25, 18, 15, 12, 10, 8, 6, 4, 2, 1], dtype=np.float32)
+FINISHED_STATUSES = ("Finished", "Lapped")
+# Held-out residuals; the old in-sample residuals.npy caches are not reused
+RESIDUALS_FILE = "holdout_residuals.npy"
+
+_residuals = {}
+
+
+# Out-of-sample residuals (actual - predicted) of a registered model, cached per version: the
+# latest races that train_model held out (race_cv.holdout_split over the same rows), which the
+# booster never saw, so the simulated spread is not narrowed by in-sample fit
+def model_residuals(model=None):
+    model = model or load_model()
+    if model.version not in _residuals:
+        cache_file = os.path.join(version_path(model.version), RESIDUALS_FILE)
+        if os.path.exists(cache_file):
+            _residuals[model.version] = np.load(cache_file)
+        else:
+            df = fill_form(pd.read_csv(HISTORICAL_FEATURES)).dropna(subset=model.features + ['FinalPosition'])
+            df = df[df['FinalPosition'] <= 20].reset_index(drop=True)
+            race_pos, _ = race_positions(df)
+            _, test_idx = holdout_split(race_pos)
+            held_out = df.iloc[test_idx]
+            residuals = (held_out['FinalPosition'].to_numpy() - model.predict(held_out)).astype(np.float32)
+            np.save(cache_file, residuals)
+            _residuals[model.version] = residuals
+    return _residuals[model.version]
+
+
+# Smoothed per-driver retirement rate from race results (Status not finished / lapped)
+def estimate_dnf_hazard(drivers, years, prior_rate=0.08, prior_weight=5):
+    frames = [load_season("results", year, "R", ["Abbreviation", "Status"]) for year in years]
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return np.full(len(drivers), prior_rate, dtype=np.float32)
+    results = pd.concat(frames, ignore_index=True)
+    status = results["Status"].astype(str)
+    results["DNF"] = ~(status.isin(FINISHED_STATUSES) | status.str.startswith("+"))
+    stats = results.groupby("Abbreviation")["DNF"].agg(["sum", "count"]).reindex(list(drivers)).fillna(0)
+    rate = (stats["sum"] + prior_rate * prior_weight) / (stats["count"] + prior_weight)
+    return rate.to_numpy(dtype=np.float32)
+
+
+def simulate_positions(scores, residuals, n_sims=100_000, dnf_hazard=None, seed=None):
+    """(n_sims x n_drivers) finishing positions (1-based). Lower simulated score finishes ahead;
+    retired drivers are classified behind every finisher in random order."""
+    rng = np.random.default_rng(seed)
+    scores = np.asarray(scores, dtype=np.float32)
+    n_drivers = len(scores)
+    sims = scores + rng.choice(residuals, size=(n_sims, n_drivers))
+    if dnf_hazard is not None:
+        dnf = rng.random((n_sims, n_drivers), dtype=np.float32) < np.asarray(dnf_hazard, dtype=np.float32)
+        sims[dnf] = 1e6 + rng.random(int(dnf.sum()), dtype=np.float32)
+    order = np.argsort(sims, axis=1)
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(1, n_drivers + 1), axis=1)
+    return positions
+
+
+def position_distribution(positions):
+    """(n_drivers x n_drivers) matrix: row d, column p-1 = P(driver d finishes P p)."""
+    n_sims, n_drivers = positions.shape
+    flat = (np.arange(n_drivers) * n_drivers + (positions - 1)).ravel()
+    counts = np.bincount(flat, minlength=n_drivers * n_drivers).reshape(n_drivers, n_drivers)
+    return counts / n_sims
+
+
+def summarize(drivers, dist, dnf_hazard=None):
+    n_drivers = dist.shape[1]
+    points = np.zeros(n_drivers, dtype=np.float32)
+    points[:min(n_drivers, len(POINTS_TABLE))] = POINTS_TABLE[:n_drivers]
+    summary = pd.DataFrame({
+        'Driver': list(drivers),
+        'WinProb': dist[:, 0],
+        'PodiumProb': dist[:, :3].sum(axis=1),
+        'PointsProb': dist[:, :10].sum(axis=1),
+        'ExpectedPosition': dist @ np.arange(1, n_drivers + 1),
+        'ExpectedPoints': dist @ points
+    })
+    if dnf_hazard is not None:
+        summary['DNFHazard'] = dnf_hazard
+    return summary.sort_values('ExpectedPosition').reset_index(drop=True)
+
+
+def simulate_race(predictions, n_sims=100_000, dnf_hazard=None, model=None, seed=None):
+    """predictions: predicted_positions.csv rows (Driver, PredictedScore).
+    Returns (summary, position distribution frame)."""
+    residuals = model_residuals(model)
+    drivers = predictions['Driver'].tolist()
+    positions = simulate_positions(predictions['PredictedScore'].to_numpy(), residuals, n_sims, dnf_hazard, seed)
+    dist = position_distribution(positions)
+    distribution = pd.DataFrame(dist, columns=[f'P{p}' for p in range(1, len(drivers) + 1)])
+    distribution.insert(0, 'Driver', drivers)
+    return summarize(drivers, dist, dnf_hazard), distribution
+
+
+# Simulate from an event's predicted_positions.csv (re-scoring it when missing or written
+# before PredictedScore was saved)
+def simulate_event(year, gp_name, n_sims=100_000, use_dnf=False, model=None, seed=None, write=True):
+    folder = race_folder(year, gp_name)
+    prediction_file = os.path.join(folder, "predicted_positions.csv")
+    predictions = pd.read_csv(prediction_file) if os.path.exists(prediction_file) else None
+    if predictions is None or 'PredictedScore' not in predictions.columns:
+        predictions = predict_events([(year, gp_name)], model=model)
+    if predictions.empty:
+        print(f"⚠️ No predictions for {year} {gp_name}")
+        return None, None
+
+    dnf_hazard = estimate_dnf_hazard(predictions['Driver'], range(year - 2, year + 1)) if use_dnf else None
+    summary, distribution = simulate_race(predictions, n_sims, dnf_hazard, model, seed)
+    if write:
+        summary.to_csv(os.path.join(folder, "simulated_outcomes.csv"), index=False)
+        distribution.to_csv(os.path.join(folder, "simulated_position_distribution.csv"), index=False)
+        print(f"✅ {year} {gp_name}: {n_sims} simulations saved to {folder}")
+    return summary, distribution
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo race outcome probabilities")
+    parser.add_argument("--events", nargs="+", type=parse_event, required=True,
+                        help='events as "YEAR:Grand Prix name"')
+    parser.add_argument("--sims", type=int, default=100_000)
+    parser.add_argument("--dnf", action="store_true", help="apply per-driver DNF hazards from recent results")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    for year, gp_name in args.events:
+        summary, _ = simulate_event(year, gp_name, args.sims, args.dnf, seed=args.seed)
+        if summary is not None:
+            print(f"\n🎲 Simulated outcomes - {gp_name} {year}:")
+            print(summary.round(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Created on Sat Oct 17 2026
+@author: sid
+
+Render Charts : Headless batch rendering of the analysis charts with the Agg backend. Lap/sector
+comparison, tyre strategy and weather correlation charts for every stored race, plus the
+pole-to-win heatmap and the registered model's feature importance, are rendered across a process
+pool. Each chart's fingerprint (content hashes of its input files, plot parameters and the source
+of the scripts that draw it) is kept in render_manifest.json next to images/; charts whose
+fingerprint is unchanged and whose images still exist are skipped.
+
+Usage:
+    python render_charts.py --years 2021 2022 2023 2024 2025 --workers 4
+    python render_charts.py --years 2025 --charts tire_strategy --force
+"""
+
+import os
+# Headless backend before anything imports pyplot (spawned workers inherit the environment)
+os.environ["MPLBACKEND"] = "Agg"
+
+import io
+import json
+import time
+import argparse
+import importlib
+import warnings
+import contextlib
+import multiprocessing
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from session_store import BASE_PATH, list_sessions, session_path
+from pipeline import PROJECT_DIR, combine_hashes, file_hash, load_script
+
+MANIFEST_FILE = os.path.join(BASE_PATH, "render_manifest.json")
+
+# Per-race charts: script, entry point called with (year, gp_name), input tables, saved chart
+# names (driver_lap_comparison.chart_file) and the scripts whose code changes the picture
+RACE_CHARTS = {
+    "driver_comparison": ("driver_lap_comparison", "analyze_driver_comparison", ["laps", "results"],
+                          ["lap_time_comparison", "sector_time_comparison"],
+                          ["driver_lap_comparison.py", "lap_deltas.py", "session_catalog.py"]),
+    "tire_strategy": ("pit_strategy_analysis", "stint_strategy_analysis", ["laps", "results"],
+                      ["tire_strategy_plot"],
+                      ["pit_strategy_analysis.py", "lap_analytics.py", "session_catalog.py"]),
+    "weather_correlation": ("weather_feature_analysis", "analyze_weather_impact", ["laps", "weather"],
+                            ["weather_correlation"], ["weather_feature_analysis.py", "weather_alignment.py"]),
+}
+SEASON_CHARTS = ["pole_to_win", "feature_importance"]
+ALL_CHARTS = list(RACE_CHARTS) + SEASON_CHARTS
+
+# Seasons of the pole-to-win heatmap, as drawn by pole_to_win_analysis.py
+POLE_FULL_YEARS = [2023, 2024]
+POLE_LATEST_YEAR = 2025
+
+
+class ChartJob:
+    """One call of a plotting entry point and the images it writes."""
+
+    def __init__(self, key, target, args, inputs, outputs, sources, params=None):
+        self.key = key
+        self.target = target
+        self.args = args
+        self.inputs = inputs
+        self.outputs = outputs
+        self.sources = sources
+        self.params = params or {}
+
+    def fingerprint(self, hasher):
+        return combine_hashes(
+            self.key, json.dumps({"args": self.args, **self.params}, sort_keys=True, default=str),
+            *[f"{os.path.basename(p)}:{hasher(p)}" for p in sorted(self.inputs)],
+            *[f"{s}:{hasher(os.path.join(PROJECT_DIR, s))}" for s in self.sources]
+        )
+
+
+# === Manifest ===
+def load_manifest(path=MANIFEST_FILE):
+    if os.path.exists(path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            print("⚠️ Render manifest unreadable; re-rendering every chart")
+    return {"charts": {}, "files": {}}
+
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+# Content hash of a file, re-read only when its size or mtime changed since the last run
+def cached_hasher(manifest):
+    files = manifest.setdefault("files", {})
+
+    def hasher(path):
+        if not os.path.exists(path):
+            return "missing"
+        st = os.stat(path)
+        stamp = f"{st.st_size}:{st.st_mtime_ns}"
+        entry = files.get(path)
+        if entry is None or entry["stamp"] != stamp:
+            entry = files[path] = {"stamp": stamp, "sha256": file_hash(path)}
+        return entry["sha256"]
+    return hasher
+
+
+# === Jobs ===
+def table_file(table, year, gp_name, session_type="R"):
+    return os.path.join(session_path(table, year, gp_name, session_type), "part-0.parquet")
+
+
+def race_jobs(years, charts):
+    # Imported here: only for the image paths (the scripts import pyplot)
+    from driver_lap_comparison import chart_file
+    jobs = []
+    for year, gp, _ in (s for y in years for s in list_sessions(y, "R")):
+        for name in charts:
+            if name not in RACE_CHARTS:
+                continue
+            module, function, tables, images, sources = RACE_CHARTS[name]
+            inputs = [table_file(t, year, gp) for t in tables]
+            if not all(os.path.exists(p) for p in inputs):
+                continue
+            jobs.append(ChartJob(f"{name}|{year}|{gp}", (module, function), [year, gp], inputs,
+                                 [chart_file(year, gp, image) for image in images], sources))
+    return jobs
+
+
+def pole_to_win_job():
+    # Imported here: pole_to_win_analysis imports seaborn / pyplot
+    from pole_to_win_analysis import HEATMAP_FILE
+    from results_index import INDEX_FILE, build_results_index, completed_races
+    years = POLE_FULL_YEARS + [POLE_LATEST_YEAR]
+    # Bring the (incremental) index up to date first so its file hash reflects the store
+    build_results_index(years)
+    races = [[POLE_LATEST_YEAR, gp] for gp in completed_races(POLE_LATEST_YEAR)]
+    return ChartJob("pole_to_win", ("pole_to_win_analysis", "pole_to_win_report"), [POLE_FULL_YEARS, races],
+                    [INDEX_FILE], [HEATMAP_FILE], ["pole_to_win_analysis.py", "results_index.py"])
+
+
+def feature_importance_job(version=None):
+    # Imported here: the model stack is only needed for this chart
+    from model_registry import MODEL_FILENAME, META_FILENAME, REGISTRY_FILE, resolve_version, version_path
+    train_model = load_script(os.path.join("modelling", "train_model.py"))
+    version = resolve_version(version)
+    folder = version_path(version)
+    return ChartJob("feature_importance", ("render_charts", "render_feature_importance"), [version],
+                    [REGISTRY_FILE, os.path.join(folder, MODEL_FILENAME), os.path.join(folder, META_FILENAME)],
+                    [train_model.IMPORTANCE_FILE], ["modelling/train_model.py"])
+
+
+def plan_jobs(years, charts=ALL_CHARTS):
+    jobs = race_jobs(years, charts)
+    if "pole_to_win" in charts:
+        jobs.append(pole_to_win_job())
+    if "feature_importance" in charts:
+        try:
+            jobs.append(feature_importance_job())
+        except FileNotFoundError as e:
+            print(f"⚠️ Skipping feature_importance: {e}")
+    return jobs
+
+
+# Same chart as train_model.py draws after training, from the registered booster's gain
+def render_feature_importance(version=None):
+    from model_registry import load_model
+    train_model = load_script(os.path.join("modelling", "train_model.py"))
+    model = load_model(version)
+    gain = model.booster.get_score(importance_type="gain")
+    importance = pd.Series([gain.get(f"f{i}", gain.get(f, 0.0)) for i, f in enumerate(model.features)],
+                           index=model.features)
+    train_model.plot_feature_importance(importance / importance.sum())
+
+
+# === Rendering ===
+def run_job(target, args):
+    """Worker: call one plotting entry point headless (its prints are discarded); returns seconds."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    module_name, function = target
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+            # plt.show() in the scripts is a no-op under Agg
+            warnings.filterwarnings("ignore", message=".*non-interactive.*")
+            getattr(importlib.import_module(module_name), function)(*args)
+    finally:
+        plt.close("all")
+    return time.perf_counter() - start
+
+
+def render(jobs, workers=4, force=False, manifest_path=MANIFEST_FILE):
+    """Render the jobs whose fingerprint changed (all with force=True). Returns (rendered, skipped, failed)."""
+    manifest = load_manifest(manifest_path)
+    charts = manifest.setdefault("charts", {})
+    hasher = cached_hasher(manifest)
+
+    todo, skipped = [], []
+    for job in jobs:
+        fingerprint = job.fingerprint(hasher)
+        entry = charts.get(job.key)
+        if (not force and entry and entry["fingerprint"] == fingerprint
+                and all(os.path.exists(p) for p in job.outputs)):
+            skipped.append(job.key)
+        else:
+            todo.append((job, fingerprint))
+    print(f"🖼️ {len(jobs)} charts: {len(todo)} to render, {len(skipped)} unchanged")
+
+    rendered, failed = [], []
+    if todo:
+        os.makedirs(os.path.join(BASE_PATH, "images"), exist_ok=True)
+        start = time.perf_counter()
+        # Spawned (not forked) workers: the parent may hold pyarrow / BLAS threads
+        context = multiprocessing.get_context("spawn")
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                futures = {pool.submit(run_job, job.target, job.args): (job, fp) for job, fp in todo}
+                for future in as_completed(futures):
+                    job, fingerprint = futures[future]
+                    try:
+                        seconds = future.result()
+                    except Exception as e:
+                        charts.pop(job.key, None)
+                        failed.append(job.key)
+                        print(f"   ❌ {job.key}: {type(e).__name__}: {e}")
+                        continue
+                    charts[job.key] = {"fingerprint": fingerprint, "outputs": job.outputs,
+                                       "seconds": round(seconds, 2), "rendered": time.strftime("%Y-%m-%dT%H:%M:%S")}
+                    rendered.append(job.key)
+                    print(f"   ✅ {job.key} ({seconds:.1f}s)")
+        finally:
+            save_manifest(manifest, manifest_path)
+        print(f"⏱️ Rendered {len(rendered)} charts in {time.perf_counter() - start:.1f}s "
+              f"with {workers} workers ({len(failed)} failed)")
+    else:
+        save_manifest(manifest, manifest_path)
+    return rendered, skipped, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the chart gallery headless, skipping unchanged charts")
+    parser.add_argument("--years", type=int, nargs="+", default=[2021, 2022, 2023, 2024, 2025])
+    parser.add_argument("--charts", nargs="+", choices=ALL_CHARTS, default=ALL_CHARTS)
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument("--force", action="store_true", help="re-render even when inputs are unchanged")
+    args = parser.parse_args()
+
+    jobs = plan_jobs(args.years, args.charts)
+    render(jobs, args.workers, args.force)
+
+
+if __name__ == "__main__":
+    main()
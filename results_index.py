@@ -0,0 +1,207 @@
+"""
+Created on Sat Oct 17 2026
+@author: sid
+
+Results Index : One compact table of grid, finish, status and points for every (year, round, driver),
+kept in results_index.parquet and updated incrementally: only race sessions whose results file
+changed are re-read from the session store. Races on the calendar that are not in the store yet
+are fetched in parallel on the ingestion worker processes (each with its own FastF1 cache). Event schedules are cached in schedules/
+so repeated analyses need no network.
+
+Usage:
+    python results_index.py --years 2021 2022 2023 2024 2025
+    python results_index.py --years 2025 --fetch-missing
+"""
+
+import os
+import json
+import argparse
+import pandas as pd
+from datetime import datetime, timedelta
+
+from session_store import BASE_PATH, list_sessions, load_season, session_path
+from compact_tables import compact_frame
+
+INDEX_FILE = os.path.join(BASE_PATH, "results_index.parquet")
+INDEX_STATE = os.path.join(BASE_PATH, "results_index.json")
+SCHEDULE_PATH = os.path.join(BASE_PATH, "schedules")
+# Schedules of the current season are refreshed after this long; past seasons never change
+SCHEDULE_TTL = timedelta(hours=24)
+
+RESULT_COLUMNS = ["Abbreviation", "TeamName", "GridPosition", "Position", "Status", "Points"]
+
+_schedules = {}
+
+
+# === Schedules ===
+def schedule_file(year):
+    return os.path.join(SCHEDULE_PATH, f"schedule_{year}.parquet")
+
+
+def fetch_schedule(year):
+    import fastf1
+    schedule = fastf1.get_event_schedule(year, include_testing=False)
+    race_date = schedule["Session5DateUtc"] if "Session5DateUtc" in schedule.columns else schedule["Session5Date"]
+    return pd.DataFrame({
+        "RoundNumber": schedule["RoundNumber"].astype(int),
+        "EventName": schedule["EventName"].astype(str),
+        "EventDate": pd.to_datetime(schedule["EventDate"]),
+        "RaceDateUtc": pd.to_datetime(race_date, utc=True).dt.tz_localize(None),
+        "Source": "fastf1",
+    })
+
+
+def store_schedule(year):
+    # Imported here: season_features pulls in the feature stack, only needed without a schedule
+    from season_features import race_order
+    laps = load_season("laps", year, "R", ["LapStartDate"])
+    races = race_order(laps) if not laps.empty else []
+    return pd.DataFrame({"RoundNumber": range(1, len(races) + 1), "EventName": races,
+                         "EventDate": pd.NaT, "RaceDateUtc": pd.NaT, "Source": "store"})
+
+
+def load_schedule(year, refresh=False):
+    """Event schedule (RoundNumber, EventName, EventDate, RaceDateUtc, Source), cached on disk.
+    When FastF1 is unreachable the races in the store stand in (Source "store") and are cached
+    like a current-season schedule, so the network is retried at most once per SCHEDULE_TTL."""
+    if year in _schedules and not refresh:
+        return _schedules[year]
+    path = schedule_file(year)
+    cached = pd.read_parquet(path) if os.path.exists(path) else None
+    if cached is not None and not refresh:
+        age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(path))
+        final = year < datetime.utcnow().year and (cached["Source"] == "fastf1").all()
+        if final or age < SCHEDULE_TTL:
+            _schedules[year] = cached
+            return cached
+    try:
+        schedule = fetch_schedule(year)
+    except Exception as e:
+        if cached is not None and (cached["Source"] == "fastf1").all():
+            schedule = cached
+        else:
+            print(f"⚠️ No schedule for {year} ({type(e).__name__}); using the races in the session store")
+            schedule = store_schedule(year)
+    os.makedirs(SCHEDULE_PATH, exist_ok=True)
+    schedule.to_parquet(path, index=False)
+    _schedules[year] = schedule
+    return schedule
+
+
+def completed_races(year, now=None):
+    schedule = load_schedule(year)
+    now = now or datetime.utcnow()
+    done = schedule["RaceDateUtc"].isna() | (schedule["RaceDateUtc"] < now)
+    return schedule.loc[done, "EventName"].tolist()
+
+
+# === Index ===
+def results_file(year, gp_name):
+    return os.path.join(session_path("results", year, gp_name, "R"), "part-0.parquet")
+
+
+def file_stamp(path):
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def fetch_missing(races, workers=4):
+    """Ingest (year, gp) races that are not in the store yet on the ingestion worker processes
+    (one FastF1 cache per worker, so downloads run in parallel). Returns the fetched races."""
+    from ingest_sessions import FastF1Backend, IngestManifest, ingest_jobs
+    stored = {(y, gp) for y, gp, st in list_sessions(session_type="R")}
+    missing = [race for race in races if race not in stored]
+    if not missing:
+        return []
+    print(f"📥 Fetching {len(missing)} races missing from the session store...")
+    completed, _ = ingest_jobs(FastF1Backend(), IngestManifest(), [(y, gp, "R") for y, gp in missing], workers)
+    return [(year, gp) for year, gp, _ in completed]
+
+
+def build_results_index(years, path=INDEX_FILE, state_path=INDEX_STATE):
+    """(Year, Round, GP, Driver, TeamName, GridPosition, Position, Status, Points) for every stored race.
+    Only sessions whose results file changed since the last build are re-read."""
+    state = {}
+    if os.path.exists(state_path) and os.path.exists(path):
+        with open(state_path) as f:
+            state = json.load(f)
+    index = pd.read_parquet(path) if state else None
+
+    stamps, changed = {}, {}
+    for year, gp, _ in (s for y in years for s in list_sessions(y, "R")):
+        key = f"{year}|{gp}"
+        stamps[key] = file_stamp(results_file(year, gp))
+        if state.get(key) != stamps[key]:
+            changed.setdefault(year, []).append(gp)
+    known = {k for k in state if int(k.split("|")[0]) not in years}
+    dropped = [k for k in state if k not in stamps and k not in known]
+
+    if not changed and not dropped and index is not None:
+        return index
+
+    keep = index
+    if index is not None:
+        stale = {tuple(k.split("|")) for k in dropped} | {(str(y), gp) for y, gps in changed.items() for gp in gps}
+        row_keys = list(zip(index["Year"].astype(str), index["GP"].astype(str)))
+        keep = index[[k not in stale for k in row_keys]]
+
+    frames = [keep] if keep is not None and len(keep) else []
+    for year, gps in changed.items():
+        results = load_season("results", year, "R", RESULT_COLUMNS, events=gps)
+        frames.append(compact_frame(results, "results").rename(columns={"Abbreviation": "Driver"}))
+    index = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    for col in ("GP", "Driver", "TeamName", "Status"):
+        if col in index.columns:
+            index[col] = index[col].astype("category")
+
+    # Round numbers from the (cached) schedule, falling back to chronological store order
+    rounds = {}
+    for year in index["Year"].dropna().unique():
+        schedule = load_schedule(int(year))
+        rounds.update({(int(year), e): r for e, r in zip(schedule["EventName"], schedule["RoundNumber"])})
+    index["Round"] = pd.array([rounds.get((int(y), gp)) for y, gp in zip(index["Year"], index["GP"])],
+                              dtype="Int16")
+    index = index.sort_values(["Year", "Round", "Position"]).reset_index(drop=True)
+    index = index[["Year", "Round", "GP", "Driver", "TeamName", "GridPosition", "Position", "Status", "Points"]]
+
+    index.to_parquet(path, index=False)
+    with open(state_path, "w") as f:
+        json.dump({**{k: v for k, v in state.items() if k in known}, **stamps}, f, indent=2)
+    n_changed = sum(len(g) for g in changed.values())
+    print(f"🗃️ Results index: {n_changed} races updated, {len(stamps) - n_changed} unchanged")
+    return index
+
+
+def load_results_index(years, races=None, fetch=False, workers=4):
+    """Index for the given seasons; with fetch=True, calendar races missing from the store are ingested first."""
+    if fetch and races:
+        fetch_missing(races, workers)
+    index = build_results_index(years)
+    if races is not None:
+        wanted = pd.MultiIndex.from_tuples(races)
+        index = index[pd.MultiIndex.from_arrays([index["Year"].astype(int), index["GP"].astype(str)]).isin(wanted)]
+    return index
+
+
+# Share of races where the driver starting from `grid` finished at or above `finish`, per year
+def conversion_rate(index, grid=1, finish=1):
+    starters = index[index["GridPosition"] == grid]
+    return (starters["Position"] <= finish).groupby(starters["Year"]).mean().rename("Rate").reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the incremental season results index")
+    parser.add_argument("--years", type=int, nargs="+", default=[2021, 2022, 2023, 2024, 2025])
+    parser.add_argument("--fetch-missing", action="store_true",
+                        help="ingest completed calendar races that are not in the store (needs network)")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    races = [(year, gp) for year in args.years for gp in completed_races(year)] if args.fetch_missing else None
+    index = load_results_index(args.years, races, fetch=args.fetch_missing, workers=args.workers)
+    print(f"\n🏁 {len(index)} results across {index.groupby(['Year', 'GP'], observed=True).ngroups} races")
+    print(conversion_rate(index).round(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Created on Sat Oct 17 2026
+@author: sid
+
+Season Feature Builder : Engineer features for every Grand Prix of a season in one vectorized pass.
+Loads the whole season's laps, results and weather from the session store as concatenated frames,
+computes all per-(race, driver) aggregates with single grouped operations, and writes
+engineered_features_{year}.csv plus the per-race features.csv / driver_form.csv outputs.
+
+Usage:
+    python season_features.py --years 2021 2022 2023 2024 2025
+"""
+
+import os
+import argparse
+import numpy as np
+import pandas as pd
+
+from session_store import BASE_PATH, load_season
+from driver_form_index import get_form_index
+from lap_analytics import LAP_COLUMNS, stint_features
+from lap_deltas import DELTA_COLUMNS, LapIndex, delta_features
+from weather_alignment import align_season, rain_features
+
+# Per-(race, driver) lap aggregates: output column -> (source column, aggregation)
+LAP_AGGREGATES = {
+    "AvgRaceLapTime": ("LapTimeSec", "mean"),
+    "PitStopCount": ("PitOutTime", "count"),
+}
+
+WEATHER_COLUMNS = ["AirTemp", "TrackTemp", "Humidity"]
+
+# Bump when the feature definitions change so cached pipeline outputs are rebuilt
+FEATURE_VERSION = 4
+
+FEATURE_COLUMNS = [
+    "Driver", "AvgRaceLapTime", "ReadableAvgLap", "PitStopCount", "QualiPosition", "FinalPosition",
+    "AirTemp", "TrackTemp", "Humidity", "GP", "Year", "AvgQualifyingPosition", "AvgFinishingPosition"
+]
+
+
+# Vectorized m:ss.mmm formatting of lap times in seconds
+def seconds_to_time_str(seconds):
+    seconds = pd.Series(seconds, dtype="float64")
+    valid = seconds.notna()
+    s = seconds[valid]
+    minutes = (s // 60).astype(int).astype(str)
+    secs = (s % 60).astype(int).astype(str).str.zfill(2)
+    millis = ((s - s.astype(int)) * 1000).astype(int).astype(str).str.zfill(3)
+    out = pd.Series(None, index=seconds.index, dtype=object)
+    out[valid] = minutes + ":" + secs + "." + millis
+    return out
+
+
+# Chronological race order from the first lap start of each event (falls back to name order)
+def race_order(laps):
+    if "LapStartDate" in laps.columns and laps["LapStartDate"].notna().any():
+        return laps.groupby("GP")["LapStartDate"].min().sort_values().index.tolist()
+    return sorted(laps["GP"].unique())
+
+
+def load_season_frames(year, races=None):
+    lap_columns = LAP_COLUMNS + [c for c in DELTA_COLUMNS if c not in LAP_COLUMNS]
+    laps = load_season("laps", year, "R", lap_columns + ["LapStartDate"], events=races)
+    race_results = load_season("results", year, "R", ["Abbreviation", "Position"], events=races)
+    quali_results = load_season("results", year, "Q", ["Abbreviation", "Position"], events=races)
+    weather = load_season("weather", year, "R", WEATHER_COLUMNS, events=races)
+    return laps, race_results, quali_results, weather
+
+
+# All lap aggregates for every (GP, Driver) in one groupby
+def lap_features(laps):
+    laps = laps.assign(LapTimeSec=laps["LapTime"].dt.total_seconds())
+    features = laps.groupby(["GP", "Driver"], observed=True).agg(**{
+        name: spec for name, spec in LAP_AGGREGATES.items()
+    }).reset_index()
+    # Drivers without a pit out lap had no PitStopCount row in the per-GP scripts; keep them missing
+    features["PitStopCount"] = features["PitStopCount"].where(features["PitStopCount"] > 0)
+    features["ReadableAvgLap"] = seconds_to_time_str(features["AvgRaceLapTime"]).values
+    return features
+
+
+def position_features(results, name):
+    return results[["GP", "Abbreviation", "Position"]].rename(
+        columns={"Abbreviation": "Driver", "Position": name})
+
+
+def weather_features(weather):
+    return weather.groupby("GP")[WEATHER_COLUMNS].mean().round(2).reset_index()
+
+
+# Register a season's races (in row order) in a form index; returns GP -> round
+def register_season_form(index, features, year):
+    rounds = index.assign_rounds(year, list(dict.fromkeys(features["GP"])))
+    for gp, form in race_form_frame(features).groupby("GP", sort=False):
+        index.add_race(year, rounds[gp], gp, form)
+    return rounds
+
+
+# Attach driver form: "rolling" = all races before each round, "prior_seasons" = previous seasons only
+def attach_form(features, year, races, form_mode, index):
+    # Register every race of the season first; as-of lookups only see earlier rounds
+    rounds = register_season_form(index, order_features(features, races), year)
+
+    if form_mode == "rolling":
+        form = pd.concat(
+            [index.form_as_of(year, rounds[gp]).assign(GP=gp) for gp in races], ignore_index=True)
+        return features.merge(form, on=["GP", "Driver"], how="left")
+    form = index.form_before_season(year)
+    return features.merge(form, on="Driver", how="left")
+
+
+# This race's result as driver form (the driver_form.csv layout)
+def race_form_frame(features):
+    return features[["GP", "Driver", "QualiPosition", "FinalPosition"]].rename(columns={
+        "QualiPosition": "AvgQualifyingPosition",
+        "FinalPosition": "AvgFinishingPosition"
+    })
+
+
+# Read-only builds (write=False) attach form from a copy of the shared index, so their races never
+# reach it; pass form_index to register them in a specific index instead. form_mode=None skips form.
+def build_season_features(year, races=None, form_mode="prior_seasons", write=True, form_index=None):
+    laps, race_results, quali_results, weather = load_season_frames(year, races)
+    if laps.empty:
+        print(f"❌ No laps in the session store for {year}")
+        return None
+    races = races or race_order(laps)
+    laps = laps[laps["GP"].isin(races)]
+
+    features = lap_features(laps)
+    features = features.merge(stint_features(laps).drop(columns="Year"), on=["GP", "Driver"], how="left")
+    deltas = delta_features(LapIndex(laps)).drop(columns="Year")
+    features = features.merge(deltas, on=["GP", "Driver"], how="left")
+    rain = rain_features(align_season(year, "R", events=races)).drop(columns="Year")
+    features = features.merge(rain, on=["GP", "Driver"], how="left")
+    features = features.merge(position_features(quali_results, "QualiPosition"), on=["GP", "Driver"], how="left")
+    features = features.merge(position_features(race_results, "FinalPosition"), on=["GP", "Driver"], how="left")
+    features = features.merge(weather_features(weather), on="GP", how="left")
+    features["Year"] = year
+
+    if form_mode is not None:
+        if form_index is None:
+            form_index = get_form_index() if write else get_form_index().copy()
+        features = attach_form(features, year, races, form_mode, form_index)
+    features = order_features(features, races)
+
+    if write:
+        write_race_outputs(features, year)
+        write_season_file(features, year)
+        if form_index is not None:
+            form_index.save()
+    return features
+
+
+# Races in calendar order, drivers alphabetical within a race and the per-GP scripts' column order
+def order_features(features, races):
+    features = features.assign(GP=pd.Categorical(features["GP"], categories=races, ordered=True))
+    features = features.sort_values(["GP", "Driver"]).reset_index(drop=True)
+    features["GP"] = features["GP"].astype(str)
+    columns = [c for c in FEATURE_COLUMNS if c in features.columns]
+    return features[columns + [c for c in features.columns if c not in FEATURE_COLUMNS]]
+
+
+def write_race_outputs(features, year):
+    forms = dict(tuple(race_form_frame(features).groupby("GP")))
+    for gp, race_features in features.groupby("GP", sort=False):
+        save_path = os.path.join(BASE_PATH, f"{year}_{gp}_R")
+        os.makedirs(save_path, exist_ok=True)
+        race_features.to_csv(os.path.join(save_path, "features.csv"), index=False)
+        forms[gp].drop(columns="GP").to_csv(os.path.join(save_path, "driver_form.csv"), index=False)
+
+
+def season_file(year):
+    return os.path.join(BASE_PATH, f"engineered_features_{year}.csv")
+
+
+def write_season_file(features, year):
+    output_path = season_file(year)
+    features.to_csv(output_path, index=False)
+    print(f"✅ {features['GP'].nunique()} races, {len(features)} rows saved: {output_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build engineered features for whole seasons")
+    parser.add_argument("--years", type=int, nargs="+", required=True)
+    parser.add_argument("--form", choices=["prior_seasons", "rolling"], default="prior_seasons")
+    args = parser.parse_args()
+    for year in sorted(args.years):
+        build_season_features(year, form_mode=args.form)
+
+
+if __name__ == "__main__":
+    main()
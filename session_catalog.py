@@ -0,0 +1,132 @@
+"""
+Created on Sat Oct 17 2026
+@author: sid
+
+Session Catalog : Lightweight event / session metadata for the analysis scripts, built from the
+local session store instead of a full FastF1 session.load(). Resolves event names (including
+short names like "Jeddah"), round numbers from the race calendar order, session names, team
+colours (results TeamColor) and tyre compound colours without touching laps, telemetry or race
+control messages.
+
+Usage:
+    python session_catalog.py --year 2025 --gp Jeddah
+"""
+
+import argparse
+import pandas as pd
+
+from session_store import list_sessions, load_season, read_table
+
+SESSION_NAMES = {
+    "R": "Race", "Q": "Qualifying", "S": "Sprint", "SQ": "Sprint Qualifying", "SS": "Sprint Shootout",
+    "FP1": "Practice 1", "FP2": "Practice 2", "FP3": "Practice 3",
+}
+
+# FastF1's compound colours (fastf1.plotting), without importing the plotting module
+COMPOUND_COLORS = {
+    "SOFT": "#da291c", "MEDIUM": "#ffd12e", "HARD": "#f0f0ec", "INTERMEDIATE": "#43b02a",
+    "WET": "#0067ad", "UNKNOWN": "#00ffff", "TEST_UNKNOWN": "#434649",
+}
+DEFAULT_COLOR = "#808080"
+
+# Circuit / city names the scripts use for events stored under their official name
+EVENT_ALIASES = {
+    "jeddah": "Saudi Arabian Grand Prix", "saudi arabia": "Saudi Arabian Grand Prix",
+    "sakhir": "Bahrain Grand Prix", "melbourne": "Australian Grand Prix",
+    "monte carlo": "Monaco Grand Prix", "interlagos": "São Paulo Grand Prix",
+    "sao paulo": "São Paulo Grand Prix", "brazil": "São Paulo Grand Prix",
+    "imola": "Emilia Romagna Grand Prix", "silverstone": "British Grand Prix",
+    "monza": "Italian Grand Prix", "spa": "Belgian Grand Prix", "zandvoort": "Dutch Grand Prix",
+    "suzuka": "Japanese Grand Prix", "baku": "Azerbaijan Grand Prix", "austin": "United States Grand Prix",
+    "las vegas": "Las Vegas Grand Prix", "yas marina": "Abu Dhabi Grand Prix",
+}
+
+_rounds = {}
+_plot_style = []
+
+
+# Event name as stored, e.g. "Jeddah" -> "Saudi Arabian Grand Prix"; unknown names are returned unchanged
+def resolve_event(year, gp_name):
+    events = sorted({gp for _, gp, _ in list_sessions(year)})
+    if gp_name in events:
+        return gp_name
+    wanted = gp_name.lower()
+    alias = EVENT_ALIASES.get(wanted)
+    if alias in events:
+        return alias
+    matches = [e for e in events if wanted in e.lower()]
+    return matches[0] if len(matches) == 1 else gp_name
+
+
+# Round number per event, from the chronological order of the stored races
+def event_rounds(year):
+    if year not in _rounds:
+        # Imported here: season_features pulls in the feature stack, only needed on first use
+        from season_features import race_order
+        laps = load_season("laps", year, "R", ["LapStartDate"])
+        _rounds[year] = {gp: i + 1 for i, gp in enumerate(race_order(laps))} if not laps.empty else {}
+    return _rounds[year]
+
+
+def team_colors(year, event, session_type):
+    try:
+        results = read_table("results", year, event, session_type, ["TeamName", "TeamColor"])
+    except FileNotFoundError:
+        return {}
+    if "TeamColor" not in results.columns:
+        return {}
+    colors = results.dropna(subset=["TeamName", "TeamColor"]).drop_duplicates("TeamName")
+    return {team: color if str(color).startswith("#") else f"#{color}"
+            for team, color in zip(colors["TeamName"], colors["TeamColor"])}
+
+
+class SessionInfo:
+    """Metadata of one stored session; stands in for the event / name / colour parts of a FastF1 session."""
+
+    def __init__(self, year, gp_name, session_type="R"):
+        self.year = year
+        self.session_type = session_type
+        self.event_name = resolve_event(year, gp_name)
+        self.name = SESSION_NAMES.get(session_type, session_type)
+        self.round_number = event_rounds(year).get(self.event_name)
+        self.team_colors = team_colors(year, self.event_name, session_type)
+        self.event = pd.Series({"EventName": self.event_name, "RoundNumber": self.round_number})
+
+    def team_color(self, team):
+        return self.team_colors.get(team, DEFAULT_COLOR)
+
+    @staticmethod
+    def compound_color(compound):
+        return COMPOUND_COLORS.get(str(compound).upper(), COMPOUND_COLORS["UNKNOWN"])
+
+    def __repr__(self):
+        return f"{self.year} {self.event_name} (round {self.round_number}) - {self.name}"
+
+
+def session_info(year, gp_name, session_type="R"):
+    return SessionInfo(year, gp_name, session_type)
+
+
+# FastF1 plot styling, applied once per process on first plot (importing fastf1.plotting takes ~1.5 s)
+def setup_plot_style():
+    if not _plot_style:
+        import fastf1.plotting
+        fastf1.plotting.setup_mpl(mpl_timedelta_support=True, misc_mpl_mods=True, color_scheme='fastf1')
+        _plot_style.append(True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show stored session metadata")
+    parser.add_argument("--year", type=int, required=True)
+    parser.add_argument("--gp", required=True)
+    parser.add_argument("--session", default="R")
+    args = parser.parse_args()
+
+    info = session_info(args.year, args.gp, args.session)
+    print(f"🗂️ {info}")
+    for team, color in sorted(info.team_colors.items()):
+        print(f"   {team}: {color}")
+
+
+if __name__ == "__main__":
+    main()
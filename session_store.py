@@ -0,0 +1,243 @@
+"""
+Created on Sat Oct 17 2026
+@author: sid
+
+Session Store : Columnar Parquet store for FastF1 session tables (laps, results, weather)
+Partitioned as {table}/year=/event=/session= so a whole season can be read in one pass,
+with lap and sector times kept as native durations and column projection on read.
+"""
+
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from timedelta_parser import to_timedelta
+
+BASE_PATH = r'/Users/sid/Downloads/F1_RacePredictions'
+STORE_PATH = os.path.join(BASE_PATH, 'session_store')
+
+TABLES = ("laps", "results", "weather")
+
+# Duration columns as exported by FastF1 ("0 days 00:01:32.123000" in the legacy CSVs)
+TIME_COLUMNS = {
+    "laps": [
+        "Time", "LapTime", "PitOutTime", "PitInTime",
+        "Sector1Time", "Sector2Time", "Sector3Time",
+        "Sector1SessionTime", "Sector2SessionTime", "Sector3SessionTime",
+        "LapStartTime"
+    ],
+    "results": ["Q1", "Q2", "Q3", "Time"],
+    "weather": ["Time"],
+}
+
+DATE_COLUMNS = {"laps": ["LapStartDate"], "results": [], "weather": []}
+
+# Columns that must stay strings even when a session only has numeric-looking values
+STRING_COLUMNS = {
+    "laps": ["Driver", "DriverNumber", "Team", "Compound", "TrackStatus", "DeletedReason"],
+    "results": [
+        "DriverNumber", "BroadcastName", "Abbreviation", "DriverId", "TeamName", "TeamColor",
+        "TeamId", "FirstName", "LastName", "FullName", "HeadshotUrl", "CountryCode",
+        "ClassifiedPosition", "Status"
+    ],
+    "weather": [],
+}
+
+BOOL_VALUES = {"True": True, "False": False, True: True, False: False}
+
+# Arrow type each declared column is read as, whatever type a session happened to store it with
+CANONICAL_TYPES = {
+    table: {
+        **{col: pa.string() for col in STRING_COLUMNS[table]},
+        **{col: pa.timestamp("ns") for col in DATE_COLUMNS[table]},
+        **{col: pa.duration("ns") for col in TIME_COLUMNS[table]},
+    }
+    for table in TABLES
+}
+
+# pandas dtypes normalize_table writes, applied from the Arrow type since one file's pandas
+# metadata does not describe the unified season schema
+PANDAS_TYPES = {pa.string(): pd.StringDtype(), pa.bool_(): pd.BooleanDtype()}
+
+PARTITION_SCHEMA = pa.schema([("year", pa.int32()), ("event", pa.string()), ("session", pa.string())])
+
+
+def session_path(table, year, gp_name, session_type):
+    return os.path.join(STORE_PATH, table, f"year={year}", f"event={gp_name}", f"session={session_type}")
+
+
+def legacy_folder(year, gp_name, session_type):
+    return os.path.join(BASE_PATH, f"{year}_{gp_name}_{session_type}")
+
+
+# Coerce a raw FastF1 / CSV frame into the store's typed schema
+def normalize_table(df, table):
+    df = df.reset_index(drop=True).copy()
+    for col in df.columns:
+        if col in TIME_COLUMNS[table]:
+            if not pd.api.types.is_timedelta64_dtype(df[col]):
+                df[col] = to_timedelta(df[col])
+        elif col in DATE_COLUMNS[table]:
+            df[col] = pd.to_datetime(df[col], errors='coerce').astype("datetime64[ns]")
+        elif col in STRING_COLUMNS[table]:
+            df[col] = df[col].astype("string")
+        elif df[col].isna().all():
+            # No values to type from: stored as Arrow null so other sessions decide the season's type
+            df[col] = pd.Series([None] * len(df), index=df.index, dtype=object)
+        elif pd.api.types.is_bool_dtype(df[col]):
+            df[col] = df[col].astype("boolean")
+        elif pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype("float64")
+        else:
+            values = df[col].dropna()
+            if not values.empty and values.isin(list(BOOL_VALUES)).all():
+                df[col] = df[col].map(BOOL_VALUES).astype("boolean")
+            else:
+                numeric = pd.to_numeric(df[col], errors='coerce')
+                if numeric.notna().sum() == values.size and values.size > 0:
+                    df[col] = numeric.astype("float64")
+                else:
+                    df[col] = df[col].astype("string")
+    return df
+
+
+# Write one session's laps, results and weather into the store
+def save_session(year, gp_name, session_type, laps, results, weather):
+    for table, df in zip(TABLES, (laps, results, weather)):
+        folder = session_path(table, year, gp_name, session_type)
+        os.makedirs(folder, exist_ok=True)
+        df = normalize_table(df, table)
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), os.path.join(folder, "part-0.parquet"))
+    return session_path("laps", year, gp_name, session_type)
+
+
+def has_session(year, gp_name, session_type):
+    return all(
+        os.path.exists(os.path.join(session_path(table, year, gp_name, session_type), "part-0.parquet"))
+        for table in TABLES
+    )
+
+
+def _read_legacy_csv(table, year, gp_name, session_type, columns=None):
+    path = os.path.join(legacy_folder(year, gp_name, session_type), f"{table}.csv")
+    df = pd.read_csv(path, usecols=(lambda c: c in columns) if columns else None)
+    return normalize_table(df, table)
+
+
+# Read a single table for one session, projecting only the requested columns.
+# Falls back to the legacy {year}_{gp}_{session}/{table}.csv folder if the session is not in the store yet.
+def read_table(table, year, gp_name, session_type, columns=None):
+    path = os.path.join(session_path(table, year, gp_name, session_type), "part-0.parquet")
+    if os.path.exists(path):
+        if columns:
+            available = set(pq.read_schema(path).names)
+            columns = [c for c in columns if c in available]
+        return pq.read_table(path, columns=columns).to_pandas()
+    return _read_legacy_csv(table, year, gp_name, session_type, columns)
+
+
+# Drop-in replacement for the old per-script load_csvs(): returns (laps, results, weather)
+def load_session(year, gp_name, session_type, columns=None):
+    columns = columns or {}
+    return tuple(read_table(table, year, gp_name, session_type, columns.get(table)) for table in TABLES)
+
+
+# Schema of one stored file with declared columns at their canonical type and other all-null
+# columns typed as null (also for files written before they were stored that way), so neither
+# decides a season's column type
+def _file_schema(table, path):
+    schema = pq.read_schema(path)
+    meta = pq.read_metadata(path)
+    fields = []
+    for i, field in enumerate(schema):
+        if field.name in CANONICAL_TYPES.get(table, {}):
+            fields.append(pa.field(field.name, CANONICAL_TYPES[table][field.name]))
+            continue
+        stats = [meta.row_group(r).column(i).statistics for r in range(meta.num_row_groups)]
+        all_null = meta.num_rows > 0 and all(s is not None for s in stats) and \
+            sum(s.null_count for s in stats) == meta.num_rows
+        fields.append(pa.field(field.name, pa.null()) if all_null else field)
+    return pa.schema(fields)
+
+
+# Read one table for every stored event of a season in a single scan.
+# Adds Year and GP columns taken from the partition keys. The scan gets an explicit schema unified
+# over the selected files (not the first file's), so a column that is all null in one session
+# cannot retype it for the others.
+def load_season(table, year, session_type='R', columns=None, events=None):
+    root = os.path.join(STORE_PATH, table)
+    year_root = os.path.join(root, f"year={year}")
+    if not os.path.exists(year_root):
+        return pd.DataFrame(columns=(columns or []) + ["Year", "GP"])
+
+    wanted = None if events is None else set(events)
+    files = [
+        os.path.join(year_root, event_dir, f"session={session_type}", "part-0.parquet")
+        for event_dir in sorted(os.listdir(year_root))
+        if wanted is None or event_dir.split("=", 1)[1] in wanted
+    ]
+    files = [f for f in files if os.path.exists(f)]
+    if not files:
+        return pd.DataFrame(columns=(columns or []) + ["Year", "GP"])
+
+    schema = pa.unify_schemas([_file_schema(table, f) for f in files] + [PARTITION_SCHEMA])
+    # Columns null in every file keep their stored type, which every fragment can cast to
+    stored = pq.read_schema(files[0])
+    schema = pa.schema(
+        [stored.field(f.name) if pa.types.is_null(f.type) and f.name in stored.names else f for f in schema]
+    )
+    dataset = ds.dataset(files, schema=schema, format="parquet", partition_base_dir=root,
+                         partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"))
+    if columns:
+        columns = [c for c in columns if c in schema.names] + ["event", "year"]
+    df = dataset.to_table(columns=columns).to_pandas(types_mapper=PANDAS_TYPES.get)
+    df = df.rename(columns={"event": "GP", "year": "Year"})
+    df["GP"] = df["GP"].astype(str)
+    return df.drop(columns=["session"], errors="ignore")
+
+
+# List (year, gp_name, session_type) entries present in the store
+def list_sessions(year=None, session_type=None):
+    root = os.path.join(STORE_PATH, "laps")
+    sessions = []
+    if not os.path.exists(root):
+        return sessions
+    for year_dir in sorted(os.listdir(root)):
+        if not year_dir.startswith("year="):
+            continue
+        y = int(year_dir.split("=", 1)[1])
+        if year is not None and y != year:
+            continue
+        for event_dir in sorted(os.listdir(os.path.join(root, year_dir))):
+            for session_dir in sorted(os.listdir(os.path.join(root, year_dir, event_dir))):
+                st = session_dir.split("=", 1)[1]
+                if session_type is None or st == session_type:
+                    sessions.append((y, event_dir.split("=", 1)[1], st))
+    return sessions
+
+
+# One-off migration of the legacy CSV folders into the store
+def migrate_csv_tree():
+    migrated = 0
+    for folder in sorted(os.listdir(BASE_PATH)):
+        parts = folder.split("_")
+        if len(parts) < 3 or not parts[0].isdigit() or parts[-1] not in ("R", "Q"):
+            continue
+        year, gp_name, session_type = int(parts[0]), "_".join(parts[1:-1]), parts[-1]
+        if has_session(year, gp_name, session_type):
+            continue
+        try:
+            tables = [_read_legacy_csv(table, year, gp_name, session_type) for table in TABLES]
+        except FileNotFoundError:
+            continue
+        save_session(year, gp_name, session_type, *tables)
+        migrated += 1
+        print(f"✅ Migrated {year} {gp_name} {session_type}")
+    print(f"📦 {migrated} sessions migrated into {STORE_PATH}")
+    return migrated
+
+
+if __name__ == '__main__':
+    migrate_csv_tree()
@@ -0,0 +1,26 @@
+import pandas as pd
+
+import batch_predict
+import session_store
+from driver_form_index import DriverFormIndex
+
+
+def test_upcoming_race_is_built_from_qualifying_and_form(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_store, "STORE_PATH", str(tmp_path / "store"))
+    monkeypatch.setattr(batch_predict, "race_folder", lambda year, gp: str(tmp_path / f"{year}_{gp}_R"))
+    # Qualifying is in the store, the race has not been run
+    session_store.save_session(
+        2025, "Imola Grand Prix", "Q",
+        pd.DataFrame({"Driver": ["VER", "NOR"], "LapNumber": [1, 1]}),
+        pd.DataFrame({"Abbreviation": ["NOR", "VER"], "Position": [1.0, 2.0]}),
+        pd.DataFrame({"AirTemp": [20.0, 22.0], "TrackTemp": [30.0, 34.0], "Humidity": [50.0, 60.0]}))
+    index = DriverFormIndex(str(tmp_path / "form.csv"))
+    index.add_race(2025, 1, "Miami Grand Prix", pd.DataFrame({
+        "Driver": ["VER", "NOR"], "AvgQualifyingPosition": [3.0, 1.0], "AvgFinishingPosition": [2.0, 1.0]}))
+    monkeypatch.setattr(batch_predict, "get_form_index", lambda: index)
+
+    df = batch_predict.load_event_features([(2025, "Imola Grand Prix")])
+    assert df.set_index("Driver")["QualiPosition"].to_dict() == {"NOR": 1.0, "VER": 2.0}
+    assert df.set_index("Driver")["AvgQualifyingPosition"].to_dict() == {"NOR": 1.0, "VER": 3.0}
+    assert (df["AirTemp"] == 21.0).all()
+    assert (df["GP"] == "Imola Grand Prix").all()
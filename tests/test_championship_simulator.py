@@ -0,0 +1,21 @@
+import pandas as pd
+
+import championship_simulator
+
+
+def test_constructor_points_stay_with_the_scoring_team(monkeypatch):
+    # LAW moves from RB to Red Bull Racing after the first round
+    results = pd.DataFrame({
+        "GP": ["Bahrain Grand Prix"] * 2 + ["Miami Grand Prix"] * 2,
+        "Abbreviation": ["LAW", "VER", "LAW", "VER"],
+        "TeamName": ["RB", "Red Bull Racing", "Red Bull Racing", "Red Bull Racing"],
+        "Points": [10, 25, 4, 18],
+        "Position": [5, 1, 8, 2],
+    })
+    monkeypatch.setattr(championship_simulator, "load_season", lambda *args, **kwargs: results.copy())
+
+    drivers, teams = championship_simulator.completed_standings(2025, ["Bahrain Grand Prix", "Miami Grand Prix"])
+
+    assert drivers.set_index("Driver")["TeamName"].to_dict() == {"LAW": "Red Bull Racing", "VER": "Red Bull Racing"}
+    assert drivers.set_index("Driver")["Points"].to_dict() == {"LAW": 14, "VER": 43}
+    assert teams.set_index("TeamName")["Points"].to_dict() == {"RB": 10, "Red Bull Racing": 47}
@@ -0,0 +1,104 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import driver_form_index
+import results_index
+from driver_form_index import DriverFormIndex
+
+
+def form(**positions):
+    return pd.DataFrame({
+        "Driver": list(positions),
+        "AvgQualifyingPosition": [q for q, _ in positions.values()],
+        "AvgFinishingPosition": [f for _, f in positions.values()],
+    })
+
+
+def as_dict(frame):
+    return {row.Driver: (row.AvgQualifyingPosition, row.AvgFinishingPosition) for row in frame.itertuples()}
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = DriverFormIndex(str(tmp_path / "driver_form_index.csv"))
+    index.add_race(2023, 1, "Bahrain Grand Prix", form(VER=(1, 1), HAM=(3, 5)))
+    index.add_race(2024, 1, "Bahrain Grand Prix", form(VER=(3, 1), HAM=(5, np.nan)))
+    index.add_race(2024, 2, "Saudi Arabian Grand Prix", form(VER=(2, 3), NOR=(4, 2)))
+    return index
+
+
+def test_form_as_of_excludes_the_current_round(index):
+    assert as_dict(index.form_as_of(2024, 1)) == {"VER": (1, 1), "HAM": (3, 5)}
+    assert as_dict(index.form_as_of(2024, 2)) == {"VER": (2, 1), "HAM": (4, 5)}
+    assert as_dict(index.form_as_of(2024, 3)) == {"VER": (2, 5 / 3), "HAM": (4, 5), "NOR": (4, 2)}
+
+
+def test_form_before_season_and_rounds_between_races(index):
+    assert as_dict(index.form_before_season(2024)) == {"VER": (1, 1), "HAM": (3, 5)}
+    assert as_dict(index.form_before_season(2023)) == {}
+    # A round the index has no race for sees every race before it
+    assert as_dict(index.form_as_of(2024, 10)) == as_dict(index.form_as_of(2025, 1))
+
+
+def test_form_for_requested_drivers_keeps_unknown_ones(index):
+    frame = index.form_as_of(2024, 2, drivers=["NOR", "VER"])
+    assert frame["Driver"].tolist() == ["NOR", "VER"]
+    assert frame.loc[0, ["AvgQualifyingPosition", "AvgFinishingPosition"]].isna().all()
+    assert tuple(frame.loc[1, ["AvgQualifyingPosition", "AvgFinishingPosition"]]) == (2, 1)
+
+
+def test_out_of_order_insert_matches_calendar_order(index):
+    ordered = DriverFormIndex(index.path)
+    for key, gp in zip(index.keys, index.gp_names):
+        ordered.add_race(*key, gp, index.to_frame().query("Year == @key[0] and Round == @key[1]"))
+
+    shuffled = DriverFormIndex(index.path)
+    for i in (2, 0, 1):
+        key, gp = index.keys[i], index.gp_names[i]
+        shuffled.add_race(*key, gp, index.to_frame().query("Year == @key[0] and Round == @key[1]"))
+
+    assert shuffled.keys == ordered.keys
+    for rnd in (1, 2, 3):
+        assert as_dict(shuffled.form_as_of(2024, rnd)) == as_dict(ordered.form_as_of(2024, rnd))
+
+
+def test_replacing_a_race_updates_later_rounds(index):
+    index.add_race(2024, 1, "Bahrain Grand Prix", form(VER=(1, 1)))
+    assert as_dict(index.form_as_of(2024, 3)) == {"VER": (4 / 3, 5 / 3), "HAM": (3, 5), "NOR": (4, 2)}
+    assert index.round_of(2024, "Bahrain Grand Prix") == 1
+    assert index.round_of(2024, "Miami Grand Prix") == 3
+
+
+def test_save_and_load_round_trip(index):
+    index.save()
+    loaded = DriverFormIndex.load(index.path)
+    assert loaded.keys == index.keys
+    assert loaded.gp_round == index.gp_round
+    for year, rnd in [(2023, 1), (2024, 1), (2024, 2), (2024, 3)]:
+        assert as_dict(loaded.form_as_of(year, rnd)) == as_dict(index.form_as_of(year, rnd))
+
+
+def test_build_orders_rounds_by_schedule_not_file_age(tmp_path, monkeypatch):
+    monkeypatch.setattr(driver_form_index, "BASE_PATH", str(tmp_path))
+    monkeypatch.setattr(driver_form_index, "_loaded_indexes", {})
+    schedule = pd.DataFrame({"RoundNumber": [1, 2, 3],
+                             "EventName": ["Bahrain Grand Prix", "Saudi Arabian Grand Prix", "Australian Grand Prix"]})
+    monkeypatch.setattr(results_index, "load_schedule", lambda year: schedule)
+
+    # Written newest-first, so file age would give the reverse calendar
+    races = ["Australian Grand Prix", "Saudi Arabian Grand Prix", "Bahrain Grand Prix", "Made Up Grand Prix"]
+    for age, gp in enumerate(races):
+        folder = tmp_path / f"2024_{gp}_R"
+        folder.mkdir()
+        form(VER=(age + 1, age + 1)).to_csv(folder / "driver_form.csv", index=False)
+        os.utime(folder / "driver_form.csv", (1_000_000 - age, 1_000_000 - age))
+
+    index = driver_form_index.build_from_driver_form_files([2024], path=str(tmp_path / "index.csv"))
+
+    assert index.keys == [(2024, 1), (2024, 2), (2024, 3), (2024, 4)]
+    assert index.gp_names == ["Bahrain Grand Prix", "Saudi Arabian Grand Prix", "Australian Grand Prix",
+                              "Made Up Grand Prix"]
+    assert as_dict(index.form_as_of(2024, 3)) == {"VER": (2.5, 2.5)}
@@ -0,0 +1,24 @@
+import json
+import pickle
+
+from fastf1_cache import INDEX_FILENAME, CacheManager
+
+
+def write_entry(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(pickle.dumps({"version": 1, "data": data}))
+
+
+def test_merge_moves_worker_sessions_and_keeps_existing(tmp_path):
+    main, worker = tmp_path / "cache", tmp_path / "cache" / "workers" / "123"
+    write_entry(main / "2024" / "bahrain" / "R" / "laps.ff1pkl", "main")
+    write_entry(worker / "2024" / "bahrain" / "R" / "laps.ff1pkl", "worker")
+    write_entry(worker / "2024" / "miami" / "Q" / "laps.ff1pkl", "worker")
+    (worker / INDEX_FILENAME).write_text(json.dumps({"totals": {"hits": 3, "misses": 2}}))
+
+    cache = CacheManager(str(main))
+    assert cache.merge(str(worker)) == 1
+    assert not worker.exists()
+    assert pickle.loads((main / "2024" / "bahrain" / "R" / "laps.ff1pkl").read_bytes())["data"] == "main"
+    assert (main / "2024" / "miami" / "Q" / "laps.ff1pkl").exists()
+    assert cache.report()["hits"] == 3 and cache.report()["misses"] == 2
@@ -0,0 +1,17 @@
+import numpy as np
+
+from hyperparameter_search import successive_halving
+from race_cv import build_folds
+
+
+def test_exhausted_budget_still_scores_one_candidate(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(60, 3))
+    y = X[:, 0] * 2 + rng.normal(scale=0.1, size=60)
+    folds = build_folds(X, y, [(np.arange(40), np.arange(40, 60))])
+
+    result = successive_halving(folds, n_candidates=5, min_rounds=5, early_stopping_rounds=5,
+                                budget_seconds=0.0, thread_budget=1, trials_path=str(tmp_path / "trials.json"))
+    assert result["n_trials"] == 1
+    assert result["budget_exhausted"]
+    assert np.isfinite(result["valid_mae"])
@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+import pandas as pd
+
+from batch_predict import FORM_COLUMNS, IMPORTANT_FEATURES
+from inference_server import InferenceServer, MicroBatcher
+
+
+class QualiModel:
+    """Scores by QualiPosition; fails any batch holding a grid slot past 20."""
+    features = IMPORTANT_FEATURES
+    version = "test"
+
+    def predict(self, X):
+        if (X["QualiPosition"] > 20).any():
+            raise RuntimeError("grid slot out of range")
+        return X["QualiPosition"].to_numpy()
+
+
+def make_server():
+    form = pd.DataFrame({"Driver": ["VER"], **{c: [3.0] for c in FORM_COLUMNS}}).set_index("Driver")
+    return InferenceServer(MicroBatcher(QualiModel(), form=form, max_wait_ms=20))
+
+
+def test_bad_request_does_not_fail_its_batch():
+    async def run():
+        server = make_server()
+        server.batcher.start()
+        good = server.handle_predict(json.dumps({"rows": [{"Driver": "VER", "QualiPosition": 2},
+                                                          {"Driver": "NOR", "QualiPosition": 1}]}))
+        bad = server.handle_predict(json.dumps({"rows": [{"Driver": "LEC", "QualiPosition": 42}]}))
+        return await asyncio.gather(good, bad, return_exceptions=True)
+
+    good, bad = asyncio.run(run())
+    assert good[0] == 200
+    assert [p["Driver"] for p in good[1]["predictions"]] == ["NOR", "VER"]
+    assert isinstance(bad, RuntimeError)
+
+
+def test_invalid_rows_are_rejected_before_batching():
+    server = make_server()
+    body = json.dumps({"rows": [{"Driver": "VER", "QualiPosition": "pole"}]})
+    try:
+        asyncio.run(server.handle_predict(body))
+    except ValueError as e:
+        assert "QualiPosition" in str(e)
+    else:
+        raise AssertionError("non-numeric feature accepted")
+
+
+def test_malformed_request_line_gets_400():
+    async def run():
+        server = make_server()
+        tcp = await asyncio.start_server(server.handle_connection, "127.0.0.1", 0)
+        port = tcp.sockets[0].getsockname()[1]
+        async with tcp:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GARBAGE\r\n\r\n")
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+        return response
+
+    assert asyncio.run(run()).startswith(b"HTTP/1.1 400")
@@ -0,0 +1,80 @@
+import os
+import json
+import time
+
+import pandas as pd
+
+import session_store
+from ingest_sessions import IngestManifest, LocalCSVBackend, ingest
+
+EVENTS = ["Bahrain Grand Prix", "Miami Grand Prix"]
+
+
+def write_legacy_tree(root):
+    for gp in EVENTS:
+        for st in ("R", "Q"):
+            folder = root / f"2024_{gp}_{st}"
+            folder.mkdir(parents=True)
+            pd.DataFrame({"Driver": ["VER", "NOR"], "LapNumber": [1, 1],
+                          "LapTime": ["0 days 00:01:32.123000", "0 days 00:01:32.456000"]}
+                         ).to_csv(folder / "laps.csv", index=False)
+            pd.DataFrame({"Abbreviation": ["VER", "NOR"], "Position": [1.0, 2.0]}).to_csv(
+                folder / "results.csv", index=False)
+            pd.DataFrame({"AirTemp": [25.0], "TrackTemp": [40.0], "Humidity": [50.0]}).to_csv(
+                folder / "weather.csv", index=False)
+
+
+def test_parallel_ingest_from_local_backend_resumes(tmp_path, monkeypatch):
+    legacy = tmp_path / "legacy"
+    write_legacy_tree(legacy)
+    monkeypatch.setattr(session_store, "STORE_PATH", str(tmp_path / "store"))
+    manifest_path = str(tmp_path / "store" / "manifest.json")
+
+    completed, failed = ingest([2024], backend=LocalCSVBackend(str(legacy)), workers=4,
+                               manifest=IngestManifest(manifest_path))
+    assert sorted(completed) == sorted((2024, gp, st) for gp in EVENTS for st in ("R", "Q"))
+    assert failed == []
+    results = session_store.read_table("results", 2024, "Miami Grand Prix", "Q")
+    assert results["Abbreviation"].tolist() == ["VER", "NOR"]
+
+    # A rerun finds every session complete in the manifest and the store
+    completed, failed = ingest([2024], backend=LocalCSVBackend(str(legacy)), workers=4,
+                               manifest=IngestManifest(manifest_path))
+    assert completed == [] and failed == []
+
+
+class TimedBackend:
+    """Stand-in that records when each load runs (per file, so worker processes can report it)."""
+
+    def __init__(self, root, seconds=1.0):
+        self.root = root
+        self.seconds = seconds
+
+    def for_worker(self):
+        return self
+
+    def event_names(self, year):
+        return EVENTS
+
+    def load(self, year, gp_name, session_type):
+        start = time.time()
+        time.sleep(self.seconds)
+        with open(os.path.join(self.root, f"{gp_name}_{session_type}.json"), "w") as f:
+            json.dump([start, time.time()], f)
+        return (pd.DataFrame({"Driver": ["VER"], "LapNumber": [1]}),
+                pd.DataFrame({"Abbreviation": ["VER"], "Position": [1.0]}),
+                pd.DataFrame({"AirTemp": [25.0]}))
+
+
+def test_session_loads_overlap(tmp_path, monkeypatch):
+    timings = tmp_path / "timings"
+    timings.mkdir()
+    monkeypatch.setattr(session_store, "STORE_PATH", str(tmp_path / "store"))
+
+    completed, failed = ingest([2024], backend=TimedBackend(str(timings)), workers=4,
+                               manifest=IngestManifest(str(tmp_path / "manifest.json")))
+    assert len(completed) == 4 and failed == []
+
+    intervals = [json.loads(p.read_text()) for p in timings.iterdir()]
+    most_at_once = max(sum(s <= t < e for s, e in intervals) for t, _ in intervals)
+    assert most_at_once >= 2
@@ -0,0 +1,38 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from batch_predict import IMPORTANT_FEATURES
+from pipeline import load_script
+
+evaluation = load_script(os.path.join("evaluation", "model_evaluation.py"))
+
+
+class DeltaModel:
+    """Registered with an extra --delta-features column; checks it receives every model feature."""
+    features = IMPORTANT_FEATURES + ["LapDeltaToField"]
+    version = "test"
+
+    def predict(self, X):
+        assert list(X.columns) == self.features
+        assert X["LapDeltaToField"].notna().all()
+        return X["QualiPosition"].to_numpy(dtype=float)
+
+
+def test_extra_model_features_are_filled(tmp_path, monkeypatch):
+    folder = tmp_path / "2025_Miami Grand Prix_R"
+    folder.mkdir()
+    rows = pd.DataFrame({f: [1.0, 2.0, 3.0] for f in IMPORTANT_FEATURES})
+    rows["Driver"] = ["VER", "NOR", "LEC"]
+    rows["FinalPosition"] = [1.0, 3.0, 2.0]
+    # Delta missing for most rows (e.g. drivers without clean laps)
+    rows["LapDeltaToField"] = [0.2, np.nan, np.nan]
+    rows.to_csv(folder / "features.csv", index=False)
+    monkeypatch.setattr(evaluation, "BASE_PATH", str(tmp_path))
+
+    report = evaluation.evaluate_races([(2025, "Miami Grand Prix"), (2025, "Monaco Grand Prix")],
+                                       None, DeltaModel())
+    # The missing Monaco file is skipped; the aggregate row follows the race rows
+    assert report["GP"].tolist() == ["Miami Grand Prix", "1 races"]
+    assert np.allclose(report["MAE"], 2 / 3)
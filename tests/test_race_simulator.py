@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+import race_cv
+import race_simulator
+from driver_form_index import DriverFormIndex
+
+DRIVERS = ["VER", "NOR", "LEC"]
+
+
+def test_legacy_predictions_are_rescored(tmp_path, monkeypatch):
+    # predicted_positions.csv as written before PredictedScore was saved
+    pd.DataFrame({
+        "Driver": DRIVERS, "QualiPosition": [1.0, 2.0, 3.0], "AvgFinishingPosition": [4.3, 5.1, 6.0],
+        "AvgQualifyingPosition": [2.6, 3.4, 4.0], "PredictedPosition": [1, 2, 3],
+    }).to_csv(tmp_path / "predicted_positions.csv", index=False)
+    calls = []
+
+    def predict_events(events, model=None):
+        calls.append(events)
+        return pd.DataFrame({"Driver": DRIVERS, "PredictedScore": [1.0, 2.0, 3.0]})
+
+    monkeypatch.setattr(race_simulator, "race_folder", lambda year, gp: str(tmp_path))
+    monkeypatch.setattr(race_simulator, "predict_events", predict_events)
+    monkeypatch.setattr(race_simulator, "model_residuals", lambda model=None: np.zeros(10, dtype=np.float32))
+
+    summary, distribution = race_simulator.simulate_event(2025, "Miami Grand Prix", n_sims=100, seed=0, write=False)
+
+    assert calls == [[(2025, "Miami Grand Prix")]]
+    assert summary["Driver"].tolist() == DRIVERS
+    assert summary["WinProb"].tolist() == [1.0, 0.0, 0.0]
+    assert distribution.shape == (3, 4)
+
+
+def test_dnf_hazard_without_results_uses_prior(monkeypatch):
+    monkeypatch.setattr(race_simulator, "load_season", lambda *args, **kwargs: pd.DataFrame())
+    hazard = race_simulator.estimate_dnf_hazard(DRIVERS, [2019, 2020], prior_rate=0.08)
+    assert hazard.tolist() == [np.float32(0.08)] * 3
+
+
+def test_residuals_come_from_held_out_races(tmp_path, monkeypatch):
+    # Ten races; the model fits the first eight exactly and is 3 places too optimistic afterwards
+    rows = [{"Year": 2024, "GP": f"GP{r}", "Driver": d, "QualiPosition": q, "FinalPosition": float(q),
+             "AvgQualifyingPosition": 5.0, "AvgFinishingPosition": 5.0}
+            for r in range(10) for q, d in enumerate(DRIVERS, start=1)]
+    history = tmp_path / "combined.csv"
+    pd.DataFrame(rows).to_csv(history, index=False)
+    held_out = {"GP8", "GP9"}
+
+    class MemorisingModel:
+        features = ["QualiPosition"]
+        version = "vtest"
+
+        def predict(self, df):
+            return df["FinalPosition"].to_numpy() - 3.0 * df["GP"].isin(held_out).to_numpy()
+
+    monkeypatch.setattr(race_simulator, "HISTORICAL_FEATURES", str(history))
+    monkeypatch.setattr(race_simulator, "version_path", lambda version: str(tmp_path))
+    monkeypatch.setattr(race_cv, "get_form_index", lambda: DriverFormIndex(str(tmp_path / "form.csv")))
+    monkeypatch.setattr(race_simulator, "_residuals", {})
+
+    residuals = race_simulator.model_residuals(MemorisingModel())
+    # In-sample residuals would be almost all zero
+    assert len(residuals) == 2 * len(DRIVERS)
+    assert np.allclose(residuals, 3.0)
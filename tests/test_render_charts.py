@@ -0,0 +1,15 @@
+import model_registry
+import render_charts
+
+
+def test_unregistered_model_skips_only_feature_importance(monkeypatch):
+    def resolve_version(version=None):
+        raise FileNotFoundError("No model version None")
+
+    monkeypatch.setattr(model_registry, "resolve_version", resolve_version)
+    monkeypatch.setattr(render_charts, "race_jobs", lambda years, charts: [])
+    monkeypatch.setattr(render_charts, "pole_to_win_job", lambda: render_charts.ChartJob(
+        "pole_to_win", ("pole_to_win_analysis", "pole_to_win_report"), [], [], [], []))
+
+    jobs = render_charts.plan_jobs([2025])
+    assert [job.key for job in jobs] == ["pole_to_win"]
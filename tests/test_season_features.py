@@ -0,0 +1,18 @@
+import pytest
+
+import season_features
+from driver_form_index import DriverFormIndex
+from session_store import list_sessions
+
+
+def test_read_only_build_leaves_the_form_index_untouched(tmp_path, monkeypatch):
+    races = sorted({gp for _, gp, st in list_sessions(2025, "R")})
+    if not races:
+        pytest.skip("no 2025 races in the session store")
+    index = DriverFormIndex(str(tmp_path / "driver_form_index.csv"))
+    monkeypatch.setattr(season_features, "get_form_index", lambda: index)
+
+    features = season_features.build_season_features(2025, races[:1], write=False)
+
+    assert features is not None and len(features)
+    assert index.keys == [] and index.drivers == []
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+import session_store
+
+
+def session_frames(pit_in, lap_time):
+    laps = pd.DataFrame({
+        "Driver": ["VER", "HAM"],
+        "LapNumber": [1.0, 1.0],
+        "LapTime": lap_time,
+        "PitInTime": pit_in,
+        "SpeedST": [310.5, 308.0] if pit_in[0] is not None else [None, None],
+    })
+    results = pd.DataFrame({"Abbreviation": ["VER", "HAM"], "Position": [1.0, 2.0]})
+    weather = pd.DataFrame({"AirTemp": [25.0, 26.0]})
+    return laps, results, weather
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_store, "STORE_PATH", str(tmp_path))
+    return tmp_path
+
+
+# "A Grand Prix" sorts first, so its all-null columns used to decide the season's schema
+@pytest.mark.parametrize("null_event", ["A Grand Prix", "Z Grand Prix"])
+def test_all_null_column_in_one_session_keeps_season_types(store, null_event):
+    other = "Z Grand Prix" if null_event == "A Grand Prix" else "A Grand Prix"
+    session_store.save_session(2024, null_event, "R", *session_frames([None, None], ["0 days 00:01:31", None]))
+    session_store.save_session(2024, other, "R", *session_frames(["0 days 00:00:12", None], ["0 days 00:01:30", None]))
+
+    laps = session_store.load_season("laps", 2024).set_index("GP")
+
+    assert laps["SpeedST"].dtype == np.float64
+    assert laps.loc[other, "SpeedST"].tolist() == [310.5, 308.0]
+    assert laps.loc[null_event, "SpeedST"].isna().all()
+    assert pd.api.types.is_timedelta64_dtype(laps["PitInTime"])
+    assert laps.loc[other, "PitInTime"].iloc[0] == pd.Timedelta(seconds=12)
+    assert laps.loc[null_event, "PitInTime"].isna().all()
+
+
+# Files written before all-null columns were stored as null typed them as strings
+def test_season_reads_legacy_string_null_column(store):
+    session_store.save_session(2024, "Z Grand Prix", "R", *session_frames(["0 days 00:00:12", None], ["0 days 00:01:30", None]))
+    session_store.save_session(2024, "A Grand Prix", "R", *session_frames([None, None], ["0 days 00:01:31", None]))
+    path = store / "laps" / "year=2024" / "event=A Grand Prix" / "session=R" / "part-0.parquet"
+    legacy = pq.read_table(path)
+    legacy = legacy.set_column(legacy.schema.get_field_index("SpeedST"), "SpeedST", pa.nulls(2, pa.string()))
+    pq.write_table(legacy, path)
+
+    laps = session_store.load_season("laps", 2024, columns=["SpeedST"]).set_index("GP")
+
+    assert laps["SpeedST"].dtype == np.float64
+    assert laps.loc["Z Grand Prix", "SpeedST"].tolist() == [310.5, 308.0]
+
+
+def test_load_season_filters_events_and_session(store):
+    session_store.save_session(2024, "A Grand Prix", "R", *session_frames(["0 days 00:00:12", None], ["0 days 00:01:30", None]))
+    session_store.save_session(2024, "A Grand Prix", "Q", *session_frames(["0 days 00:00:12", None], ["0 days 00:01:30", None]))
+    session_store.save_session(2024, "Z Grand Prix", "R", *session_frames(["0 days 00:00:12", None], ["0 days 00:01:30", None]))
+
+    results = session_store.load_season("results", 2024, events=["Z Grand Prix"])
+
+    assert results["GP"].unique().tolist() == ["Z Grand Prix"]
+    assert results["Year"].unique().tolist() == [2024]
+    assert "session" not in results.columns
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from timedelta_parser import parse_ns, to_milliseconds, to_seconds, to_timedelta
+
+# One list per layout branch of the parser
+LAYOUTS = {
+    "regular": ["0 days 00:01:32.123000", "0 days 00:00:00", "0 days 01:59:59.999999999"],
+    "fraction_digits": [f"0 days 00:01:32.{'123456789'[:n]}" for n in range(1, 10)],
+    "over_one_day": ["1 days 02:03:04.500000", "9 days 23:59:59", "12 days 00:00:01.25"],
+    "no_days": ["00:01:32.123", "01:02:03", "1:02:03.5"],
+    "negative": ["-1 days +23:59:59.500000", "-0 days 00:00:01", "-00:00:01.5"],
+    "missing": [None, np.nan, "", "NaT", "nan"],
+    "bare_numbers": ["92.5", "0", "1e3"],
+    "malformed": ["0 days 00:01:32.", "0 days 00:01:3x.1", "0 days 00:01:32.1234567891", "abc", "0 dys 00:01:32"],
+}
+
+
+def expected(values):
+    return pd.to_timedelta(pd.Series(values, dtype=object), errors="coerce")
+
+
+@pytest.mark.parametrize("layout", sorted(LAYOUTS))
+def test_matches_pandas(layout):
+    values = pd.Series(LAYOUTS[layout], dtype=object)
+    pd.testing.assert_series_equal(to_timedelta(values), expected(values), check_names=False)
+
+
+def test_mixed_column_keeps_index_and_order():
+    values = pd.Series([v for layout in LAYOUTS.values() for v in layout], dtype=object)
+    values.index = values.index * 10
+    pd.testing.assert_series_equal(to_timedelta(values), expected(values), check_names=False)
+
+
+def test_regular_values_skip_the_fallback(monkeypatch):
+    def fallback(*args, **kwargs):
+        raise AssertionError("regular layout sent to pd.to_timedelta")
+
+    monkeypatch.setattr(pd, "to_timedelta", fallback)
+    ns = parse_ns(LAYOUTS["regular"] + LAYOUTS["fraction_digits"] + ["1 days 02:03:04.500000"])
+    assert ns[0] == 92_123_000_000
+    assert ns[-1] == ((24 + 2) * 3600 + 3 * 60 + 4) * 10 ** 9 + 500_000_000
+
+
+def test_seconds_and_milliseconds_keep_missing_values():
+    values = pd.Series(["0 days 00:01:32.123456", None, "", "1 days 00:00:00.0005"], dtype=object)
+    seconds = to_seconds(values)
+    assert seconds[0] == pytest.approx(92.123456)
+    assert np.isnan(seconds[1]) and np.isnan(seconds[2])
+    assert seconds[3] == pytest.approx(86_400.0005)
+
+    millis = to_milliseconds(values)
+    assert millis.isna().tolist() == [False, True, True, False]
+    assert millis[0] == 92_123 and millis[3] == 86_400_000
+
+
+def test_timedelta_input_passes_through():
+    values = pd.to_timedelta(pd.Series(["0 days 00:01:32.5", None]))
+    assert parse_ns(values)[0] == 92_500_000_000
+    assert to_timedelta(values).isna().tolist() == [False, True]
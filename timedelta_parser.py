@@ -0,0 +1,123 @@
+"""
+Created on Sat Oct 17 2026
+@author: sid
+
+Timedelta Parser : Fast parsing of FastF1 duration strings ("0 days 00:01:32.123000") from the
+legacy CSV tree. Whole columns are laid out as a fixed-width character matrix and the fixed
+"D days HH:MM:SS[.fffffffff]" layout is validated and converted with array arithmetic to
+integer nanoseconds; only values that do not match the layout go through pd.to_timedelta.
+
+Usage:
+    python timedelta_parser.py --year 2021
+"""
+
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+# Longest regular value is "D days HH:MM:SS.fffffffff" (25 chars); one extra column flags longer strings
+WIDTH = 26
+DIGIT_POSITIONS = [0, 7, 8, 10, 11, 13, 14]
+LITERALS = {1: " ", 2: "d", 3: "a", 4: "y", 5: "s", 6: " ", 9: ":", 12: ":"}
+FIELD_NS = np.array([86_400, 36_000, 3_600, 600, 60, 10, 1], dtype=np.int64) * 1_000_000_000
+FRACTION_NS = 10 ** np.arange(8, -1, -1, dtype=np.int64)
+NAT = np.iinfo(np.int64).min
+
+
+def parse_ns(values):
+    """int64 nanoseconds for an array-like of duration strings; missing/unparseable -> NaT sentinel."""
+    values = pd.Series(values, copy=False)
+    if pd.api.types.is_timedelta64_dtype(values):
+        return values.to_numpy().view(np.int64)
+
+    present = values.notna().to_numpy()
+    text = np.where(present, values.to_numpy(dtype=object), "").astype(f"U{WIDTH}")
+    chars = text.view(np.uint32).reshape(len(text), WIDTH)
+    digits = chars.astype(np.int64) - ord("0")
+    is_digit = (digits >= 0) & (digits <= 9)
+
+    regular = present & is_digit[:, DIGIT_POSITIONS].all(axis=1) & (chars[:, WIDTH - 1] == 0)
+    for pos, char in LITERALS.items():
+        regular &= chars[:, pos] == ord(char)
+    # Optional fraction: "." then 1-9 digits, padded with NULs to the end of the row
+    frac = chars[:, 16:WIDTH - 1]
+    frac_digit = is_digit[:, 16:WIDTH - 1]
+    has_frac = chars[:, 15] == ord(".")
+    n_frac = frac_digit.cumprod(axis=1).sum(axis=1)
+    tail_empty = (frac == 0).sum(axis=1) == frac.shape[1] - n_frac
+    regular &= np.where(has_frac, (n_frac > 0) & tail_empty, (chars[:, 15] == 0))
+
+    ns = np.full(len(text), NAT, dtype=np.int64)
+    whole = digits[:, DIGIT_POSITIONS] @ FIELD_NS
+    fraction = np.where(frac_digit, digits[:, 16:WIDTH - 1], 0) @ FRACTION_NS
+    ns[regular] = whole[regular] + fraction[regular]
+
+    irregular = present & ~regular
+    if irregular.any():
+        ns[irregular] = pd.to_timedelta(values[irregular], errors="coerce").to_numpy().view(np.int64)
+    return ns
+
+
+# Drop-in for pd.to_timedelta(values, errors="coerce")
+def to_timedelta(values):
+    index = values.index if isinstance(values, pd.Series) else None
+    return pd.Series(parse_ns(values).view("timedelta64[ns]"), index=index)
+
+
+def to_seconds(values):
+    ns = parse_ns(values)
+    return np.where(ns == NAT, np.nan, ns / 1e9)
+
+
+def to_milliseconds(values):
+    ns = parse_ns(values)
+    missing = ns == NAT
+    return pd.arrays.IntegerArray(np.where(missing, 0, np.round(ns / 1e6)).astype(np.int64), missing)
+
+
+# Parse every duration column of a season's legacy laps.csv files both ways and compare
+def benchmark(year, repeats=3):
+    # Imported here: session_store imports this module
+    from session_store import BASE_PATH, TIME_COLUMNS
+    frames = []
+    for folder in sorted(os.listdir(BASE_PATH)):
+        path = os.path.join(BASE_PATH, folder, "laps.csv")
+        if folder.startswith(f"{year}_") and folder.endswith("_R") and os.path.exists(path):
+            frames.append(pd.read_csv(path, usecols=lambda c: c in TIME_COLUMNS["laps"], dtype=str))
+    if not frames:
+        print(f"❌ No legacy laps.csv files for {year} under {BASE_PATH}")
+        return None
+    laps = pd.concat(frames, ignore_index=True)
+    columns = list(laps.columns)
+
+    def timed(fn):
+        best = np.inf
+        for _ in range(repeats):
+            start = time.perf_counter()
+            out = {c: fn(laps[c]) for c in columns}
+            best = min(best, time.perf_counter() - start)
+        return best, out
+
+    slow, expected = timed(lambda s: pd.to_timedelta(s, errors="coerce"))
+    fast, parsed = timed(to_timedelta)
+    mismatches = sum(int((expected[c].fillna(pd.Timedelta(-1)) != parsed[c].fillna(pd.Timedelta(-1))).sum())
+                     for c in columns)
+    values = len(laps) * len(columns)
+    print(f"⏱️ {year}: {values} values in {len(columns)} columns from {len(frames)} races")
+    print(f"   pd.to_timedelta: {slow * 1000:.1f} ms")
+    print(f"   fast parser:     {fast * 1000:.1f} ms  ({slow / fast:.1f}x faster, {mismatches} mismatches)")
+    return slow, fast, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the FastF1 duration parser on a season of legacy CSVs")
+    parser.add_argument("--year", type=int, default=2021)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    benchmark(args.year, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Created on Sat Oct 17 2026
+@author: sid
+
+Walk-Forward Backtest : Replays the seasons race by race and answers "how would the model have
+done if it had been retrained before each race". Every round gets a point-in-time feature
+snapshot whose driver-form columns only use earlier races (cached in walk_forward_snapshots.parquet).
+Before each race the model continues boosting from the previous round's booster instead of
+starting cold; a full refit every `refit_every` rounds starts a new chain, and independent
+chains run in parallel.
+
+Usage:
+    python walk_forward.py --min-train-races 5 --refit-every 10 --warm-rounds 20
+    python walk_forward.py --mode refit
+"""
+
+import os
+import json
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from concurrent.futures import ThreadPoolExecutor
+
+from session_store import BASE_PATH
+from batch_predict import FORM_COLUMNS, HISTORICAL_FEATURES, IMPORTANT_FEATURES
+from driver_form_index import DriverFormIndex
+from race_cv import DEFAULT_THREADS, race_keys, thread_plan
+from backtest import aggregate_metrics, race_metrics
+from hyperparameter_search import SEARCH_SPACE
+from model_registry import load_model
+
+SNAPSHOT_FILE = os.path.join(BASE_PATH, "walk_forward_snapshots.parquet")
+SNAPSHOT_STATE = os.path.join(BASE_PATH, "walk_forward_snapshots.json")
+REPORT_FILE = os.path.join(BASE_PATH, "walk_forward_report.csv")
+
+DEFAULT_PARAMS = {"max_depth": 4, "learning_rate": 0.1, "n_estimators": 100}
+SNAPSHOT_COLUMNS = ['Year', 'GP', 'Round', 'Driver'] + IMPORTANT_FEATURES + ['FinalPosition']
+
+
+def race_hash(race):
+    cols = ['Driver'] + [c for c in IMPORTANT_FEATURES if c not in FORM_COLUMNS] + ['FinalPosition']
+    return pd.util.hash_pandas_object(race[cols], index=False).to_numpy().tobytes()
+
+
+# === Point-in-time snapshots ===
+def build_snapshots(df, path=SNAPSHOT_FILE, state_path=SNAPSHOT_STATE):
+    """One row per (race, driver) with form averaged over strictly earlier races only.
+    Fingerprints chain race by race, so adding a race weekend only builds the new rounds."""
+    keys = race_keys(df)
+    races = dict(tuple(df.groupby(['Year', 'GP'], sort=False)))
+
+    fingerprints, h = [], hashlib.sha256()
+    for key in keys:
+        h.update(race_hash(races[key]))
+        fingerprints.append(h.copy().hexdigest())
+
+    cached, cached_prints = None, []
+    if os.path.exists(path) and os.path.exists(state_path):
+        with open(state_path) as f:
+            cached_prints = json.load(f)["fingerprints"]
+        cached = pd.read_parquet(path)
+    reuse = 0
+    while reuse < min(len(cached_prints), len(fingerprints)) and cached_prints[reuse] == fingerprints[reuse]:
+        reuse += 1
+
+    # Replay results through a fresh form index; as-of lookups only see earlier rounds
+    index = DriverFormIndex(path=None)
+    frames = [cached[cached['Round'] < reuse]] if reuse else []
+    for rnd, key in enumerate(keys):
+        race = races[key]
+        if rnd >= reuse:
+            form = index.form_as_of(0, rnd, race['Driver'].astype(str))
+            snapshot = race.drop(columns=FORM_COLUMNS, errors='ignore').assign(
+                Round=rnd, Driver=race['Driver'].astype(str).values)
+            snapshot[FORM_COLUMNS] = form[FORM_COLUMNS].to_numpy()
+            frames.append(snapshot[SNAPSHOT_COLUMNS])
+        index.add_race(0, rnd, f"{key[0]} {key[1]}", race.assign(
+            AvgQualifyingPosition=race['QualiPosition'], AvgFinishingPosition=race['FinalPosition']))
+
+    snapshots = pd.concat(frames, ignore_index=True)
+    if reuse < len(keys):
+        snapshots.to_parquet(path, index=False)
+        with open(state_path, "w") as f:
+            json.dump({"fingerprints": fingerprints}, f)
+        print(f"📸 Snapshots: {len(keys) - reuse} rounds built, {reuse} reused")
+    else:
+        print(f"♻️ Snapshots: all {len(keys)} rounds cached")
+    return snapshots.sort_values(['Round', 'Driver']).reset_index(drop=True)
+
+
+# Tuned hyperparameters of a registered model (pinned/latest by default)
+def model_params(version=None):
+    try:
+        params = load_model(version).meta.get("params", {})
+    except FileNotFoundError:
+        return dict(DEFAULT_PARAMS)
+    tuned = {k: v for k, v in params.items() if k in SEARCH_SPACE or k == "n_estimators"}
+    return tuned if tuned else dict(DEFAULT_PARAMS)
+
+
+# === Replay ===
+def plan_chains(n_rounds, min_train_races, mode, refit_every):
+    """Lists of test rounds; each list starts with a cold fit and continues warm within the list."""
+    test_rounds = list(range(min_train_races, n_rounds))
+    step = 1 if mode == "refit" else (refit_every or len(test_rounds) or 1)
+    return [test_rounds[i:i + step] for i in range(0, len(test_rounds), step)]
+
+
+def run_chain(chain, X, y, round_of_row, params, n_estimators, warm_rounds, nthread, seed=42):
+    booster_params = dict(params, objective="reg:squarederror", tree_method="hist", seed=seed, nthread=nthread)
+    booster, predictions = None, []
+    for rnd in chain:
+        # Rows are sorted by round, so the training set is a prefix of the arrays
+        end = np.searchsorted(round_of_row, rnd)
+        dtrain = xgb.QuantileDMatrix(X[:end], label=y[:end])
+        if booster is None:
+            booster = xgb.train(booster_params, dtrain, num_boost_round=n_estimators)
+        else:
+            booster = xgb.train(booster_params, dtrain, num_boost_round=warm_rounds, xgb_model=booster)
+        stop = np.searchsorted(round_of_row, rnd, side='right')
+        predictions.append((end, stop, booster.inplace_predict(X[end:stop])))
+    return predictions
+
+
+def walk_forward(df=None, params=None, warm_rounds=20, min_train_races=5,
+                 mode="warm", refit_every=10, thread_budget=DEFAULT_THREADS, write=True):
+    """params: booster params plus n_estimators for cold fits (default: the registered model's)."""
+    df = pd.read_csv(HISTORICAL_FEATURES) if df is None else df
+    df = df.dropna(subset=[c for c in IMPORTANT_FEATURES if c not in FORM_COLUMNS] + ['FinalPosition'])
+    snapshots = build_snapshots(df)
+    params = dict(params or model_params())
+    n_estimators = int(params.pop("n_estimators", DEFAULT_PARAMS["n_estimators"]))
+
+    # Trees split on thresholds, so the raw (unscaled) features give the same model as scaled ones
+    X = snapshots[IMPORTANT_FEATURES].to_numpy(dtype=np.float32)
+    y = snapshots['FinalPosition'].to_numpy(dtype=np.float32)
+    round_of_row = snapshots['Round'].to_numpy()
+    n_rounds = int(round_of_row.max()) + 1
+
+    chains = plan_chains(n_rounds, min_train_races, mode, refit_every)
+    workers, nthread = thread_plan(len(chains), thread_budget)
+    print(f"⏩ Walk-forward: {n_rounds - min_train_races} races in {len(chains)} chains "
+          f"({mode}, {workers} parallel x {nthread} threads)")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(lambda chain: run_chain(chain, X, y, round_of_row, params, n_estimators,
+                                                   warm_rounds, nthread), chains)
+        predicted = np.full(len(snapshots), np.nan)
+        for chain_predictions in results:
+            for start, stop, pred in chain_predictions:
+                predicted[start:stop] = pred
+
+    scored = snapshots.assign(Predicted=predicted).dropna(subset=['Predicted'])
+    per_race = race_metrics(scored)
+    report = pd.concat([per_race, aggregate_metrics(scored, per_race)], ignore_index=True)
+    if write:
+        report.to_csv(REPORT_FILE, index=False)
+        print(f"✅ Walk-forward report saved: {REPORT_FILE}")
+    return report, scored
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the seasons race by race with retraining before each race")
+    parser.add_argument("--mode", choices=["warm", "refit"], default="warm",
+                        help="warm: continue boosting from the previous round; refit: cold fit every round")
+    parser.add_argument("--model-version", default=None, help="take tuned params from this registry version")
+    parser.add_argument("--warm-rounds", type=int, default=20, help="trees added per warm-started round")
+    parser.add_argument("--refit-every", type=int, default=10, help="rounds per warm chain before a cold refit")
+    parser.add_argument("--min-train-races", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS)
+    args = parser.parse_args()
+
+    report, _ = walk_forward(params=model_params(args.model_version), warm_rounds=args.warm_rounds,
+                             min_train_races=args.min_train_races, mode=args.mode,
+                             refit_every=args.refit_every, thread_budget=args.threads)
+    print("\n📊 Walk-forward backtest:")
+    print(report.round(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Created on Sat Oct 17 2026
+@author: sid
+
+Weather Alignment : Joins every lap of a season to the weather at the time it was driven.
+Each lap is placed at its midpoint in session time and air/track temperature, humidity and wind
+are linearly interpolated between the surrounding weather samples (wind direction through its
+sin/cos components); a lap is rain-affected when it is rained on at any sample from its start
+to its end. Sessions are aligned one at a time, so only one raw weather frame is in memory,
+and the per-lap columns are cached in the session store as the lap_weather table.
+
+Usage:
+    python weather_alignment.py --year 2025
+    python weather_alignment.py --year 2025 --gp "Miami Grand Prix" --refresh
+"""
+
+import os
+import argparse
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from session_store import list_sessions, load_season, read_table, session_path
+
+LAP_KEYS = ["Driver", "LapNumber"]
+LAP_TIME_COLUMNS = ["Time", "LapStartTime", "LapTime"]
+INTERPOLATED = ["AirTemp", "TrackTemp", "Humidity", "WindSpeed"]
+WEATHER_COLUMNS = INTERPOLATED + ["WindDirection", "Rainfall"]
+CACHE_TABLE = "lap_weather"
+
+
+def cache_file(year, gp_name, session_type):
+    return os.path.join(session_path(CACHE_TABLE, year, gp_name, session_type), "part-0.parquet")
+
+
+def source_files(year, gp_name, session_type):
+    return [os.path.join(session_path(table, year, gp_name, session_type), "part-0.parquet")
+            for table in ("laps", "weather")]
+
+
+# Cached lap weather is reused while it is newer than the session's laps and weather files
+def is_cached(year, gp_name, session_type):
+    path = cache_file(year, gp_name, session_type)
+    if not os.path.exists(path):
+        return False
+    sources = [p for p in source_files(year, gp_name, session_type) if os.path.exists(p)]
+    return all(os.path.getmtime(path) >= os.path.getmtime(p) for p in sources)
+
+
+# Session time (seconds) at which each lap is sampled: its midpoint, else its start or end
+def lap_reference_time(laps):
+    start = laps["LapStartTime"].dt.total_seconds()
+    end = laps["Time"].dt.total_seconds()
+    duration = laps["LapTime"].dt.total_seconds()
+    mid = (start + duration / 2).fillna((start + end) / 2)
+    return mid.fillna(start).fillna(end).to_numpy(), start.fillna(end).to_numpy(), end.fillna(start).to_numpy()
+
+
+def align_session(laps, weather):
+    """Laps with interpolated weather columns appended; weather is one session's samples."""
+    laps = laps.copy()
+    weather = weather.dropna(subset=["Time"]).sort_values("Time")
+    if weather.empty or laps.empty:
+        for col in WEATHER_COLUMNS:
+            laps[col] = np.nan
+        return laps
+
+    t = weather["Time"].dt.total_seconds().to_numpy()
+    mid, start, end = lap_reference_time(laps)
+    known = ~np.isnan(mid)
+    for col in INTERPOLATED:
+        values = weather[col].to_numpy(dtype=float) if col in weather.columns else np.full(len(t), np.nan)
+        ok = ~np.isnan(values)
+        out = np.full(len(laps), np.nan)
+        if ok.any():
+            out[known] = np.interp(mid[known], t[ok], values[ok])
+        laps[col] = out
+
+    if "WindDirection" in weather.columns:
+        theta = np.deg2rad(weather["WindDirection"].to_numpy(dtype=float))
+        ok = ~np.isnan(theta)
+        out = np.full(len(laps), np.nan)
+        if ok.any():
+            sin = np.interp(mid[known], t[ok], np.sin(theta[ok]))
+            cos = np.interp(mid[known], t[ok], np.cos(theta[ok]))
+            out[known] = np.rad2deg(np.arctan2(sin, cos)) % 360
+        laps["WindDirection"] = out
+    else:
+        laps["WindDirection"] = np.nan
+
+    # Rain in effect at the lap start (last sample before it) or reported at any sample during the lap
+    rain = weather["Rainfall"].fillna(False).to_numpy(dtype=bool) if "Rainfall" in weather.columns \
+        else np.zeros(len(t), dtype=bool)
+    rain_count = np.concatenate([[0], np.cumsum(rain)])
+    first = np.searchsorted(t, np.nan_to_num(start, nan=np.inf), side="right")
+    last = np.searchsorted(t, np.nan_to_num(end, nan=-np.inf), side="right")
+    at_start = rain[np.clip(first - 1, 0, len(t) - 1)] & (first > 0)
+    during = rain_count[np.maximum(last, first)] > rain_count[first]
+    laps["Rainfall"] = np.where(known, at_start | during, False)
+    return laps
+
+
+def align_cached(year, gp_name, session_type="R", refresh=False):
+    """Per-lap weather for one session, aligned and written to the cache when stale."""
+    path = cache_file(year, gp_name, session_type)
+    if not refresh and is_cached(year, gp_name, session_type):
+        return False
+    laps = read_table("laps", year, gp_name, session_type, LAP_KEYS + LAP_TIME_COLUMNS)
+    weather = read_table("weather", year, gp_name, session_type, ["Time"] + WEATHER_COLUMNS)
+    aligned = align_session(laps, weather)[LAP_KEYS + WEATHER_COLUMNS]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pq.write_table(pa.Table.from_pandas(aligned, preserve_index=False), path)
+    return True
+
+
+def align_season(year, session_type="R", events=None, refresh=False):
+    """Per-lap weather (GP, Driver, LapNumber + weather columns) for a season, session by session."""
+    sessions = [gp for y, gp, st in list_sessions(year, session_type) if events is None or gp in events]
+    built = sum(align_cached(year, gp, session_type, refresh) for gp in sessions)
+    if built:
+        print(f"🌦️ Lap weather {year}: {built} sessions aligned, {len(sessions) - built} cached")
+    return load_season(CACHE_TABLE, year, session_type, LAP_KEYS + WEATHER_COLUMNS, events=events)
+
+
+# Rain-affected laps per (race, driver)
+def rain_features(lap_weather):
+    keys = [k for k in ("Year", "GP") if k in lap_weather.columns] + ["Driver"]
+    rain = lap_weather.assign(RainAffectedLaps=lap_weather["Rainfall"].fillna(False).astype(int))
+    return rain.groupby(keys, observed=True)["RainAffectedLaps"].sum().reset_index()
+
+
+# Mean weather over each stint of lap_analytics.segment_stints output
+def stint_weather(stint_laps, lap_weather):
+    keys = [k for k in ("Year", "GP") if k in stint_laps.columns and k in lap_weather.columns]
+    merged = stint_laps[keys + LAP_KEYS + ["StintId"]].merge(lap_weather, on=keys + LAP_KEYS, how="left")
+    merged["RainAffectedLaps"] = merged["Rainfall"].fillna(False).astype(int)
+    return merged.groupby("StintId").agg(
+        **{col: (col, "mean") for col in INTERPOLATED}, RainAffectedLaps=("RainAffectedLaps", "sum")
+    ).reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Align every lap of a season to interpolated weather")
+    parser.add_argument("--year", type=int, required=True)
+    parser.add_argument("--session", default="R")
+    parser.add_argument("--gp", nargs="*", default=None, help="Grand Prix names (default: whole season)")
+    parser.add_argument("--refresh", action="store_true", help="re-align even when the cache is fresh")
+    args = parser.parse_args()
+
+    lap_weather = align_season(args.year, args.session, args.gp, args.refresh)
+    print(f"\n🌡️ {len(lap_weather)} laps across {lap_weather['GP'].nunique()} sessions:")
+    print(lap_weather.groupby("GP")[INTERPOLATED + ["Rainfall"]].mean().round(2).to_string())
+
+
+if __name__ == "__main__":
+    main()
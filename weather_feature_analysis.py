@@ -9,29 +9,25 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+from session_store import read_table
+from driver_lap_comparison import IMAGE_FOLDER, chart_file
+from weather_alignment import LAP_TIME_COLUMNS, WEATHER_COLUMNS, align_session
 
 BASE_PATH = r"/Users/sid/Downloads/F1_RacePredictions"
 
 def load_laps_and_weather(year, gp_name, session_type='R'):
-    folder = os.path.join(BASE_PATH, f"{year}_{gp_name}_{session_type}")
-    laps = pd.read_csv(os.path.join(folder, "laps.csv"))
-    weather = pd.read_csv(os.path.join(folder,"weather.csv"))
+    laps = read_table("laps", year, gp_name, session_type, ["Driver", "LapNumber"] + LAP_TIME_COLUMNS)
+    weather = read_table("weather", year, gp_name, session_type, ["Time"] + WEATHER_COLUMNS)
     return laps, weather
 
 def preprocess_laps(laps_df):
-    # Convert laptime to seconds
-    laps_df["LapTime"] = pd.to_timedelta(laps_df["LapTime"], errors='coerce')
+    # Lap times are stored as durations; convert to seconds
     laps_df["LapTimeSec"] = laps_df["LapTime"].dt.total_seconds()
     return laps_df
 
 def merge_laps_weather(laps_df, weather_df):
-    # Simple merge on closest time available
-    laps_df['Time'] = pd.to_timedelta(laps_df['Time'], errors='coerce')
-    weather_df['Time'] = pd.to_timedelta(weather_df['Time'], errors='coerce')
-
-    merged = pd.merge_asof(laps_df.sort_values(by='Time'),weather_df.sort_values(by='Time'),
-        on='Time', direction='nearest')
-    return merged
+    # Weather interpolated at each lap's midpoint (see weather_alignment.py)
+    return align_session(laps_df, weather_df)
 
 
 def plot_weather_vs_laptime(merged_df, year, gp_name):
@@ -48,9 +44,8 @@ def plot_weather_vs_laptime(merged_df, year, gp_name):
     plt.suptitle(f"Weather vs Lap Time Correlation - {gp_name} {year}", fontsize=16)
     plt.tight_layout(rect=[0, 0, 1, 0.95])
     
-    output_folder = os.path.join(BASE_PATH, "images")
-    os.makedirs(output_folder, exist_ok=True)
-    plt.savefig(os.path.join(output_folder, f"{year}_{gp_name}_weather_correlation.png"))
+    os.makedirs(IMAGE_FOLDER, exist_ok=True)
+    plt.savefig(chart_file(year, gp_name, "weather_correlation"))
     plt.show()
 
 